@@ -2,28 +2,47 @@
 Flask Web App untuk Placement Prediction Model
 Dengan integrasi Prometheus untuk monitoring
 """
+import time
+_import_started = time.perf_counter()
+
 import os
 import sys
-import tensorflow as tf
-import tensorflow_transform as tft
+import hmac
+import json
+import math
+import importlib
+import importlib.util
+import threading
 import numpy as np
-from flask import Flask, request, jsonify, render_template_string
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-import time
+from flask import Flask, Response, request, jsonify, render_template_string, stream_with_context
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST
 import logging
 import tempfile
-import shutil
+
+from batcher import MicroBatcher
+from numpy_backend import NumpyInferenceEngine, NUMPY_WEIGHTS_FILENAME, OOV_INDEX, saved_model_has_oov_rows
+from tflite_backend import TFLiteInferenceEngine, TFLITE_MODEL_FILENAME
+from contribution_table import ContributionTableEngine, vocab_sizes_from_spec
+from transform_spec import SpecPreprocessor, load_spec
+from columnar import ColumnarError, DictionaryColumn, decode_columns, encode_probabilities, num_rows
+from columnar import CONTENT_TYPES as COLUMNAR_CONTENT_TYPES, NPZ_CONTENT_TYPE
+from prediction_cache import PredictionCache
+from model_cache import GCSModelCache
+from process_memory import update_memory_metric
+from multiprocess_metrics import MetricsExporter
+import profiler
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Try import google cloud storage (optional - only if using GCS)
+# Cek google cloud storage (optional - only if using GCS)
+# Modul baru di-import saat download model dari GCS
 try:
-    from google.cloud import storage
-    GCS_AVAILABLE = True
+    GCS_AVAILABLE = importlib.util.find_spec('google.cloud.storage') is not None
 except ImportError:
     GCS_AVAILABLE = False
+if not GCS_AVAILABLE:
     logger.warning("google-cloud-storage not available. GCS model loading disabled.")
 
 app = Flask(__name__)
@@ -49,11 +68,188 @@ PREDICTION_PROBABILITY = Histogram(
     'Prediction probability distribution',
     ['prediction_class']
 )
+APP_IMPORT_DURATION = Gauge(
+    'app_import_duration_seconds',
+    'Time to import app.py, excluding model loading',
+    multiprocess_mode='liveall'
+)
+MODULE_IMPORT_DURATION = Gauge(
+    'module_import_duration_seconds',
+    'Time spent importing heavy modules on first use',
+    ['module'],
+    multiprocess_mode='liveall'
+)
+MODEL_LOAD_DURATION = Gauge(
+    'model_load_duration_seconds',
+    'Time spent in the last load_model_and_transform call',
+    multiprocess_mode='liveall'
+)
+TRANSFORM_LOAD_DURATION = Gauge(
+    'transform_load_duration_seconds',
+    'Time spent loading the preprocessing spec or transform graph in the last model load',
+    multiprocess_mode='liveall'
+)
+MODEL_LAZY_LOADS = Counter(
+    'model_lazy_loads_total',
+    'Requests that had to load the model themselves because it was not loaded yet',
+    ['endpoint']
+)
+PREPROCESS_FALLBACKS = Counter(
+    'preprocess_fallbacks_total',
+    'Batches where the transform graph failed and simplified preprocessing was used'
+)
+STAGE_LATENCY = Histogram(
+    'request_stage_latency_seconds',
+    'Latency of each request stage (parse, preprocess, inference, response)',
+    ['endpoint', 'stage'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+MODEL_ACTIVE_VERSION = Gauge(
+    'model_active_version',
+    'Model version currently serving traffic (1 per worker process serving it)',
+    ['version'],
+    multiprocess_mode='livesum'
+)
+MODEL_RELOAD_DURATION = Gauge(
+    'model_reload_duration_seconds',
+    'Time to load and warm up the last hot-reloaded model',
+    multiprocess_mode='liveall'
+)
+MODEL_RELOADS = Counter(
+    'model_reloads_total',
+    'Hot model reload attempts',
+    ['result']
+)
+CACHE_HITS = Counter(
+    'prediction_cache_hits_total',
+    'Predictions served from the LRU cache'
+)
+CACHE_MISSES = Counter(
+    'prediction_cache_misses_total',
+    'Prediction cache lookups that required inference'
+)
+CACHE_EVICTIONS = Counter(
+    'prediction_cache_evictions_total',
+    'Entries evicted from the LRU prediction cache'
+)
+GCS_DOWNLOAD_BYTES = Counter(
+    'gcs_download_bytes_total',
+    'Bytes downloaded from GCS into the model cache'
+)
+GCS_DOWNLOAD_FILES = Counter(
+    'gcs_download_files_total',
+    'Model files synced from GCS',
+    ['result']
+)
+GCS_DOWNLOAD_DURATION = Gauge(
+    'gcs_download_duration_seconds',
+    'Duration of the last GCS model sync',
+    multiprocess_mode='liveall'
+)
+GCS_DOWNLOAD_THROUGHPUT = Gauge(
+    'gcs_download_throughput_bytes_per_second',
+    'Download throughput of the last GCS model sync',
+    multiprocess_mode='liveall'
+)
+BATCH_SIZE = Histogram(
+    'inference_batch_size',
+    'Number of rows per batched forward pass',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+WORKER_MEMORY = Gauge(
+    'worker_memory_bytes',
+    'Memory of this worker process from /proc (rss, pss, shared_*, private_*)',
+    ['kind'],
+    multiprocess_mode='liveall'
+)
+BATCH_QUEUE_WAIT = Histogram(
+    'inference_queue_wait_seconds',
+    'Time a request waits in the micro-batching queue',
+    buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+# Konfigurasi micro-batching (BATCH_MAX_SIZE=1 untuk menonaktifkan)
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 2.0))
+
+# Backend inference: 'compiled' (concrete function), 'keras' (model.predict)
+# atau 'numpy' (bobot .npz hasil numpy_backend.py export, tanpa TensorFlow)
+# atau 'tflite' (model.tflite hasil trainer.run_fn, interpreter TFLite)
+# atau 'contribution' (bobot .npz yang sama, kontribusi kategorikal dari tabel, lihat contribution_table.py)
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'compiled')
+NUMPY_WEIGHTS_PATH = os.environ.get('NUMPY_WEIGHTS_PATH')
+TFLITE_MODEL_PATH = os.environ.get('TFLITE_MODEL_PATH')
+
+# Signature dari trainer.run_fn yang menjalankan transform TFT + model dalam satu graph
+# Dipakai otomatis (backend compiled/keras) jika ada di SavedModel; USE_RAW_SIGNATURE=0 untuk menonaktifkan
+RAW_SERVING_SIGNATURE = 'serving_raw'
+USE_RAW_SIGNATURE = os.environ.get('USE_RAW_SIGNATURE', '1').lower() in ('1', 'true', 'yes')
+
+# Preprocessing spec hasil transform_spec.py (menggantikan tensorflow_transform saat serving)
+PREPROCESSING_SPEC_PATH = os.environ.get(
+    'PREPROCESSING_SPEC_PATH', os.path.join('output', 'preprocessing_spec.json')
+)
+
+# Transform graph TFT, hanya dipakai jika preprocessing spec tidak ada (butuh TensorFlow)
+TRANSFORM_GRAPH_PATH = os.path.join(
+    'output',
+    'bertrandcorneliussia-pipeline',
+    'Transform',
+    'transform_graph',
+    '6'  # Version dari pipeline
+)
+
+# Ukuran LRU cache prediksi (0 untuk menonaktifkan)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+
+# Cache lokal untuk model dari GCS (arahkan ke Railway volume agar persisten)
+MODEL_CACHE_DIR = os.environ.get(
+    'MODEL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'placement_model_cache')
+)
+GCS_DOWNLOAD_WORKERS = int(os.environ.get('GCS_DOWNLOAD_WORKERS', 8))
+
+# Mode load model saat startup:
+# 'background' (default) - /health dan /metrics langsung aktif, model di-load di thread
+# 'eager' - load sebelum app siap (perilaku lama), 'lazy' - load saat request pertama
+# 'preload' - gunicorn --preload (lihat gunicorn.conf.py): backend numpy di-load di master
+#             sebelum fork sehingga bobot dibagi antar worker (copy-on-write); backend
+#             TensorFlow di-load di tiap worker setelah fork karena runtime TF tidak fork-safe
+MODEL_LOAD_MODE = os.environ.get('MODEL_LOAD_MODE', 'background')
+
+# Ukuran thread pool TensorFlow per proses (0 = default TF, semua core)
+TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', 0))
+TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', 0))
+
+# Cache output /metrics (detik); membatasi biaya scrape saat banyak worker
+METRICS_CACHE_TTL = float(os.environ.get('METRICS_CACHE_TTL', 1.0))
+
+# Interval (detik) update worker_memory_bytes di setiap worker (mode multiprocess)
+MEMORY_REPORT_INTERVAL = float(os.environ.get('MEMORY_REPORT_INTERVAL', 15))
+
+# Token untuk endpoint /admin/* (kosong = endpoint admin nonaktif)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', 60))
+
+# Interval (detik) pengecekan versi model baru untuk hot reload, 0 = nonaktif
+MODEL_POLL_INTERVAL = float(os.environ.get('MODEL_POLL_INTERVAL', 0))
+
+# Batas jumlah record per request /predict/batch
+BATCH_MAX_RECORDS = int(os.environ.get('BATCH_MAX_RECORDS', 10000))
+
+# /predict/stream: jumlah record per batch scoring dan panjang maksimum satu baris
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 1024))
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', 64 * 1024))
 
 # Global variables untuk model dan transform
+# serving_state adalah sumber utama; variabel lain disimpan untuk kompatibilitas
+serving_state = None
 model = None
+engine = None
+model_version = None
 tf_transform_output = None
 transform_layer = None
+transform_fn = None
+spec_preprocessor = None
 
 # Feature lists (harus sama dengan transform.py)
 NUMERICAL_FEATURES = [
@@ -74,201 +270,626 @@ CATEGORICAL_FEATURES = [
     "specialisation",
 ]
 
+_load_lock = threading.Lock()
+metrics_exporter = MetricsExporter(METRICS_CACHE_TTL)
+_profile_lock = threading.Lock()
+
+def lazy_import(module_name):
+    """Import modul berat saat pertama dibutuhkan dan catat durasinya"""
+    module = sys.modules.get(module_name)
+    # Modul yang masih di-import thread lain (_initializing) harus ditunggu lewat import_module
+    if module is not None and not getattr(getattr(module, '__spec__', None), '_initializing', False):
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    duration = time.perf_counter() - start
+    MODULE_IMPORT_DURATION.labels(module=module_name).set(duration)
+    logger.info(f"Imported {module_name} in {duration:.2f}s")
+    return module
+
+def import_tensorflow():
+    """Import tensorflow dan atur ukuran thread pool sebelum runtime TF dibuat"""
+    first_import = 'tensorflow' not in sys.modules
+    tf = lazy_import('tensorflow')
+    if first_import and (TF_INTRA_OP_THREADS or TF_INTER_OP_THREADS):
+        try:
+            if TF_INTRA_OP_THREADS:
+                tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+            if TF_INTER_OP_THREADS:
+                tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+        except RuntimeError as e:
+            logger.warning(f"TensorFlow threading config not applied: {str(e)}")
+    return tf
+
 def transformed_name(key):
     """Memberi nama '_xf' pada fitur yang sudah ditransformasi"""
     return key + "_xf"
 
-def download_model_from_gcs(bucket_name, blob_prefix, local_dir):
-    """Download model dari Google Cloud Storage"""
+model_cache = GCSModelCache(
+    MODEL_CACHE_DIR,
+    max_workers=GCS_DOWNLOAD_WORKERS,
+    bytes_metric=GCS_DOWNLOAD_BYTES,
+    files_metric=GCS_DOWNLOAD_FILES,
+    duration_metric=GCS_DOWNLOAD_DURATION,
+    throughput_metric=GCS_DOWNLOAD_THROUGHPUT
+)
+
+def download_model_from_gcs(bucket_name, blob_prefix, local_dir=None):
+    """
+    Download model dari Google Cloud Storage ke cache lokal (paralel)
+    File yang sudah ada di cache tidak di-download ulang
+    """
     if not GCS_AVAILABLE:
         raise ImportError("google-cloud-storage not installed. Install with: pip install google-cloud-storage")
     
     try:
+        storage = lazy_import('google.cloud.storage')
         storage_client = storage.Client()
         bucket = storage_client.bucket(bucket_name)
         
         logger.info(f"Downloading model from GCS: gs://{bucket_name}/{blob_prefix}")
-        
-        # List semua blob di bawah prefix
-        blobs = bucket.list_blobs(prefix=blob_prefix)
-        downloaded_files = 0
-        
-        for blob in blobs:
-            # Skip jika ini adalah direktori kosong
-            if blob.name.endswith('/'):
-                continue
-                
-            # Buat path lokal yang sesuai
-            relative_path = os.path.relpath(blob.name, blob_prefix)
-            local_file_path = os.path.join(local_dir, relative_path)
-            
-            # Pastikan direktori lokal ada
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-            
-            # Download file
-            logger.info(f"Downloading {blob.name} -> {local_file_path}")
-            blob.download_to_filename(local_file_path)
-            downloaded_files += 1
-        
-        logger.info(f"Downloaded {downloaded_files} files from GCS")
-        return True
+        local_dir = local_dir or model_cache.model_dir(bucket_name, blob_prefix)
+        model_cache.sync(bucket, blob_prefix, local_dir)
+        return local_dir
         
     except Exception as e:
         logger.error(f"Error downloading from GCS: {str(e)}")
         raise
 
-def load_model_and_transform():
-    """Load model dan transform graph"""
-    global model, tf_transform_output, transform_layer
-    
+def build_engine(loaded_model):
+    """Buat inference engine untuk model, fallback ke model.predict jika gagal"""
+    inference = lazy_import('inference')
     try:
-        # Cek apakah menggunakan GCS
-        model_bucket = os.environ.get('MODEL_BUCKET')
-        model_blob_prefix = os.environ.get('MODEL_BLOB_PREFIX', 'placement_model/')
-        
-        if model_bucket and GCS_AVAILABLE:
-            # Download model dari GCS
-            logger.info("Loading model from Google Cloud Storage")
-            temp_model_dir = tempfile.mkdtemp(prefix='model_')
-            logger.info(f"Temporary model directory: {temp_model_dir}")
-            
-            try:
-                # Download model dari GCS
-                download_model_from_gcs(model_bucket, model_blob_prefix, temp_model_dir)
-                
-                # Cari folder model (bisa ada subfolder dengan version)
-                if os.path.exists(temp_model_dir):
-                    # Cek apakah ada subfolder dengan version number
-                    subdirs = [d for d in os.listdir(temp_model_dir) 
-                              if os.path.isdir(os.path.join(temp_model_dir, d)) and d.isdigit()]
-                    if subdirs:
-                        latest_version = sorted(subdirs, key=int)[-1]
-                        model_path = os.path.join(temp_model_dir, latest_version)
-                    else:
-                        model_path = temp_model_dir
-                else:
-                    model_path = temp_model_dir
-                
-                logger.info(f"Loading model from: {model_path}")
-                model = tf.keras.models.load_model(model_path)
-                logger.info("Model loaded successfully from GCS")
-                
-            except Exception as e:
-                logger.error(f"Failed to load model from GCS: {str(e)}")
-                # Cleanup temp directory
-                if os.path.exists(temp_model_dir):
-                    shutil.rmtree(temp_model_dir, ignore_errors=True)
-                raise
-        else:
-            # Load dari local path (untuk development)
-            logger.info("Loading model from local path")
-            base_path = os.path.join('output', 'serving_model')
-            if os.path.exists(base_path):
-                # Cari folder dengan timestamp terbaru
-                versions = [d for d in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, d))]
-                if versions:
-                    latest_version = sorted(versions)[-1]
-                    model_path = os.path.join(base_path, latest_version)
-                else:
-                    model_path = base_path
-            else:
-                # Fallback
-                model_path = os.environ.get('MODEL_PATH', 'model')
-            
-            logger.info(f"Loading model from: {model_path}")
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"Model path not found: {model_path}")
-            
-            model = tf.keras.models.load_model(model_path)
-            logger.info("Model loaded successfully from local path")
-        
-        # Load transform graph (opsional - untuk production bisa juga dari GCS)
-        transform_graph_path = os.path.join(
-            'output', 
-            'bertrandcorneliussia-pipeline', 
-            'Transform', 
-            'transform_graph',
-            '6'  # Version dari pipeline
+        new_engine = inference.create_engine(
+            INFERENCE_BACKEND,
+            loaded_model,
+            [transformed_name(f) for f in NUMERICAL_FEATURES],
+            [transformed_name(f) for f in CATEGORICAL_FEATURES]
         )
+    except Exception as e:
+        logger.warning(f"Inference backend '{INFERENCE_BACKEND}' unavailable, using model.predict: {str(e)}")
+        new_engine = inference.KerasPredictEngine(loaded_model)
+    logger.info(f"Inference engine: {new_engine.name}")
+    return new_engine
+
+def build_transform_fn(layer):
+    """
+    Trace transform_layer sekali untuk input kolom mentah dengan batch dinamis
+    Output berupa tensor *_xf yang langsung bisa dipakai model
+    """
+    tf = import_tensorflow()
+    input_signature = {}
+    for feature in NUMERICAL_FEATURES:
+        input_signature[feature] = tf.TensorSpec(shape=(None, 1), dtype=tf.float32, name=feature)
+    for feature in CATEGORICAL_FEATURES:
+        input_signature[feature] = tf.TensorSpec(shape=(None, 1), dtype=tf.string, name=feature)
+
+    @tf.function(input_signature=[input_signature])
+    def transform(raw_features):
+        transformed = layer(raw_features)
+        return {
+            transformed_name(feature): transformed[transformed_name(feature)]
+            for feature in NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+        }
+
+    return transform.get_concrete_function()
+
+def load_serving_model(model_path):
+    """Load model dari model_path sesuai INFERENCE_BACKEND, return (model, engine)"""
+    if INFERENCE_BACKEND in ('numpy', 'contribution'):
+        weights_path = NUMPY_WEIGHTS_PATH or os.path.join(model_path, NUMPY_WEIGHTS_FILENAME)
+        logger.info(f"Loading NumPy weights from: {weights_path}")
+        if INFERENCE_BACKEND == 'contribution':
+            return None, ContributionTableEngine(weights_path, categorical_vocab_sizes())
+        return None, NumpyInferenceEngine(weights_path)
+
+    if INFERENCE_BACKEND == 'tflite':
+        tflite_path = TFLITE_MODEL_PATH or os.path.join(model_path, TFLITE_MODEL_FILENAME)
+        logger.info(f"Loading TFLite model from: {tflite_path}")
+        return None, TFLiteInferenceEngine(tflite_path, num_threads=TF_INTRA_OP_THREADS)
+
+    tf = import_tensorflow()
+    if USE_RAW_SIGNATURE:
+        inference = lazy_import('inference')
+        if RAW_SERVING_SIGNATURE in inference.saved_model_signatures(model_path):
+            loaded_model = tf.saved_model.load(model_path)
+            new_engine = inference.RawSignatureEngine(
+                loaded_model.signatures[RAW_SERVING_SIGNATURE], NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+            )
+            logger.info(f"Inference engine: {new_engine.name} (signature '{RAW_SERVING_SIGNATURE}')")
+            return loaded_model, new_engine
+
+    loaded_model = tf.keras.models.load_model(model_path)
+    return loaded_model, build_engine(loaded_model)
+
+def categorical_vocab_sizes():
+    """Jumlah indeks kategorikal dari preprocessing (spec jika ada, selain itu mapping sederhana)"""
+    if os.path.exists(PREPROCESSING_SPEC_PATH):
+        return vocab_sizes_from_spec(load_spec(PREPROCESSING_SPEC_PATH), transformed_name)
+    return {
+        transformed_name(feature): max(mapping.values()) + 1
+        for feature, mapping in CATEGORICAL_MAPPING.items()
+    }
+
+class ServingState:
+    """
+    Snapshot model + preprocessing yang sedang aktif
+    Diganti utuh (satu assignment) saat reload, sehingga request yang
+    sedang berjalan tetap selesai dengan versi lama
+    """
+
+    def __init__(self, version, model_path, model, engine, spec_preprocessor=None,
+                 tf_transform_output=None, transform_layer=None, transform_fn=None, oov_index=0):
+        self.version = version
+        self.model_path = model_path
+        self.model = model
+        self.engine = engine
+        self.spec_preprocessor = spec_preprocessor
+        self.tf_transform_output = tf_transform_output
+        self.transform_layer = transform_layer
+        self.transform_fn = transform_fn
+        # Indeks token di luar vocabulary, sama untuk spec dan mapping sederhana
+        self.oov_index = oov_index
+        # Engine menerima kolom fitur mentah (transform ada di dalam graph model)
+        self.takes_raw_features = getattr(engine, 'takes_raw_features', False)
+        self.batcher = MicroBatcher(
+            engine.predict,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_wait_ms=BATCH_MAX_WAIT_MS,
+            batch_size_metric=BATCH_SIZE,
+            queue_wait_metric=BATCH_QUEUE_WAIT
+        )
+
+def resolve_model_path():
+    """Cari folder versi model terbaru (GCS atau lokal)"""
+    # Cek apakah menggunakan GCS
+    model_bucket = os.environ.get('MODEL_BUCKET')
+    model_blob_prefix = os.environ.get('MODEL_BLOB_PREFIX', 'placement_model/')
+    
+    if model_bucket and GCS_AVAILABLE:
+        # Download model dari GCS ke cache lokal (file yang tidak berubah di-skip)
+        cached_model_dir = download_model_from_gcs(model_bucket, model_blob_prefix)
         
-        if os.path.exists(transform_graph_path):
-            tf_transform_output = tft.TFTransformOutput(transform_graph_path)
-            transform_layer = tf_transform_output.transform_features_layer()
-            logger.info("Transform graph loaded successfully")
+        # Cari folder model (bisa ada subfolder dengan version)
+        # Cek apakah ada subfolder dengan version number
+        subdirs = [d for d in os.listdir(cached_model_dir) 
+                  if os.path.isdir(os.path.join(cached_model_dir, d)) and d.isdigit()]
+        if subdirs:
+            latest_version = sorted(subdirs, key=int)[-1]
+            return os.path.join(cached_model_dir, latest_version)
+        return cached_model_dir
+    
+    # Load dari local path (untuk development)
+    base_path = os.path.join('output', 'serving_model')
+    if os.path.exists(base_path):
+        # Cari folder dengan timestamp terbaru
+        versions = [d for d in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, d))]
+        if versions:
+            latest_version = sorted(versions)[-1]
+            model_path = os.path.join(base_path, latest_version)
         else:
-            logger.warning("Transform graph not found, using simplified preprocessing")
-            tf_transform_output = None
-            transform_layer = None
-            
+            model_path = base_path
+    else:
+        # Fallback
+        model_path = os.environ.get('MODEL_PATH', 'model')
+    
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model path not found: {model_path}")
+    return model_path
+
+def load_preprocessing(oov_index=0):
+    """
+    Load preprocessing: spec NumPy lebih diutamakan daripada transform graph
+    oov_index: indeks token di luar vocabulary untuk spec (lihat categorical_oov_index)
+    Return (spec_preprocessor, tf_transform_output, transform_layer, transform_fn)
+    """
+    if os.path.exists(PREPROCESSING_SPEC_PATH):
+        logger.info(f"Preprocessing spec loaded from {PREPROCESSING_SPEC_PATH}")
+        return SpecPreprocessor.from_file(PREPROCESSING_SPEC_PATH, transformed_name, oov_index), None, None, None
+    
+    # Load transform graph (opsional - untuk production bisa juga dari GCS)
+    if os.path.exists(TRANSFORM_GRAPH_PATH):
+        import_tensorflow()
+        tft = lazy_import('tensorflow_transform')
+        tf_transform_output = tft.TFTransformOutput(TRANSFORM_GRAPH_PATH)
+        transform_layer = tf_transform_output.transform_features_layer()
+        logger.info("Transform graph loaded successfully")
+        return None, tf_transform_output, transform_layer, build_transform_fn(transform_layer)
+    
+    logger.warning("Transform graph not found, using simplified preprocessing")
+    return None, None, None, None
+
+def categorical_oov_index(model_path, engine):
+    """
+    Indeks token di luar vocabulary untuk model ini: OOV_INDEX (sama dengan transform
+    graph) jika model punya baris OOV per fitur ('fused'), selain itu 0 seperti sebelumnya
+    """
+    engine_oov_index = getattr(engine, 'oov_index', None)
+    if engine_oov_index is not None:
+        return engine_oov_index
+    return OOV_INDEX if saved_model_has_oov_rows(model_path) else 0
+
+def load_state(model_path):
+    """Load model, engine dan preprocessing ke ServingState baru, lalu warm up"""
+    load_started = time.perf_counter()
+    
+    logger.info(f"Loading model from: {model_path}")
+    loaded_model, new_engine = load_serving_model(model_path)
+    preprocessing_started = time.perf_counter()
+    oov_index = 0
+    if getattr(new_engine, 'takes_raw_features', False):
+        # Transform graph sudah ada di dalam signature model
+        preprocessing = (None, None, None, None)
+    else:
+        oov_index = categorical_oov_index(model_path, new_engine)
+        preprocessing = load_preprocessing(oov_index)
+    TRANSFORM_LOAD_DURATION.set(time.perf_counter() - preprocessing_started)
+    state = ServingState(
+        os.path.basename(os.path.normpath(model_path)),
+        model_path,
+        loaded_model,
+        new_engine,
+        *preprocessing,
+        oov_index=oov_index
+    )
+    
+    # Warm up: satu prediksi penuh sebelum state dipakai request
+    warmup_record = {feature: 50.0 for feature in NUMERICAL_FEATURES}
+    for feature in CATEGORICAL_FEATURES:
+        warmup_record[feature] = next(iter(CATEGORICAL_MAPPING[feature]))
+    state.engine.predict(preprocess_columns(records_to_columns([warmup_record]), state))
+    
+    MODEL_LOAD_DURATION.set(time.perf_counter() - load_started)
+    return state
+
+def activate_state(state):
+    """Pasang ServingState baru secara atomik dan tutup batcher versi lama"""
+    global serving_state, model, engine, model_version
+    global tf_transform_output, transform_layer, transform_fn, spec_preprocessor
+    
+    previous = serving_state
+    serving_state = state
+    
+    model = state.model
+    engine = state.engine
+    model_version = state.version
+    tf_transform_output = state.tf_transform_output
+    transform_layer = state.transform_layer
+    transform_fn = state.transform_fn
+    spec_preprocessor = state.spec_preprocessor
+    prediction_cache.set_version(state.version)
+    
+    if previous is not None:
+        previous.batcher.close()
+        if previous.version != state.version:
+            # Di mode multiprocess remove() tidak menghapus nilai di file mmap
+            MODEL_ACTIVE_VERSION.labels(version=previous.version).set(0)
+            try:
+                MODEL_ACTIVE_VERSION.remove(previous.version)
+            except KeyError:
+                pass
+    MODEL_ACTIVE_VERSION.labels(version=state.version).set(1)
+    logger.info(f"Serving model version: {state.version}")
+
+def load_model_and_transform():
+    """Load model dan transform graph"""
+    try:
+        state = load_state(resolve_model_path())
+        activate_state(state)
+        logger.info("Model loaded successfully")
+        return state
     except Exception as e:
         logger.error(f"Error loading model/transform: {str(e)}")
         raise
 
-def preprocess_input_simple(data):
+def ensure_model_loaded():
+    """Load model jika belum ter-load (aman dipanggil dari banyak thread)"""
+    if serving_state is not None:
+        return
+    with _load_lock:
+        if serving_state is None:
+            load_model_and_transform()
+
+def _load_in_background():
+    try:
+        ensure_model_loaded()
+        logger.info("Model loaded successfully in background")
+    except Exception as e:
+        logger.warning(f"Background model loading failed: {str(e)}. Model will be loaded on first request")
+
+def reload_model_if_changed():
     """
-    Simplified preprocessing untuk demo
-    Dalam production, gunakan transform graph yang benar
+    Load versi model terbaru jika berbeda dari yang aktif
+    Load + warm up dilakukan di luar jalur request, lalu di-swap atomik
     """
-    inputs = {}
+    current = serving_state
+    if current is None:
+        # Load pertama ditangani oleh startup / ensure_model_loaded
+        return False
+    model_path = resolve_model_path()
+    if os.path.abspath(model_path) == os.path.abspath(current.model_path):
+        return False
     
+    logger.info(f"New model version detected: {model_path}")
+    reload_started = time.perf_counter()
+    try:
+        state = load_state(model_path)
+    except Exception:
+        MODEL_RELOADS.labels(result='failed').inc()
+        raise
+    with _load_lock:
+        activate_state(state)
+    MODEL_RELOAD_DURATION.set(time.perf_counter() - reload_started)
+    MODEL_RELOADS.labels(result='success').inc()
+    return True
+
+def _watch_model_versions():
+    while True:
+        time.sleep(MODEL_POLL_INTERVAL)
+        try:
+            reload_model_if_changed()
+        except Exception as e:
+            logger.warning(f"Model reload failed: {str(e)}")
+
+def run_inference(inputs, state=None):
+    """Jalankan forward pass untuk satu batch input"""
+    state = state or serving_state
+    return state.engine.predict(inputs)
+
+def predict_inputs(inputs, state=None):
+    """Prediksi lewat micro-batcher (jika aktif)"""
+    state = state or serving_state
+    if BATCH_MAX_SIZE > 1:
+        return state.batcher.submit(inputs)
+    return state.engine.predict(inputs)
+
+# Categorical features - simplified (dalam production perlu vocabulary mapping)
+# Untuk demo, kita gunakan index sederhana
+CATEGORICAL_MAPPING = {
+    'gender': {'M': 0, 'F': 1},
+    'ssc_b': {'Central': 0, 'Others': 1},
+    'hsc_b': {'Central': 0, 'Others': 1},
+    'hsc_s': {'Commerce': 0, 'Science': 1, 'Arts': 2},
+    'degree_t': {'Comm&Mgmt': 0, 'Sci&Tech': 1, 'Others': 2},
+    'workex': {'No': 0, 'Yes': 1},
+    'specialisation': {'Mkt&Fin': 0, 'Mkt&HR': 1}
+}
+
+def validate_records(records):
+    """
+    Validasi banyak record sekaligus
+    Return list error per record: {'index': i, 'message': ...}
+    """
+    required_fields = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+    errors = []
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'message': 'Record must be a JSON object'})
+            continue
+        missing_fields = [field for field in required_fields if field not in record]
+        if missing_fields:
+            errors.append({
+                'index': index,
+                'message': f'Missing required fields: {", ".join(missing_fields)}'
+            })
+            continue
+        for feature in NUMERICAL_FEATURES:
+            message = numeric_field_error(feature, record[feature])
+            if message is not None:
+                errors.append({'index': index, 'message': message})
+                break
+    return errors
+
+def numeric_field_error(feature, value):
+    """
+    Cek satu nilai fitur numerik
+    Return pesan error, atau None jika nilai adalah angka berhingga (bukan bool)
+    """
+    if isinstance(value, bool):
+        return f'Field {feature} must be numeric'
+    try:
+        number = float(value)
+    except OverflowError:
+        # Integer JSON yang terlalu besar untuk float
+        return f'Field {feature} must be a finite number'
+    except (TypeError, ValueError):
+        return f'Field {feature} must be numeric'
+    if not math.isfinite(number):
+        return f'Field {feature} must be a finite number'
+    return None
+
+def records_to_columns(records):
+    """Ubah list record mentah menjadi satu array kolom (n, 1) per fitur"""
+    columns = {}
+    for feature in NUMERICAL_FEATURES:
+        columns[feature] = np.array(
+            [record.get(feature, 0) for record in records], dtype=np.float32
+        ).reshape(-1, 1)
+
+    for feature in CATEGORICAL_FEATURES:
+        columns[feature] = np.array(
+            [record.get(feature, '') for record in records], dtype=object
+        ).reshape(-1, 1)
+    return columns
+
+def preprocess_columns_simple(columns, state=None):
+    """
+    Simplified preprocessing untuk input kolom (batch)
+    Jika preprocessing spec tersedia, pakai statistik asli dari transform graph
+    """
+    state = state or serving_state
+    if state is not None and state.spec_preprocessor is not None:
+        return state.spec_preprocessor.transform(columns)
+
+    inputs = {}
+
     # Normalize numerical features (simplified - asumsi range 0-100)
     for feature in NUMERICAL_FEATURES:
-        value = float(data.get(feature, 0))
-        # Scale to [0, 1] - simplified version
-        normalized = value / 100.0
-        inputs[transformed_name(feature)] = np.array([[normalized]], dtype=np.float32)
-    
-    # Categorical features - simplified (dalam production perlu vocabulary mapping)
-    # Untuk demo, kita gunakan index sederhana
-    categorical_mapping = {
-        'gender': {'M': 0, 'F': 1},
-        'ssc_b': {'Central': 0, 'Others': 1},
-        'hsc_b': {'Central': 0, 'Others': 1},
-        'hsc_s': {'Commerce': 0, 'Science': 1, 'Arts': 2},
-        'degree_t': {'Comm&Mgmt': 0, 'Sci&Tech': 1, 'Others': 2},
-        'workex': {'No': 0, 'Yes': 1},
-        'specialisation': {'Mkt&Fin': 0, 'Mkt&HR': 1}
-    }
-    
+        inputs[transformed_name(feature)] = (
+            columns[feature].astype(np.float32) / np.float32(100.0)
+        )
+
+    # Mapping dilakukan per nilai unik, bukan per baris
+    # Kategori tidak dikenal memakai indeks OOV model (lihat categorical_oov_index)
+    oov_index = state.oov_index if state is not None else 0
     for feature in CATEGORICAL_FEATURES:
-        value = data.get(feature, '')
-        if feature in categorical_mapping and value in categorical_mapping[feature]:
-            mapped_value = categorical_mapping[feature][value]
-        else:
-            mapped_value = 0
-        inputs[transformed_name(feature)] = np.array([[mapped_value]], dtype=np.int64)
-    
+        mapping = CATEGORICAL_MAPPING.get(feature, {})
+        if isinstance(columns[feature], DictionaryColumn):
+            inputs[transformed_name(feature)] = columns[feature].map(mapping, oov_index)
+            continue
+        uniques, inverse = np.unique(columns[feature].astype(str), return_inverse=True)
+        lookup = np.array([mapping.get(value, oov_index) for value in uniques], dtype=np.int64)
+        inputs[transformed_name(feature)] = lookup[inverse].reshape(-1, 1)
+
     return inputs
 
-def preprocess_with_transform(data):
-    """Preprocess menggunakan transform graph (jika tersedia)"""
-    if transform_layer is None:
-        return preprocess_input_simple(data)
-    
+def preprocess_columns_with_transform(columns, state=None):
+    """
+    Preprocess input kolom menggunakan transform graph (traced)
+    Return tensor *_xf tanpa konversi balik ke NumPy
+    """
+    state = state or serving_state
+    tf = import_tensorflow()
+    raw_features = {}
+    for feature in NUMERICAL_FEATURES:
+        raw_features[feature] = tf.convert_to_tensor(columns[feature], dtype=tf.float32)
+
+    for feature in CATEGORICAL_FEATURES:
+        raw_features[feature] = tf.convert_to_tensor(columns[feature].astype(str), dtype=tf.string)
+
+    return state.transform_fn(raw_features)
+
+def preprocess_columns(columns, state=None):
+    """Preprocess batch, pakai transform graph jika tersedia"""
+    state = state or serving_state
+    if state is not None and state.takes_raw_features:
+        return columns
+    if state is None or state.transform_fn is None:
+        return preprocess_columns_simple(columns, state)
+
     try:
-        # Buat feature dict dari raw input
-        raw_features = {}
-        for feature in NUMERICAL_FEATURES:
-            raw_features[feature] = tf.constant([[float(data.get(feature, 0))]], dtype=tf.float32)
-        
-        for feature in CATEGORICAL_FEATURES:
-            raw_features[feature] = tf.constant([[data.get(feature, '')]], dtype=tf.string)
-        
-        # Apply transform
-        transformed = transform_layer(raw_features)
-        
-        # Convert ke format yang dibutuhkan model
-        inputs = {}
-        for feature in NUMERICAL_FEATURES:
-            inputs[transformed_name(feature)] = transformed[transformed_name(feature)].numpy()
-        
-        for feature in CATEGORICAL_FEATURES:
-            inputs[transformed_name(feature)] = transformed[transformed_name(feature)].numpy()
-        
-        return inputs
+        return preprocess_columns_with_transform(columns, state)
     except Exception as e:
         logger.warning(f"Transform failed, using simple preprocessing: {str(e)}")
-        return preprocess_input_simple(data)
+        PREPROCESS_FALLBACKS.inc()
+        return preprocess_columns_simple(columns, state)
+
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_SIZE,
+    NUMERICAL_FEATURES,
+    CATEGORICAL_FEATURES,
+    hits_metric=CACHE_HITS,
+    misses_metric=CACHE_MISSES,
+    evictions_metric=CACHE_EVICTIONS
+)
+
+def preprocess_input_simple(data, state=None):
+    """
+    Simplified preprocessing untuk demo
+    Dalam production, gunakan transform graph yang benar
+    """
+    return preprocess_columns_simple(records_to_columns([data]), state)
+
+def preprocess_with_transform(data, state=None):
+    """Preprocess menggunakan transform graph (jika tersedia)"""
+    return preprocess_columns(records_to_columns([data]), state)
+
+def find_missing_fields(data):
+    """Fitur input yang tidak ada di record"""
+    return [field for field in NUMERICAL_FEATURES + CATEGORICAL_FEATURES if field not in data]
+
+def score_record(data, state):
+    """Probabilitas placement untuk satu record (cek cache, preprocess, predict)"""
+    # Cek cache sebelum preprocessing dan inference
+    version = state.version
+    if prediction_cache.enabled:
+        cache_key = prediction_cache.make_key(data)
+        probability = prediction_cache.get(cache_key, version)
+        if probability is not None:
+            return probability
+    
+    # Preprocess input
+    with STAGE_LATENCY.labels(endpoint='/predict', stage='preprocess').time():
+        inputs = preprocess_with_transform(data, state)
+    
+    # Predict (digabung dengan request konkuren lain oleh batcher)
+    with STAGE_LATENCY.labels(endpoint='/predict', stage='inference').time():
+        prediction = predict_inputs(inputs, state)
+    probability = float(prediction[0][0])
+    if prediction_cache.enabled:
+        prediction_cache.put(cache_key, version, probability)
+    return probability
+
+def prediction_response(probability):
+    """Body response /predict dan catat metrik prediksi"""
+    result = "Placed" if probability > 0.5 else "Not Placed"
+    PREDICTION_COUNT.labels(prediction_class=result).inc()
+    PREDICTION_PROBABILITY.labels(prediction_class=result).observe(probability)
+    return {
+        'status': 'success',
+        'prediction': result,
+        'probability': round(probability, 4),
+        'confidence': round(abs(probability - 0.5) * 2, 4)
+    }
+
+def health_status():
+    """Status model untuk endpoint /health"""
+    state = serving_state
+    return {
+        'status': 'healthy',
+        'model_loaded': state is not None,
+        'model_version': state.version if state is not None else None,
+        'transform_loaded': state is not None and (
+            state.transform_layer is not None or state.spec_preprocessor is not None
+            or state.takes_raw_features
+        )
+    }
+
+def admin_token(get_header):
+    """Token dari header X-Admin-Token atau Authorization: Bearer <token>"""
+    token = get_header('X-Admin-Token')
+    if not token:
+        authorization = get_header('Authorization') or ''
+        if authorization.lower().startswith('bearer '):
+            token = authorization[7:].strip()
+    return token or ''
+
+def profile_request(args, token):
+    """
+    Jalankan sampling profiler untuk /admin/profile
+    args: seconds (default 10), interval_ms (default 10), tf=1 untuk trace TF profiler
+    Return (status, body bytes, content type)
+    """
+    def error(status, message):
+        return status, json.dumps({'status': 'error', 'message': message}).encode('utf-8'), 'application/json'
+
+    if not ADMIN_TOKEN:
+        return error(404, 'Not found')
+    if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return error(403, 'Invalid admin token')
+
+    try:
+        seconds = float(args.get('seconds', 10))
+        interval = float(args.get('interval_ms', 10)) / 1000.0
+    except ValueError:
+        return error(400, 'seconds and interval_ms must be numeric')
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        return error(400, f'seconds must be in (0, {PROFILE_MAX_SECONDS:g}]')
+    tf_trace = str(args.get('tf', '')).lower() in ('1', 'true', 'yes')
+    if tf_trace and 'tensorflow' not in sys.modules:
+        return error(400, 'TensorFlow is not loaded in this worker')
+
+    if not _profile_lock.acquire(blocking=False):
+        return error(409, 'A profile is already running in this worker')
+    try:
+        logger.info(f"Profiling worker {os.getpid()} for {seconds:g}s (tf_trace={tf_trace})")
+        collapsed, archive = profiler.profile(seconds, interval, tf_trace)
+    finally:
+        _profile_lock.release()
+
+    if archive is not None:
+        return 200, archive, 'application/zip'
+    return 200, collapsed.encode('utf-8'), 'text/plain; charset=utf-8'
 
 @app.route('/')
 def home():
@@ -452,10 +1073,10 @@ def predict():
     start_time = time.time()
     
     # Lazy load model if not loaded yet
-    global model, transform_layer
-    if model is None:
+    if serving_state is None:
+        MODEL_LAZY_LOADS.labels(endpoint='/predict').inc()
         try:
-            load_model_and_transform()
+            ensure_model_loaded()
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}")
             REQUEST_COUNT.labels(method='POST', endpoint='/predict', status='503').inc()
@@ -464,13 +1085,16 @@ def predict():
                 'message': 'Model not loaded. Please check server logs.'
             }), 503
     
+    # Request ini memakai satu versi model dari awal sampai akhir
+    state = serving_state
+    
     try:
         # Get input data
-        data = request.form.to_dict()
+        with STAGE_LATENCY.labels(endpoint='/predict', stage='parse').time():
+            data = request.form.to_dict()
         
         # Validate required fields
-        required_fields = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
-        missing_fields = [field for field in required_fields if field not in data]
+        missing_fields = find_missing_fields(data)
         if missing_fields:
             REQUEST_COUNT.labels(method='POST', endpoint='/predict', status='400').inc()
             REQUEST_LATENCY.labels(method='POST', endpoint='/predict').observe(time.time() - start_time)
@@ -479,29 +1103,14 @@ def predict():
                 'message': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        # Preprocess input
-        if transform_layer is not None:
-            inputs = preprocess_with_transform(data)
-        else:
-            inputs = preprocess_input_simple(data)
-        
-        # Predict
-        prediction = model.predict(inputs, verbose=0)
-        probability = float(prediction[0][0])
-        result = "Placed" if probability > 0.5 else "Not Placed"
+        probability = score_record(data, state)
+        with STAGE_LATENCY.labels(endpoint='/predict', stage='response').time():
+            response = jsonify(prediction_response(probability))
         
         # Record metrics
         REQUEST_COUNT.labels(method='POST', endpoint='/predict', status='200').inc()
         REQUEST_LATENCY.labels(method='POST', endpoint='/predict').observe(time.time() - start_time)
-        PREDICTION_COUNT.labels(prediction_class=result).inc()
-        PREDICTION_PROBABILITY.labels(prediction_class=result).observe(probability)
-        
-        return jsonify({
-            'status': 'success',
-            'prediction': result,
-            'probability': round(probability, 4),
-            'confidence': round(abs(probability - 0.5) * 2, 4)
-        })
+        return response
     
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}", exc_info=True)
@@ -512,40 +1121,359 @@ def predict():
             'message': str(e)
         }), 500
 
+def record_predictions(probabilities):
+    """Update metrik prediksi untuk satu batch probability, return mask Placed"""
+    placed = probabilities > 0.5
+    num_placed = int(placed.sum())
+    if num_placed:
+        PREDICTION_COUNT.labels(prediction_class="Placed").inc(num_placed)
+    if len(placed) - num_placed:
+        PREDICTION_COUNT.labels(prediction_class="Not Placed").inc(len(placed) - num_placed)
+    # Child histogram dicari sekali per kelas, bukan per record
+    for result, mask in (("Placed", placed), ("Not Placed", ~placed)):
+        histogram = PREDICTION_PROBABILITY.labels(prediction_class=result)
+        for probability in probabilities[mask].tolist():
+            histogram.observe(probability)
+    return placed
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Endpoint untuk prediksi banyak record sekaligus
+    Body JSON (list record) atau payload biner kolumnar (lihat columnar.py);
+    dengan Accept: application/x-npz response berupa array probability float32
+    """
+    start_time = time.time()
+    endpoint = '/predict/batch'
+
+    def error_response(message, status, errors=None):
+        REQUEST_COUNT.labels(method='POST', endpoint=endpoint, status=str(status)).inc()
+        REQUEST_LATENCY.labels(method='POST', endpoint=endpoint).observe(time.time() - start_time)
+        body = {'status': 'error', 'message': message}
+        if errors:
+            body['errors'] = errors[:100]
+        return jsonify(body), status
+
+    # Lazy load model if not loaded yet
+    if serving_state is None:
+        MODEL_LAZY_LOADS.labels(endpoint=endpoint).inc()
+        try:
+            ensure_model_loaded()
+        except Exception as e:
+            logger.error(f"Failed to load model: {str(e)}")
+            return error_response('Model not loaded. Please check server logs.', 503)
+    state = serving_state
+
+    try:
+        columns = None
+        if request.mimetype in COLUMNAR_CONTENT_TYPES or request.mimetype == 'application/octet-stream':
+            # Satu array per fitur, numerik float32 langsung dari buffer body
+            try:
+                with STAGE_LATENCY.labels(endpoint=endpoint, stage='parse').time():
+                    columns = decode_columns(
+                        request.get_data(cache=False), request.mimetype, NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+                    )
+            except ColumnarError as e:
+                return error_response(str(e), 400)
+            count = num_rows(columns)
+            if not count:
+                return error_response('Columnar payload has no rows', 400)
+            if count > BATCH_MAX_RECORDS:
+                return error_response(f'Too many records: {count} > {BATCH_MAX_RECORDS}', 413)
+        else:
+            # Terima {"instances": [...]} atau list record langsung
+            with STAGE_LATENCY.labels(endpoint=endpoint, stage='parse').time():
+                payload = request.get_json(silent=True)
+            records = payload.get('instances') if isinstance(payload, dict) else payload
+            if not isinstance(records, list) or not records:
+                return error_response('Request body must be a non-empty JSON list or {"instances": [...]}', 400)
+            if len(records) > BATCH_MAX_RECORDS:
+                return error_response(f'Too many records: {len(records)} > {BATCH_MAX_RECORDS}', 413)
+
+            errors = validate_records(records)
+            if errors:
+                return error_response(f'{len(errors)} invalid records', 400, errors)
+
+        # Satu input kolom per fitur *_xf, satu kali panggil model
+        with STAGE_LATENCY.labels(endpoint=endpoint, stage='preprocess').time():
+            if columns is None:
+                columns = records_to_columns(records)
+            inputs = preprocess_columns(columns, state)
+        with STAGE_LATENCY.labels(endpoint=endpoint, stage='inference').time():
+            probabilities = np.asarray(predict_inputs(inputs, state), dtype=np.float64).reshape(-1)
+        response_started = time.perf_counter()
+        placed = record_predictions(probabilities)
+
+        if request.accept_mimetypes.best_match(['application/json', NPZ_CONTENT_TYPE]) == NPZ_CONTENT_TYPE:
+            response = Response(encode_probabilities(probabilities), mimetype=NPZ_CONTENT_TYPE)
+        else:
+            rounded_probability = np.round(probabilities, 4).tolist()
+            rounded_confidence = np.round(np.abs(probabilities - 0.5) * 2, 4).tolist()
+            predictions = [
+                {
+                    'prediction': "Placed" if is_placed else "Not Placed",
+                    'probability': probability,
+                    'confidence': confidence
+                }
+                for is_placed, probability, confidence
+                in zip(placed.tolist(), rounded_probability, rounded_confidence)
+            ]
+
+            response = jsonify({
+                'status': 'success',
+                'count': len(predictions),
+                'predictions': predictions
+            })
+        STAGE_LATENCY.labels(endpoint=endpoint, stage='response').observe(time.perf_counter() - response_started)
+        REQUEST_COUNT.labels(method='POST', endpoint=endpoint, status='200').inc()
+        REQUEST_LATENCY.labels(method='POST', endpoint=endpoint).observe(time.time() - start_time)
+        return response
+
+    except Exception as e:
+        logger.error(f"Batch prediction error: {str(e)}", exc_info=True)
+        return error_response(str(e), 500)
+
+def iter_stream_lines(stream, max_line_bytes):
+    """
+    Baca body request baris per baris tanpa menampung seluruh body
+    Return generator (nomor baris, bytes); baris yang lebih panjang dari
+    max_line_bytes dibuang dan dikembalikan sebagai None
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes + 1)
+            yield line_number, None
+            continue
+        yield line_number, line
+
+def score_stream_batch(batch, state, endpoint='/predict/stream'):
+    """
+    Score satu batch [(nomor baris, bytes)] dari /predict/stream
+    Return (hasil NDJSON untuk batch ini, jumlah baris error)
+    """
+    errors = {}
+    records = []
+    with STAGE_LATENCY.labels(endpoint=endpoint, stage='parse').time():
+        for line_number, line in batch:
+            if line is None:
+                errors[line_number] = f'Line exceeds {STREAM_MAX_LINE_BYTES} bytes'
+                continue
+            try:
+                records.append((line_number, json.loads(line)))
+            except ValueError as e:
+                errors[line_number] = f'Invalid JSON: {e}'
+
+    # Validasi per baris: record yang tidak valid hanya menjadi baris error, stream jalan terus
+    for line_number, record in records:
+        try:
+            record_errors = validate_records([record])
+        except Exception as e:
+            record_errors = [{'message': f'Invalid record: {e}'}]
+        if record_errors:
+            errors[line_number] = record_errors[0]['message']
+    valid = [record for line_number, record in records if line_number not in errors]
+
+    probabilities = np.empty(0)
+    if valid:
+        with STAGE_LATENCY.labels(endpoint=endpoint, stage='preprocess').time():
+            inputs = preprocess_columns(records_to_columns(valid), state)
+        with STAGE_LATENCY.labels(endpoint=endpoint, stage='inference').time():
+            probabilities = np.asarray(predict_inputs(inputs, state), dtype=np.float64).reshape(-1)
+        record_predictions(probabilities)
+
+    # Hasil dalam urutan input; input non-finite sudah ditolak validate_records
+    response_started = time.perf_counter()
+    lines = []
+    results = iter(zip(
+        probabilities.tolist(),
+        np.round(probabilities, 4).tolist(),
+        np.round(np.abs(probabilities - 0.5) * 2, 4).tolist()
+    ))
+    for line_number, _ in batch:
+        if line_number in errors:
+            lines.append(json.dumps({'line': line_number, 'error': errors[line_number]}))
+            continue
+        probability, rounded, confidence = next(results)
+        if not math.isfinite(probability):
+            errors[line_number] = 'Model returned a non-finite probability'
+            lines.append(json.dumps({'line': line_number, 'error': errors[line_number]}))
+            continue
+        lines.append(json.dumps({
+            'line': line_number,
+            'prediction': "Placed" if probability > 0.5 else "Not Placed",
+            'probability': rounded,
+            'confidence': confidence
+        }))
+    output = ('\n'.join(lines) + '\n').encode('utf-8')
+    STAGE_LATENCY.labels(endpoint=endpoint, stage='response').observe(time.perf_counter() - response_started)
+    return output, len(errors)
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """
+    Endpoint streaming NDJSON: satu record JSON per baris (body boleh chunked)
+    Record di-score per STREAM_BATCH_SIZE baris dan hasilnya dikirim selama
+    body masih dibaca, sehingga memori worker tidak bergantung pada ukuran
+    body. Setiap baris hasil membawa nomor baris input; baris terakhir
+    {"done": true, ...} menandakan stream selesai lengkap.
+    """
+    start_time = time.time()
+    endpoint = '/predict/stream'
+
+    if serving_state is None:
+        MODEL_LAZY_LOADS.labels(endpoint=endpoint).inc()
+        try:
+            ensure_model_loaded()
+        except Exception as e:
+            logger.error(f"Failed to load model: {str(e)}")
+            REQUEST_COUNT.labels(method='POST', endpoint=endpoint, status='503').inc()
+            return jsonify({'status': 'error', 'message': 'Model not loaded. Please check server logs.'}), 503
+    # State dipakai sampai stream selesai, walaupun ada hot reload di tengah jalan
+    state = serving_state
+    stream = request.stream
+
+    def generate():
+        status = '200'
+        total = failed = 0
+        try:
+            batch = []
+            for line_number, line in iter_stream_lines(stream, STREAM_MAX_LINE_BYTES):
+                if line is not None and not line.strip():
+                    continue
+                batch.append((line_number, line))
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    output, errors = score_stream_batch(batch, state, endpoint)
+                    total, failed = total + len(batch), failed + errors
+                    batch = []
+                    yield output
+            if batch:
+                output, errors = score_stream_batch(batch, state, endpoint)
+                total, failed = total + len(batch), failed + errors
+                yield output
+            yield json.dumps({'done': True, 'count': total, 'errors': failed}).encode('utf-8') + b'\n'
+        except Exception as e:
+            # Status 200 sudah terkirim: error dilaporkan sebagai baris terakhir
+            status = '500'
+            logger.error(f"Stream prediction error after {total} records: {str(e)}", exc_info=True)
+            yield json.dumps({'done': False, 'count': total, 'errors': failed, 'error': str(e)}).encode('utf-8') + b'\n'
+        finally:
+            REQUEST_COUNT.labels(method='POST', endpoint=endpoint, status=status).inc()
+            REQUEST_LATENCY.labels(method='POST', endpoint=endpoint).observe(time.time() - start_time)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        # Proxy (nginx) tidak boleh menahan response sampai selesai
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    )
+
+@app.route('/admin/profile')
+def admin_profile():
+    """Sampling profiler on-demand (butuh ADMIN_TOKEN), return collapsed stacks"""
+    status, body, content_type = profile_request(request.args, admin_token(request.headers.get))
+    REQUEST_COUNT.labels(method='GET', endpoint='/admin/profile', status=str(status)).inc()
+    return body, status, {'Content-Type': content_type}
+
 @app.route('/metrics')
 def metrics():
     """Endpoint untuk Prometheus metrics"""
     REQUEST_COUNT.labels(method='GET', endpoint='/metrics', status='200').inc()
-    return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+    update_memory_metric(WORKER_MEMORY)
+    return metrics_exporter.generate(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
     REQUEST_COUNT.labels(method='GET', endpoint='/health', status='200').inc()
-    status = {
-        'status': 'healthy',
-        'model_loaded': model is not None,
-        'transform_loaded': transform_layer is not None
-    }
+    status = health_status()
     return jsonify(status), 200
 
+APP_IMPORT_DURATION.set(time.perf_counter() - _import_started)
+
+def _report_memory():
+    while True:
+        try:
+            update_memory_metric(WORKER_MEMORY)
+        except Exception as e:
+            logger.warning(f"Failed to update memory metrics: {str(e)}")
+        time.sleep(MEMORY_REPORT_INTERVAL)
+
+def preload_model():
+    """
+    Load model di master gunicorn sebelum fork (MODEL_LOAD_MODE=preload)
+    Hanya jika TensorFlow tidak akan di-import: backend numpy/contribution, dan preprocessing
+    dari spec atau mapping sederhana (tanpa transform graph). Tidak ada thread TensorFlow yang
+    ikut ter-fork, dan array bobot dibagi ke semua worker sebagai halaman copy-on-write
+    """
+    if INFERENCE_BACKEND not in ('numpy', 'contribution'):
+        logger.warning(
+            f"Preload skipped for backend '{INFERENCE_BACKEND}': TensorFlow is not fork-safe, "
+            "model will be loaded in each worker after fork"
+        )
+        return
+    if not os.path.exists(PREPROCESSING_SPEC_PATH) and os.path.exists(TRANSFORM_GRAPH_PATH):
+        logger.warning(
+            f"Preload skipped: preprocessing spec {PREPROCESSING_SPEC_PATH} not found, so preprocessing "
+            f"would import TensorFlow for the transform graph (not fork-safe). Generate the spec with "
+            "transform_spec.py; model will be loaded in each worker after fork"
+        )
+        return
+    try:
+        ensure_model_loaded()
+        # Master tidak melayani request; versi aktif dilaporkan oleh tiap worker
+        MODEL_ACTIVE_VERSION.labels(version=serving_state.version).set(0)
+        logger.info("Model preloaded in master process")
+    except Exception as e:
+        logger.warning(f"Model preload failed: {str(e)}. Workers will load the model after fork")
+
+def start_background_tasks():
+    """
+    Jalankan thread background (load model, hot reload)
+    Thread tidak ikut ter-fork, jadi mode preload memanggil ini di post_fork tiap worker
+    """
+    if MODEL_LOAD_MODE in ('background', 'preload') and serving_state is None:
+        threading.Thread(target=_load_in_background, name='model-loader', daemon=True).start()
+    elif serving_state is not None:
+        # Worker hasil fork (mode preload) memakai model warisan master
+        MODEL_ACTIVE_VERSION.labels(version=serving_state.version).set(1)
+    
+    # Hot reload: cek versi model baru secara berkala di background
+    if MODEL_POLL_INTERVAL > 0:
+        threading.Thread(target=_watch_model_versions, name='model-watcher', daemon=True).start()
+    
+    # Mode multiprocess: /metrics dilayani worker acak, jadi tiap worker lapor memorinya sendiri
+    if metrics_exporter.multiprocess and MEMORY_REPORT_INTERVAL > 0:
+        threading.Thread(target=_report_memory, name='memory-reporter', daemon=True).start()
+
 # Initialize model on startup
 # Note: before_first_request is deprecated in Flask 2.2+
 # We'll load model when app starts instead
 
 # Load model when module is imported (for gunicorn)
-try:
-    load_model_and_transform()
-    logger.info("Model loaded successfully on startup")
-except Exception as e:
-    logger.warning(f"Model loading failed on startup: {str(e)}. App will start but predictions may fail.")
-    logger.warning("This is OK for Heroku if model will be loaded on first request")
+if MODEL_LOAD_MODE == 'eager':
+    try:
+        ensure_model_loaded()
+        logger.info("Model loaded successfully on startup")
+    except Exception as e:
+        logger.warning(f"Model loading failed on startup: {str(e)}. App will start but predictions may fail.")
+        logger.warning("This is OK for Heroku if model will be loaded on first request")
+
+if MODEL_LOAD_MODE == 'preload':
+    preload_model()
+else:
+    start_background_tasks()
 
 if __name__ == '__main__':
     # Load model before starting server (for local development)
-    if model is None:
+    if serving_state is None:
         try:
-            load_model_and_transform()
+            ensure_model_loaded()
         except Exception as e:
             logger.warning(f"Model loading failed: {str(e)}. App will start but predictions may fail.")
     
@@ -0,0 +1,196 @@
+"""
+ASGI entry point untuk Placement Prediction Model
+Koneksi (client lambat, keep-alive) ditangani event loop asyncio,
+inference dijalankan di thread pool terbatas seukuran jumlah CPU.
+Route sama dengan app.py: /predict, /health dan /metrics.
+
+Contoh:
+    uvicorn asgi_app:app --host 0.0.0.0 --port $PORT
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from prometheus_client import CONTENT_TYPE_LATEST
+
+import app as serving
+from process_memory import update_memory_metric
+
+logger = logging.getLogger(__name__)
+
+# Jumlah thread inference (default: jumlah CPU) dan batas request yang
+# boleh diserahkan ke pool; sisanya menunggu di event loop
+INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', os.cpu_count() or 1))
+INFERENCE_MAX_PENDING = int(os.environ.get('INFERENCE_MAX_PENDING', INFERENCE_THREADS * 4))
+
+# Batas ukuran body request /predict
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', 64 * 1024))
+
+inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix='inference')
+
+# Dibuat di dalam event loop yang sedang berjalan (Python 3.9 mengikat semaphore ke loop)
+_inference_slots = None
+
+
+class HTTPError(Exception):
+    """Error yang langsung diubah menjadi response JSON"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def run_in_pool(fn, *args):
+    """Jalankan fungsi blocking di inference pool dengan jumlah antrian terbatas"""
+    global _inference_slots
+    if _inference_slots is None:
+        _inference_slots = asyncio.Semaphore(INFERENCE_MAX_PENDING)
+    async with _inference_slots:
+        return await asyncio.get_running_loop().run_in_executor(inference_pool, fn, *args)
+
+
+async def read_body(receive):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise HTTPError(499, 'Client disconnected')
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f'Request body too large: > {MAX_BODY_BYTES} bytes')
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+def json_response(status, body):
+    return status, json.dumps(body).encode('utf-8'), 'application/json'
+
+
+async def predict(receive, scope):
+    """Endpoint untuk prediksi (form-urlencoded, sama dengan app.py)"""
+    start_time = time.time()
+
+    def finish(status, body):
+        serving.REQUEST_COUNT.labels(method='POST', endpoint='/predict', status=str(status)).inc()
+        serving.REQUEST_LATENCY.labels(method='POST', endpoint='/predict').observe(time.time() - start_time)
+        return json_response(status, body)
+
+    try:
+        body = await read_body(receive)
+        parse_started = time.perf_counter()
+        data = dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+        serving.STAGE_LATENCY.labels(endpoint='/predict', stage='parse').observe(time.perf_counter() - parse_started)
+    except HTTPError as e:
+        return finish(e.status, {'status': 'error', 'message': e.message})
+    except UnicodeDecodeError:
+        return finish(400, {'status': 'error', 'message': 'Request body must be UTF-8 form data'})
+
+    # Lazy load model if not loaded yet
+    if serving.serving_state is None:
+        serving.MODEL_LAZY_LOADS.labels(endpoint='/predict').inc()
+        try:
+            await run_in_pool(serving.ensure_model_loaded)
+        except Exception as e:
+            logger.error(f"Failed to load model: {str(e)}")
+            return finish(503, {'status': 'error', 'message': 'Model not loaded. Please check server logs.'})
+
+    # Request ini memakai satu versi model dari awal sampai akhir
+    state = serving.serving_state
+
+    missing_fields = serving.find_missing_fields(data)
+    if missing_fields:
+        return finish(400, {
+            'status': 'error',
+            'message': f'Missing required fields: {", ".join(missing_fields)}'
+        })
+
+    try:
+        probability = await run_in_pool(serving.score_record, data, state)
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}", exc_info=True)
+        return finish(500, {'status': 'error', 'message': str(e)})
+    with serving.STAGE_LATENCY.labels(endpoint='/predict', stage='response').time():
+        response = finish(200, serving.prediction_response(probability))
+    return response
+
+
+async def health(receive, scope):
+    """Health check endpoint"""
+    serving.REQUEST_COUNT.labels(method='GET', endpoint='/health', status='200').inc()
+    return json_response(200, serving.health_status())
+
+
+async def metrics(receive, scope):
+    """Endpoint untuk Prometheus metrics"""
+    serving.REQUEST_COUNT.labels(method='GET', endpoint='/metrics', status='200').inc()
+    update_memory_metric(serving.WORKER_MEMORY)
+    return 200, serving.metrics_exporter.generate(), CONTENT_TYPE_LATEST
+
+
+async def admin_profile(receive, scope):
+    """Sampling profiler on-demand (butuh ADMIN_TOKEN), return collapsed stacks"""
+    headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+    token = serving.admin_token(lambda name: headers.get(name.lower()))
+    args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+    # Sampler memblokir selama N detik: jalankan di executor default, bukan inference pool
+    result = await asyncio.get_running_loop().run_in_executor(None, serving.profile_request, args, token)
+    serving.REQUEST_COUNT.labels(method='GET', endpoint='/admin/profile', status=str(result[0])).inc()
+    return result
+
+
+ROUTES = {
+    ('POST', '/predict'): predict,
+    ('GET', '/health'): health,
+    ('GET', '/metrics'): metrics,
+    ('GET', '/admin/profile'): admin_profile,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Model sudah mulai di-load saat app.py di-import (MODEL_LOAD_MODE)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            inference_pool.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI callable"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is not None:
+        status, body, content_type = await handler(receive, scope)
+    elif any(path == scope['path'] for _, path in ROUTES):
+        status, body, content_type = json_response(405, {'status': 'error', 'message': 'Method not allowed'})
+    else:
+        status, body, content_type = json_response(404, {'status': 'error', 'message': 'Not found'})
+
+    if status == 499:
+        # Client sudah menutup koneksi, tidak ada yang perlu dikirim
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode('latin-1')),
+            (b'content-length', str(len(body)).encode('latin-1')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,221 @@
+"""
+Batch scoring offline untuk file CSV / JSONL berisi record placement mentah
+File dibaca per chunk dan hasil ditulis langsung, sehingga memori tetap kecil.
+Preprocessing dan model sama dengan app.py.
+
+Contoh:
+    python batch_score.py records.csv --output predictions.csv --chunk-size 4096 --workers 4
+    python batch_score.py records.jsonl --output predictions.jsonl --id-field request_id
+    python batch_score.py envelopes.jsonl --record-field body --id-field request_id
+"""
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Tanpa background loader / hot reload: model di-load eksplisit di load_model()
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+os.environ['MODEL_POLL_INTERVAL'] = '0'
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FIELDS = ['prediction', 'probability', 'confidence', 'error']
+
+_serving = None
+
+
+class InvalidLine(str):
+    """Pesan error untuk baris input yang tidak bisa di-parse menjadi record"""
+
+
+def load_model():
+    """Import app.py dan load model di proses ini (dipanggil sekali per worker)"""
+    global _serving
+    if _serving is None:
+        import app
+        app.ensure_model_loaded()
+        _serving = app
+    return _serving
+
+
+def _file_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_records(path, input_format, record_field=None, id_field=None):
+    """
+    Baca record satu per satu, return generator (id, record)
+    record_field: ambil record dari field ini (dict atau string JSON) pada baris JSONL
+    """
+    with open(path, newline='' if input_format == 'csv' else None, encoding='utf-8') as f:
+        if input_format == 'csv':
+            for row in csv.DictReader(f):
+                yield (row.pop(id_field, None) if id_field else None), row
+            return
+
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield None, InvalidLine(f'Line {line_number}: invalid JSON ({e})')
+                continue
+            if not isinstance(row, dict):
+                yield None, row
+                continue
+            record_id = row.get(id_field) if id_field else None
+            record = row
+            if record_field:
+                record = row.get(record_field)
+                if isinstance(record, str):
+                    try:
+                        record = json.loads(record)
+                    except ValueError:
+                        record = InvalidLine(f'Line {line_number}: field {record_field} is not a JSON record')
+            yield record_id, record
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_chunk(chunk):
+    """
+    Score satu chunk [(id, record), ...]
+    Record yang tidak valid tetap menghasilkan baris output dengan kolom error
+    """
+    serving = load_model()
+    state = serving.serving_state
+    records = [record for _, record in chunk]
+
+    errors = {}
+    for error in serving.validate_records(records):
+        record = records[error['index']]
+        # Baris yang gagal di-parse membawa pesan error-nya sendiri
+        errors[error['index']] = record if isinstance(record, InvalidLine) else error['message']
+
+    valid_indices = [i for i in range(len(records)) if i not in errors]
+    probabilities = np.empty(0)
+    if valid_indices:
+        inputs = serving.preprocess_columns(
+            serving.records_to_columns([records[i] for i in valid_indices]), state
+        )
+        probabilities = np.asarray(state.engine.predict(inputs), dtype=np.float64).reshape(-1)
+
+    results = []
+    valid = iter(zip(probabilities.tolist(), np.round(probabilities, 4).tolist()))
+    for index, (record_id, _) in enumerate(chunk):
+        row = {'id': record_id}
+        if index in errors:
+            row.update(prediction=None, probability=None, confidence=None, error=errors[index])
+        else:
+            probability, rounded = next(valid)
+            row.update(
+                prediction="Placed" if probability > 0.5 else "Not Placed",
+                probability=rounded,
+                confidence=round(abs(probability - 0.5) * 2, 4),
+                error=None
+            )
+        results.append(row)
+    return results
+
+
+class PredictionWriter:
+    """Tulis hasil per chunk ke CSV atau JSONL (flush setiap chunk)"""
+
+    def __init__(self, f, output_format, id_field=None):
+        self.f = f
+        self.output_format = output_format
+        self.id_field = id_field
+        self.fields = ([id_field] if id_field else []) + OUTPUT_FIELDS
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.writer(f)
+            self.csv_writer.writerow(self.fields)
+
+    def write(self, rows):
+        for row in rows:
+            values = ([row['id']] if self.id_field else []) + [row[field] for field in OUTPUT_FIELDS]
+            if self.csv_writer is not None:
+                self.csv_writer.writerow(['' if value is None else value for value in values])
+            else:
+                self.f.write(json.dumps(dict(zip(self.fields, values))) + '\n')
+        self.f.flush()
+
+
+def iter_results(chunks, workers):
+    """Score chunk berurutan; dengan workers > 1 pakai process pool dengan antrian terbatas"""
+    if workers <= 1:
+        load_model()
+        for chunk in chunks:
+            yield score_chunk(chunk)
+        return
+
+    # spawn: model (dan runtime TensorFlow) di-load terpisah di tiap proses
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=load_model) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL file of raw placement records")
+    parser.add_argument('input')
+    parser.add_argument('--output', default='-', help="Output file (.csv or .jsonl), '-' for JSONL on stdout")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (0 = all cores)')
+    parser.add_argument('--id-field', help='Field copied as-is from each input record to the output')
+    parser.add_argument('--record-field', help='JSONL only: read the record from this field (object or JSON string)')
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    input_format = _file_format(args.input, args.input_format)
+    output_format = _file_format(args.output, args.output_format) if args.output != '-' else (args.output_format or 'jsonl')
+    chunks = chunked(read_records(args.input, input_format, args.record_field, args.id_field), args.chunk_size)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    writer = PredictionWriter(output, output_format, args.id_field)
+    start = time.perf_counter()
+    total = failed = 0
+    try:
+        for rows in iter_results(chunks, workers):
+            writer.write(rows)
+            total += len(rows)
+            failed += sum(1 for row in rows if row['error'] is not None)
+            elapsed = time.perf_counter() - start
+            logger.info(f"Scored {total} records ({failed} invalid) in {elapsed:.1f}s, {total / elapsed:.0f} records/s")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if total and failed == total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
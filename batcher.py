@@ -0,0 +1,190 @@
+"""
+Micro-batching scheduler untuk inference
+Menggabungkan request /predict yang datang bersamaan menjadi satu forward pass
+"""
+import os
+import queue
+import threading
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Penanda slot carry-over kosong (None dipakai sebagai sinyal close di antrian)
+_NO_ITEM = object()
+
+
+class _PendingRequest:
+    """Satu request yang menunggu di antrian batcher"""
+
+    __slots__ = ('inputs', 'num_rows', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, inputs, num_rows):
+        self.inputs = inputs
+        self.num_rows = num_rows
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Scheduler yang mengumpulkan request konkuren ke dalam satu batch.
+
+    Setiap request berupa dict {nama_input: array shape (n, 1)}. Worker thread
+    menggabungkan input per key, memanggil `predict_fn` sekali, lalu memotong
+    hasilnya kembali ke masing-masing pemanggil.
+
+    Waktu tunggu bersifat adaptif: jika batch terakhir hanya berisi satu
+    request (traffic rendah), batch langsung dijalankan tanpa menunggu
+    sehingga latency tidak bertambah. Begitu ada traffic konkuren, worker
+    menunggu hingga `max_wait_ms` untuk mengisi batch sampai `max_batch_size`.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=2.0,
+                 batch_size_metric=None, queue_wait_metric=None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batch_size_metric = batch_size_metric
+        self.queue_wait_metric = queue_wait_metric
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._last_batch_requests = 1
+        # Item yang tidak muat di batch sebelumnya; hanya disentuh worker thread
+        self._carry = _NO_ITEM
+
+    def _ensure_worker(self):
+        # Thread dibuat lazy dan dibuat ulang setelah fork (gunicorn worker)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._closed:
+                return
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._carry = _NO_ITEM
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='micro-batcher', daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, inputs):
+        """Kirim satu request dan tunggu hasil prediksinya"""
+        num_rows = len(next(iter(inputs.values())))
+        if num_rows >= self.max_batch_size:
+            # Request yang sudah besar tidak perlu digabung
+            if self.batch_size_metric is not None:
+                self.batch_size_metric.observe(num_rows)
+            return self.predict_fn(inputs)
+
+        self._ensure_worker()
+        pending = _PendingRequest(inputs, num_rows)
+        with self._lock:
+            if self._closed:
+                # Batcher sudah ditutup (model diganti), jalankan langsung
+                return self.predict_fn(inputs)
+            self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        """
+        Tutup batcher: request yang sudah antri tetap diproses,
+        request baru dijalankan langsung tanpa batching
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None and self._pid == os.getpid():
+                self._queue.put(None)
+
+    def _collect(self, first):
+        batch = [first]
+        rows = first.num_rows
+        wait = self.max_wait if self._last_batch_requests > 1 else 0.0
+        deadline = time.perf_counter() + wait
+
+        while rows < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if item is None or rows + item.num_rows > self.max_batch_size:
+                # Jadi awal batch berikutnya (atau sinyal close), tetap di depan item yang antri
+                self._carry = item
+                break
+            batch.append(item)
+            rows += item.num_rows
+        return batch, rows
+
+    def _run(self):
+        while True:
+            if self._carry is not _NO_ITEM:
+                first, self._carry = self._carry, _NO_ITEM
+            else:
+                first = self._queue.get()
+            if first is None:
+                # Close: proses sisa antrian lalu berhenti
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    if item is not None:
+                        self._process([item], item.num_rows)
+
+            batch, rows = self._collect(first)
+            self._last_batch_requests = len(batch)
+            self._process(batch, rows)
+
+    def _process(self, batch, rows):
+        first = batch[0]
+        dispatched_at = time.perf_counter()
+        if self.batch_size_metric is not None:
+            self.batch_size_metric.observe(rows)
+        if self.queue_wait_metric is not None:
+            for item in batch:
+                self.queue_wait_metric.observe(dispatched_at - item.enqueued_at)
+
+        try:
+            if len(batch) == 1:
+                outputs = self.predict_fn(first.inputs)
+            else:
+                merged = {
+                    key: np.concatenate([item.inputs[key] for item in batch], axis=0)
+                    for key in first.inputs
+                }
+                outputs = self.predict_fn(merged)
+            outputs = np.asarray(outputs)
+
+            offset = 0
+            for item in batch:
+                item.result = outputs[offset:offset + item.num_rows]
+                offset += item.num_rows
+        except Exception as e:
+            logger.error(f"Batched inference failed: {str(e)}")
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
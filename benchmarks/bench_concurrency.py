@@ -0,0 +1,177 @@
+"""
+Benchmark /predict pada concurrency tinggi: Flask (gunicorn sync) vs ASGI (uvicorn)
+Client HTTP/1.1 keep-alive ditulis langsung dengan asyncio, opsional ditambah
+client lambat yang mengirim body sedikit demi sedikit.
+
+Contoh:
+    python benchmarks/bench_concurrency.py --concurrency 16 64 256 --duration 10 --slow-clients 8
+"""
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlencode
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_RECORD = {
+    'gender': 'M', 'ssc_p': 67.0, 'ssc_b': 'Others', 'hsc_p': 91.0, 'hsc_b': 'Others',
+    'hsc_s': 'Commerce', 'degree_p': 58.0, 'degree_t': 'Sci&Tech', 'workex': 'No',
+    'etest_p': 55.0, 'specialisation': 'Mkt&HR', 'mba_p': 58.8,
+}
+
+# gunicorn.conf.py di root repo (threads=4, gthread) sengaja tidak dibaca agar
+# baseline benar-benar worker sync satu thread
+SERVERS = {
+    'flask': ['gunicorn', 'app:app', '--config', '/dev/null', '--worker-class', 'sync', '--threads', '1',
+              '--workers', '{workers}', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'asgi_app:app', '--workers', '{workers}', '--host', '127.0.0.1',
+             '--port', '{port}', '--log-level', 'warning', '--no-access-log'],
+}
+
+
+def request_bytes(host, port, body):
+    header = (
+        f"POST /predict HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        f"Content-Type: application/x-www-form-urlencoded\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    )
+    return header.encode('latin-1'), body
+
+
+async def read_response(reader):
+    """Baca satu response, return (status, keep_alive)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip().lower()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') != 'close'
+
+
+async def client(host, port, body, deadline, latencies, errors, trickle_delay=0.0):
+    header, body = request_bytes(host, port, body)
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            if trickle_delay:
+                # Client lambat: kirim body per 16 byte
+                writer.write(header)
+                for i in range(0, len(body), 16):
+                    writer.write(body[i:i + 16])
+                    await writer.drain()
+                    await asyncio.sleep(trickle_delay)
+            else:
+                writer.write(header + body)
+                await writer.drain()
+            status, keep_alive = await read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            errors.append('connection')
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, concurrency, duration, slow_clients, trickle_delay):
+    body = urlencode(SAMPLE_RECORD).encode('utf-8')
+    deadline = time.perf_counter() + duration
+    latencies, slow_latencies, errors = [], [], []
+    tasks = [client(host, port, body, deadline, latencies, errors) for _ in range(concurrency)]
+    tasks += [
+        client(host, port, body, deadline, slow_latencies, errors, trickle_delay)
+        for _ in range(slow_clients)
+    ]
+    await asyncio.gather(*tasks)
+    return np.array(latencies), errors
+
+
+async def wait_until_ready(host, port, timeout):
+    """Tunggu sampai /health melaporkan model sudah ter-load"""
+    deadline = time.perf_counter() + timeout
+    request = f"GET /health HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode('latin-1')
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            if json.loads(response.split(b'\r\n\r\n', 1)[1]).get('model_loaded'):
+                return
+        except (OSError, ValueError, IndexError):
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"Server on port {port} not ready after {timeout}s")
+
+
+def start_server(name, port, workers):
+    command = [part.format(port=port, workers=workers) for part in SERVERS[name]]
+    return subprocess.Popen(command, cwd=ROOT, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['flask', 'asgi'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--trickle-delay', type=float, default=0.05,
+                        help='Delay (s) between 16-byte chunks sent by slow clients')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    print(f"{'server':>6} {'conc':>5} {'slow':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name in args.servers:
+        process = start_server(name, args.port, args.workers)
+        try:
+            asyncio.run(wait_until_ready(host, args.port, args.startup_timeout))
+            for concurrency in args.concurrency:
+                latencies, errors = asyncio.run(run_load(
+                    host, args.port, concurrency, args.duration, args.slow_clients, args.trickle_delay
+                ))
+                if len(latencies):
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                else:
+                    p50 = p99 = float('nan')
+                print(f"{name:>6} {concurrency:>5} {args.slow_clients:>5} {len(latencies) / args.duration:>9.0f} "
+                      f"{p50:>9.2f} {p99:>9.2f} {len(errors):>7}")
+        finally:
+            stop_server(process)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark latency inference: model.predict vs compiled concrete function
+(dan NumPy backend jika numpy_weights.npz tersedia)
+
+Contoh:
+    python benchmarks/bench_inference.py --batch-sizes 1 32 512 --iterations 200
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import KerasPredictEngine, CompiledInferenceEngine  # noqa: E402
+from numpy_backend import NumpyInferenceEngine, NUMPY_WEIGHTS_FILENAME  # noqa: E402
+
+NUMERICAL_INPUTS = ["ssc_p_xf", "hsc_p_xf", "degree_p_xf", "etest_p_xf", "mba_p_xf"]
+CATEGORICAL_INPUTS = [
+    "gender_xf", "ssc_b_xf", "hsc_b_xf", "hsc_s_xf",
+    "degree_t_xf", "workex_xf", "specialisation_xf",
+]
+
+
+def latest_model_dir(base_path):
+    """Folder versi terbaru di bawah output/serving_model"""
+    versions = [d for d in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, d))]
+    return os.path.join(base_path, sorted(versions)[-1])
+
+
+def random_inputs(batch_size, seed=0):
+    rng = np.random.default_rng(seed)
+    inputs = {}
+    for name in NUMERICAL_INPUTS:
+        inputs[name] = rng.random((batch_size, 1), dtype=np.float32)
+    for name in CATEGORICAL_INPUTS:
+        inputs[name] = rng.integers(0, 2, size=(batch_size, 1), dtype=np.int64)
+    return inputs
+
+
+def time_engine(engine, inputs, iterations, warmup=10):
+    for _ in range(warmup):
+        engine.predict(inputs)
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        engine.predict(inputs)
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 512])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    model_dir = args.model_dir or latest_model_dir(os.path.join('output', 'serving_model'))
+    model = tf.keras.models.load_model(model_dir)
+    engines = [
+        KerasPredictEngine(model),
+        CompiledInferenceEngine(model, NUMERICAL_INPUTS, CATEGORICAL_INPUTS),
+    ]
+    weights_path = os.path.join(model_dir, NUMPY_WEIGHTS_FILENAME)
+    if os.path.exists(weights_path):
+        engines.append(NumpyInferenceEngine(weights_path))
+
+    print(f"model: {model_dir}")
+    print(f"{'batch':>6} {'engine':>9} {'p50 ms':>9} {'p99 ms':>9} {'rows/s':>11} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        inputs = random_inputs(batch_size)
+        baseline_p50 = None
+        for engine in engines:
+            timings = time_engine(engine, inputs, args.iterations)
+            p50, p99 = np.percentile(timings, [50, 99]) * 1000
+            rows_per_sec = batch_size / timings.mean()
+            if baseline_p50 is None:
+                baseline_p50 = p50
+            print(f"{batch_size:>6} {engine.name:>9} {p50:>9.3f} {p99:>9.3f} "
+                  f"{rows_per_sec:>11.0f} {baseline_p50 / p50:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
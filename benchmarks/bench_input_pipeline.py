@@ -0,0 +1,71 @@
+"""
+Benchmark throughput input_fn (examples/detik) atas output Transform
+Membandingkan konfigurasi tf.data: perilaku lama (1 reader, 2 parser),
+baca/parse paralel, sloppy ordering, dan cache hasil decode.
+
+Contoh:
+    python benchmarks/bench_input_pipeline.py \\
+        --transform-graph output/bertrandcorneliussia-pipeline/Transform/transform_graph/6 \\
+        --examples "output/bertrandcorneliussia-pipeline/Transform/transformed_examples/6/Split-train/*" \\
+        --steps 500
+"""
+import os
+import sys
+import time
+import argparse
+
+import tensorflow as tf
+import tensorflow_transform as tft
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules'))
+
+from transform import input_fn  # noqa: E402
+
+# Override INPUT_OPTIONS per konfigurasi
+CONFIGS = {
+    'legacy': {'reader_num_threads': 1, 'parser_num_threads': 2, 'cache': False},
+    'parallel': {},
+    'parallel_sloppy': {'sloppy_ordering': True},
+    'parallel_cache': {'cache': True},
+}
+
+
+def time_pipeline(dataset, steps, batch_size):
+    """Return (detik sampai batch pertama, examples/detik untuk sisa batch)"""
+    iterator = iter(dataset)
+    start = time.perf_counter()
+    next(iterator)
+    first_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        next(iterator)
+    elapsed = time.perf_counter() - start
+    return first_batch, steps * batch_size / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transform-graph', required=True)
+    parser.add_argument('--examples', required=True, help='File pattern of transformed (GZIP) TFRecords')
+    parser.add_argument('--configs', nargs='+', choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--steps', type=int, default=500)
+    args = parser.parse_args()
+
+    tf_transform_output = tft.TFTransformOutput(args.transform_graph)
+    files = tf.io.gfile.glob(args.examples)
+    print(f"files: {len(files)}  batch size: {args.batch_size}  steps: {args.steps}")
+    print(f"{'config':>16} {'first batch s':>14} {'examples/s':>12} {'speedup':>8}")
+
+    baseline = None
+    for name in args.configs:
+        dataset = input_fn(files, tf_transform_output, batch_size=args.batch_size, options=CONFIGS[name])
+        first_batch, examples_per_sec = time_pipeline(dataset, args.steps, args.batch_size)
+        if baseline is None:
+            baseline = examples_per_sec
+        print(f"{name:>16} {first_batch:>14.3f} {examples_per_sec:>12.0f} {examples_per_sec / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
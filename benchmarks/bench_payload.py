@@ -0,0 +1,109 @@
+"""
+Benchmark format payload /predict/batch: JSON vs biner kolumnar (npz, Arrow)
+Request dikirim lewat Flask test client (tanpa jaringan) dengan backend yang
+dipilih lewat INFERENCE_BACKEND; diukur waktu encode di client, latency
+request end-to-end, ukuran body, dan throughput records/detik.
+
+Contoh:
+    INFERENCE_BACKEND=numpy python benchmarks/bench_payload.py --batch-sizes 100 1000 10000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+os.environ['MODEL_POLL_INTERVAL'] = '0'
+
+import app as serving  # noqa: E402
+import client  # noqa: E402
+from columnar import NPZ_CONTENT_TYPE, decode_probabilities  # noqa: E402
+
+
+def sample_records(batch_size, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(batch_size):
+        record = {feature: round(float(rng.uniform(40, 100)), 2) for feature in serving.NUMERICAL_FEATURES}
+        for feature in serving.CATEGORICAL_FEATURES:
+            values = list(serving.CATEGORICAL_MAPPING[feature])
+            record[feature] = values[rng.integers(len(values))]
+        records.append(record)
+    return records
+
+
+def payload_formats():
+    """{nama: (fungsi encode kolom -> body, content type, Accept)}"""
+    formats = {
+        'json': (lambda records, columns: json.dumps(records).encode(), 'application/json', 'application/json'),
+    }
+    for name, (content_type, encode) in client.ENCODERS.items():
+        try:
+            encode(client.records_to_columns(sample_records(1)), serving.NUMERICAL_FEATURES, serving.CATEGORICAL_FEATURES)
+        except ValueError:
+            continue  # Arrow tanpa pyarrow
+        formats[name] = (
+            lambda records, columns, encode=encode: encode(
+                columns, serving.NUMERICAL_FEATURES, serving.CATEGORICAL_FEATURES
+            ),
+            content_type,
+            NPZ_CONTENT_TYPE,
+        )
+    return formats
+
+
+def median_ms(fn, iterations):
+    fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    serving.ensure_model_loaded()
+    test_client = serving.app.test_client()
+    formats = payload_formats()
+    print(f"engine: {serving.serving_state.engine.name}  formats: {', '.join(formats)}")
+    print(f"{'batch':>6} {'format':>7} {'body KB':>9} {'encode ms':>10} {'request ms':>11} {'records/s':>10} {'speedup':>8}")
+
+    for batch_size in args.batch_sizes:
+        records = sample_records(batch_size)
+        columns = client.records_to_columns(records)
+        baseline = None
+        for name, (encode, content_type, accept) in formats.items():
+            body = encode(records, columns)
+
+            def post():
+                response = test_client.post(
+                    '/predict/batch', data=body, content_type=content_type, headers={'Accept': accept}
+                )
+                assert response.status_code == 200, response.data[:200]
+                if response.mimetype == NPZ_CONTENT_TYPE:
+                    decode_probabilities(response.data)
+                else:
+                    response.get_json()
+
+            encode_ms = median_ms(lambda: encode(records, columns), args.iterations)
+            request_ms = median_ms(post, args.iterations)
+            if baseline is None:
+                baseline = request_ms
+            print(f"{batch_size:>6} {name:>7} {len(body) / 1024:>9.1f} {encode_ms:>10.2f} {request_ms:>11.2f} "
+                  f"{batch_size / request_ms * 1000:>10.0f} {baseline / request_ms:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
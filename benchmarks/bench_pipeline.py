@@ -0,0 +1,270 @@
+"""
+Micro-benchmark per tahap pipeline serving (in-process, tanpa HTTP)
+Tahap: parse form/JSON, preprocessing (simple, spec, transform graph),
+inference per backend, dan serialisasi JSON response.
+
+Semua tahap diukur beberapa putaran (--repeats) bergantian, p50 yang dilaporkan
+adalah median p50 antar putaran. Hasil bisa disimpan sebagai baseline lalu
+dibandingkan pada run berikutnya; exit code 1 jika ada tahap yang median p50-nya
+lebih lambat dari threshold dan selisihnya lebih besar dari noise antar putaran.
+Baseline bergantung pada mesin, buat ulang saat pindah hardware.
+
+Contoh:
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline_pipeline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline_pipeline.json --threshold 0.2
+    # Tanpa TensorFlow (baseline yang di-commit dibuat dengan ini)
+    INFERENCE_BACKEND=numpy python benchmarks/bench_pipeline.py --engines numpy contribution \
+        --baseline benchmarks/baseline_pipeline.json
+"""
+import os
+import sys
+import json
+import time
+import types
+import platform
+import argparse
+from urllib.parse import urlencode
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Model di-load eksplisit di bawah, tanpa thread background dan cache prediksi
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+os.environ['MODEL_POLL_INTERVAL'] = '0'
+
+import app as serving  # noqa: E402
+from numpy_backend import NumpyInferenceEngine, NUMPY_WEIGHTS_FILENAME  # noqa: E402
+from contribution_table import ContributionTableEngine  # noqa: E402
+
+ENGINES = ['keras', 'compiled', 'numpy', 'contribution']
+
+
+def sample_records(batch_size, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(batch_size):
+        record = {feature: round(float(rng.uniform(40, 100)), 2) for feature in serving.NUMERICAL_FEATURES}
+        for feature in serving.CATEGORICAL_FEATURES:
+            values = list(serving.CATEGORICAL_MAPPING[feature])
+            record[feature] = values[rng.integers(len(values))]
+        records.append(record)
+    return records
+
+
+def time_stage(fn, iterations, max_seconds, warmup=3):
+    """Jalankan fn sampai `iterations` kali atau `max_seconds` (minimal 5 kali)"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if len(timings) >= 5 and time.perf_counter() > deadline:
+            break
+    return np.array(timings)
+
+
+def load_engines(model_dir, names):
+    engines = {}
+    weights_path = os.path.join(model_dir, NUMPY_WEIGHTS_FILENAME)
+    if os.path.exists(weights_path):
+        if 'numpy' in names:
+            engines['numpy'] = NumpyInferenceEngine(weights_path)
+        if 'contribution' in names:
+            engines['contribution'] = ContributionTableEngine(weights_path, serving.categorical_vocab_sizes())
+    if 'keras' in names or 'compiled' in names:
+        tf = serving.import_tensorflow()
+        from inference import KerasPredictEngine, CompiledInferenceEngine
+        model = tf.keras.models.load_model(model_dir)
+        if 'keras' in names:
+            engines['keras'] = KerasPredictEngine(model)
+        if 'compiled' in names:
+            engines['compiled'] = CompiledInferenceEngine(
+                model,
+                [serving.transformed_name(f) for f in serving.NUMERICAL_FEATURES],
+                [serving.transformed_name(f) for f in serving.CATEGORICAL_FEATURES]
+            )
+    return {name: engines[name] for name in ENGINES if name in engines}
+
+
+def build_stages(batch_size, records, preprocessing, engines):
+    """Return {nama_tahap: fungsi tanpa argumen} untuk satu ukuran batch"""
+    flask_app = serving.app
+    stages = {}
+
+    if batch_size == 1:
+        form_body = urlencode(records[0])
+
+        def form_parse():
+            with flask_app.test_request_context('/predict', method='POST', data=form_body,
+                                                content_type='application/x-www-form-urlencoded'):
+                serving.request.form.to_dict()
+        stages['form_parse'] = form_parse
+
+    json_body = json.dumps({'instances': records})
+
+    def json_parse():
+        with flask_app.test_request_context('/predict/batch', method='POST', data=json_body,
+                                            content_type='application/json'):
+            serving.request.get_json()
+    stages['json_parse'] = json_parse
+
+    # Preprocessing termasuk records_to_columns, sama seperti di endpoint
+    without_spec = types.SimpleNamespace(spec_preprocessor=None, transform_fn=None, oov_index=0)
+    stages['preprocess_simple'] = lambda: serving.preprocess_columns_simple(
+        serving.records_to_columns(records), without_spec
+    )
+    if preprocessing.spec_preprocessor is not None:
+        stages['preprocess_spec'] = lambda: preprocessing.spec_preprocessor.transform(
+            serving.records_to_columns(records)
+        )
+    if preprocessing.transform_fn is not None:
+        stages['preprocess_transform'] = lambda: serving.preprocess_columns_with_transform(
+            serving.records_to_columns(records), preprocessing
+        )
+
+    inputs = serving.preprocess_columns_simple(serving.records_to_columns(records), preprocessing)
+    for name, engine in engines.items():
+        stages[f'inference_{name}'] = lambda engine=engine: engine.predict(inputs)
+
+    probabilities = np.random.default_rng(0).random(batch_size)
+
+    def json_serialize():
+        placed = probabilities > 0.5
+        predictions = [
+            {
+                'prediction': "Placed" if is_placed else "Not Placed",
+                'probability': probability,
+                'confidence': confidence
+            }
+            for is_placed, probability, confidence in zip(
+                placed.tolist(),
+                np.round(probabilities, 4).tolist(),
+                np.round(np.abs(probabilities - 0.5) * 2, 4).tolist()
+            )
+        ]
+        with flask_app.app_context():
+            serving.jsonify({'status': 'success', 'count': len(predictions), 'predictions': predictions})
+    stages['json_serialize'] = json_serialize
+    return stages
+
+
+def run(args):
+    model_dir = args.model_dir or serving.resolve_model_path()
+    spec_preprocessor, _, _, transform_fn = serving.load_preprocessing()
+    preprocessing = types.SimpleNamespace(spec_preprocessor=spec_preprocessor, transform_fn=transform_fn, oov_index=0)
+    engines = load_engines(model_dir, args.engines)
+
+    stages = {
+        batch_size: build_stages(batch_size, sample_records(batch_size), preprocessing, engines)
+        for batch_size in args.batch_sizes
+    }
+    # Putaran diluar loop tahap: gangguan sesaat (GC, proses lain) hanya mengenai satu putaran
+    samples = {}
+    for _ in range(args.repeats):
+        for batch_size, by_stage in stages.items():
+            for stage, fn in by_stage.items():
+                timings = time_stage(fn, args.iterations, args.max_seconds)
+                samples.setdefault(stage, {}).setdefault(str(batch_size), []).append(timings)
+
+    results = {}
+    for stage, by_batch in samples.items():
+        for batch_size, repeats in by_batch.items():
+            p50s = [float(np.percentile(timings, 50)) * 1000 for timings in repeats]
+            p99s = [float(np.percentile(timings, 99)) * 1000 for timings in repeats]
+            results.setdefault(stage, {})[batch_size] = {
+                'p50_ms': round(float(np.median(p50s)), 4),
+                'p50_repeats_ms': [round(p50, 4) for p50 in p50s],
+                'p99_ms': round(float(np.median(p99s)), 4),
+                'rows_per_sec': round(int(batch_size) / float(np.mean(np.concatenate(repeats))), 1),
+                'iterations': sum(len(timings) for timings in repeats),
+            }
+    return model_dir, results
+
+
+def repeat_spread(entry):
+    """Selisih p50 terbesar dan terkecil antar putaran (0 untuk baseline tanpa putaran)"""
+    p50s = entry.get('p50_repeats_ms') or [entry['p50_ms']]
+    return max(p50s) - min(p50s)
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Return list regresi: median p50 > baseline * (1 + threshold) dan selisihnya lebih
+    besar dari min_delta_ms maupun sebaran p50 antar putaran (baseline + run ini)
+    """
+    regressions = []
+    for stage, by_batch in results.items():
+        for batch_size, current in by_batch.items():
+            previous = baseline.get('results', {}).get(stage, {}).get(batch_size)
+            if previous is None:
+                continue
+            delta = current['p50_ms'] - previous['p50_ms']
+            noise = repeat_spread(previous) + repeat_spread(current)
+            if current['p50_ms'] > previous['p50_ms'] * (1 + threshold) and delta > max(min_delta_ms, noise):
+                regressions.append((stage, batch_size, previous['p50_ms'], current['p50_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 512, 4096])
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--max-seconds', type=float, default=0.5,
+                        help='Time budget per stage, batch size and repeat')
+    parser.add_argument('--repeats', type=int, default=5, help='Interleaved repeats; p50 is the median across repeats')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', help='Write results to this baseline JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative p50 slowdown')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='Ignore p50 changes smaller than this')
+    args = parser.parse_args()
+
+    model_dir, results = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"model: {model_dir}")
+    print(f"{'stage':>22} {'batch':>6} {'p50 ms':>10} {'p99 ms':>10} {'rows/s':>12} {'vs base':>8}")
+    for stage, by_batch in results.items():
+        for batch_size, current in by_batch.items():
+            ratio = ''
+            previous = (baseline or {}).get('results', {}).get(stage, {}).get(batch_size)
+            if previous:
+                ratio = f"{current['p50_ms'] / max(previous['p50_ms'], 1e-9):.2f}x"
+            print(f"{stage:>22} {batch_size:>6} {current['p50_ms']:>10.4f} {current['p99_ms']:>10.4f} "
+                  f"{current['rows_per_sec']:>12.0f} {ratio:>8}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'machine': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'cpu_count': os.cpu_count(),
+                    'inference_backend': serving.INFERENCE_BACKEND,
+                },
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for stage, batch_size, before, after in regressions:
+            print(f"REGRESSION {stage} batch={batch_size}: p50 {before:.4f} ms -> {after:.4f} ms")
+        if regressions:
+            return 1
+        print(f"no regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark wall-clock hyperparameter search tuner_fn
+Membandingkan setup lama (RandomSearch 10 trial x 20 epoch, berurutan) dengan
+Hyperband (trial lemah dihentikan lebih awal) dan Hyperband dengan trial
+paralel di proses worker lokal.
+
+Contoh:
+    python benchmarks/bench_tuner.py \\
+        --transform-graph output/bertrandcorneliussia-pipeline/Transform/transform_graph/6 \\
+        --train-examples "output/bertrandcorneliussia-pipeline/Transform/transformed_examples/6/Split-train/*" \\
+        --eval-examples "output/bertrandcorneliussia-pipeline/Transform/transformed_examples/6/Split-eval/*" \\
+        --workers 4
+"""
+import os
+import sys
+import time
+import types
+import shutil
+import argparse
+import tempfile
+
+import tensorflow as tf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules'))
+
+import tuner  # noqa: E402
+
+# Override TUNER_OPTIONS per setup (parallel_workers diisi dari --workers)
+SETUPS = {
+    'random': {'algorithm': 'random'},
+    'hyperband': {'algorithm': 'hyperband'},
+    'hyperband_parallel': {'algorithm': 'hyperband', 'parallel_workers': None},
+    'random_parallel': {'algorithm': 'random', 'parallel_workers': None},
+}
+
+
+def run_setup(name, args, working_dir):
+    """Return (detik wall-clock, jumlah trial, budget epoch, skor terbaik)"""
+    overrides = {
+        key: (args.workers if value is None else value)
+        for key, value in SETUPS[name].items()
+    }
+    fn_args = types.SimpleNamespace(
+        train_files=tf.io.gfile.glob(args.train_examples),
+        eval_files=tf.io.gfile.glob(args.eval_examples),
+        transform_graph_path=args.transform_graph,
+        train_steps=args.train_steps,
+        eval_steps=args.eval_steps,
+        working_dir=working_dir,
+        custom_config={'tuner_options': overrides},
+    )
+
+    start = time.perf_counter()
+    try:
+        result = tuner.tuner_fn(fn_args)
+        result.tuner.search(**result.fit_kwargs)
+        elapsed = time.perf_counter() - start
+    finally:
+        tuner.stop_local_workers()
+
+    # Oracle dibaca ulang dari disk: di mode paralel trial ditulis oleh worker
+    oracle = result.tuner.oracle
+    oracle.reload()
+    trials = list(oracle.trials.values())
+    # Budget epoch terjadwal (batas atas, early stopping bisa berhenti lebih cepat);
+    # trial hyperband melanjutkan checkpoint dari tuner/initial_epoch
+    epochs = sum(
+        trial.hyperparameters.values.get('tuner/epochs', fn_args.custom_config['tuner_options'].get(
+            'max_epochs', tuner.TUNER_OPTIONS['max_epochs']))
+        - trial.hyperparameters.values.get('tuner/initial_epoch', 0)
+        for trial in trials
+    )
+    best = oracle.get_best_trials(1)
+    best_score = best[0].score if best else float('nan')
+    return elapsed, len(trials), epochs, best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--transform-graph', required=True)
+    parser.add_argument('--train-examples', required=True, help='File pattern of transformed train TFRecords')
+    parser.add_argument('--eval-examples', required=True, help='File pattern of transformed eval TFRecords')
+    parser.add_argument('--train-steps', type=int, default=100)
+    parser.add_argument('--eval-steps', type=int, default=50)
+    parser.add_argument('--setups', nargs='+', choices=list(SETUPS), default=['random', 'hyperband', 'hyperband_parallel'])
+    parser.add_argument('--workers', type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    args = parser.parse_args()
+
+    print(f"train steps: {args.train_steps}  eval steps: {args.eval_steps}  workers: {args.workers}")
+    print(f"{'setup':>20} {'wall-clock s':>13} {'trials':>7} {'epoch budget':>13} {'best val acc':>13} {'speedup':>8}")
+
+    baseline = None
+    for name in args.setups:
+        working_dir = tempfile.mkdtemp(prefix=f'tuner_{name}_')
+        try:
+            elapsed, trials, epochs, best_score = run_setup(name, args, working_dir)
+        finally:
+            shutil.rmtree(working_dir, ignore_errors=True)
+        if baseline is None:
+            baseline = elapsed
+        print(f"{name:>20} {elapsed:>13.1f} {trials:>7} {epochs:>13} {best_score:>13.4f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
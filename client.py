@@ -0,0 +1,288 @@
+"""
+Client bulk scoring untuk /predict/batch dan /predict/stream
+- /predict/batch: record dikirim per chunk sebagai .npz (atau Arrow IPC jika
+  pyarrow terpasang), response diminta sebagai array probability float32,
+  sehingga tidak ada encode/decode JSON per record di kedua sisi.
+- /predict/stream: seluruh file dikirim lewat satu koneksi sebagai body NDJSON
+  chunked, hasil dibaca selama body masih dikirim (memori tetap kecil).
+
+Contoh:
+    python client.py http://localhost:8080/predict/batch records.csv --output predictions.csv
+    python client.py http://localhost:8080/predict/batch records.jsonl --format arrow --chunk-size 8192
+    python client.py http://localhost:8080/predict/stream records.jsonl --stream --output predictions.jsonl
+
+Dari kode:
+    from client import BatchClient, stream_records
+    probabilities = BatchClient('http://localhost:8080/predict/batch').score_columns(columns)
+    for result in stream_records('http://localhost:8080/predict/stream', records):
+        ...
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+
+import numpy as np
+
+from columnar import (
+    NPZ_CONTENT_TYPE, ARROW_STREAM_CONTENT_TYPE,
+    decode_probabilities, encode_arrow, encode_npz,
+)
+
+logger = logging.getLogger(__name__)
+
+# Harus sama dengan app.py / transform.py
+NUMERICAL_FEATURES = ["ssc_p", "hsc_p", "degree_p", "etest_p", "mba_p"]
+CATEGORICAL_FEATURES = ["gender", "ssc_b", "hsc_b", "hsc_s", "degree_t", "workex", "specialisation"]
+
+ENCODERS = {
+    'npz': (NPZ_CONTENT_TYPE, encode_npz),
+    'arrow': (ARROW_STREAM_CONTENT_TYPE, encode_arrow),
+}
+
+
+class ScoringError(RuntimeError):
+    """Request scoring gagal (status dan pesan dari server)"""
+
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+def records_to_columns(records):
+    """List record mentah -> satu list per fitur (ValueError jika ada field yang kurang)"""
+    columns = {}
+    for feature in NUMERICAL_FEATURES:
+        columns[feature] = np.array([float(record[feature]) for record in records], dtype=np.float32)
+    for feature in CATEGORICAL_FEATURES:
+        columns[feature] = [str(record[feature]) for record in records]
+    return columns
+
+
+class BatchClient:
+    """
+    Kirim kolom ke /predict/batch, return probability float32 (n,)
+    Kolom lebih dari max_rows dipecah menjadi beberapa request.
+    """
+
+    def __init__(self, url, payload_format='npz', timeout=60.0, max_rows=10000):
+        if payload_format not in ENCODERS:
+            raise ValueError(f"Unknown payload format: {payload_format}")
+        self.url = url
+        self.content_type, self.encode = ENCODERS[payload_format]
+        self.timeout = timeout
+        self.max_rows = max_rows
+
+    def _post(self, body):
+        request = urllib.request.Request(self.url, data=body, method='POST', headers={
+            'Content-Type': self.content_type,
+            'Accept': NPZ_CONTENT_TYPE,
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return decode_probabilities(response.read())
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', errors='replace')
+            try:
+                detail = json.loads(detail).get('message', detail)
+            except ValueError:
+                pass
+            raise ScoringError(e.code, detail)
+
+    def score_columns(self, columns):
+        num_rows = len(columns[NUMERICAL_FEATURES[0]])
+        results = []
+        for start in range(0, num_rows, self.max_rows):
+            chunk = {name: values[start:start + self.max_rows] for name, values in columns.items()}
+            results.append(self._post(self.encode(chunk, NUMERICAL_FEATURES, CATEGORICAL_FEATURES)))
+        return np.concatenate(results) if results else np.empty(0, dtype=np.float32)
+
+    def score_records(self, records):
+        return self.score_columns(records_to_columns(records))
+
+
+def stream_records(url, records, timeout=None, chunk_bytes=64 * 1024):
+    """
+    Kirim iterable record ke /predict/stream, return generator hasil per record
+    Body dikirim chunked dari thread terpisah sementara response dibaca, sehingga
+    server bisa menulis hasil sebelum seluruh input terkirim. Record ke-i
+    dikirim sebagai baris ke-i; ScoringError jika stream tidak selesai lengkap.
+    """
+    parts = urllib.parse.urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=timeout)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    connection.putrequest('POST', path or '/')
+    connection.putheader('Content-Type', 'application/x-ndjson')
+    connection.putheader('Transfer-Encoding', 'chunked')
+    connection.putheader('Accept', 'application/x-ndjson')
+    connection.endheaders()
+
+    send_error = []
+
+    def send_chunk(data):
+        connection.send(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def send():
+        try:
+            buffer, size = [], 0
+            for record in records:
+                line = json.dumps(record).encode('utf-8') + b'\n'
+                buffer.append(line)
+                size += len(line)
+                if size >= chunk_bytes:
+                    send_chunk(b''.join(buffer))
+                    buffer, size = [], 0
+            if buffer:
+                send_chunk(b''.join(buffer))
+            connection.send(b'0\r\n\r\n')
+        except Exception as e:
+            send_error.append(e)
+
+    sender = threading.Thread(target=send, name='stream-sender', daemon=True)
+    sender.start()
+    try:
+        response = connection.getresponse()
+        if response.status != 200:
+            detail = response.read().decode('utf-8', errors='replace')
+            try:
+                detail = json.loads(detail).get('message', detail)
+            except ValueError:
+                pass
+            raise ScoringError(response.status, detail)
+
+        for line in response:
+            result = json.loads(line)
+            if 'done' in result:
+                if not result['done']:
+                    raise ScoringError(500, result.get('error', 'stream failed'))
+                break
+            yield result
+        else:
+            raise ScoringError(response.status, 'stream ended before the final line')
+        sender.join()
+        if send_error:
+            raise send_error[0]
+    finally:
+        connection.close()
+
+
+def score_file_batches(client, chunks, invalid_line_type):
+    """Score chunk [(id, record)] lewat /predict/batch, return generator baris output per chunk"""
+    for chunk in chunks:
+        # Record yang tidak bisa dikodekan ditulis dengan kolom error, sisanya dikirim
+        errors = {}
+        for index, (_, record) in enumerate(chunk):
+            if isinstance(record, invalid_line_type) or not isinstance(record, dict):
+                errors[index] = record if isinstance(record, invalid_line_type) else 'Record must be a JSON object'
+                continue
+            try:
+                records_to_columns([record])
+            except (KeyError, TypeError, ValueError) as e:
+                errors[index] = f'Invalid record: {e!r}'
+        valid = [record for index, (_, record) in enumerate(chunk) if index not in errors]
+        probabilities = iter(client.score_records(valid).astype(np.float64).tolist() if valid else [])
+
+        rows = []
+        for index, (record_id, _) in enumerate(chunk):
+            row = {'id': record_id}
+            if index in errors:
+                row.update(prediction=None, probability=None, confidence=None, error=errors[index])
+            else:
+                probability = next(probabilities)
+                row.update(
+                    prediction="Placed" if probability > 0.5 else "Not Placed",
+                    probability=round(probability, 4),
+                    confidence=round(abs(probability - 0.5) * 2, 4),
+                    error=None
+                )
+            rows.append(row)
+        yield rows
+
+
+def score_file_stream(url, items, invalid_line_type, timeout=None, rows_per_write=4096):
+    """
+    Score semua (id, record) lewat satu request /predict/stream
+    Id (dan error parse lokal) antri di deque selama record-nya sedang dikirim
+    """
+    pending = deque()
+
+    def records():
+        for record_id, record in items:
+            local_error = record if isinstance(record, invalid_line_type) else None
+            pending.append((record_id, local_error))
+            # Baris tidak valid tetap dikirim agar nomor baris tetap sejajar
+            yield None if local_error is not None else record
+
+    rows = []
+    for result in stream_records(url, records(), timeout):
+        record_id, local_error = pending.popleft()
+        row = {'id': record_id, 'prediction': None, 'probability': None, 'confidence': None, 'error': None}
+        if local_error is not None or 'error' in result:
+            row['error'] = local_error or result['error']
+        else:
+            row.update(
+                prediction=result['prediction'],
+                probability=result['probability'],
+                confidence=result['confidence']
+            )
+        rows.append(row)
+        if len(rows) >= rows_per_write:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+def main():
+    from batch_score import InvalidLine, PredictionWriter, _file_format, chunked, read_records
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL file through /predict/batch or /predict/stream")
+    parser.add_argument('url', help='URL of the /predict/batch (or, with --stream, /predict/stream) endpoint')
+    parser.add_argument('input')
+    parser.add_argument('--output', default='-', help="Output file (.csv or .jsonl), '-' for JSONL on stdout")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--format', choices=sorted(ENCODERS), default='npz', help='Request payload format')
+    parser.add_argument('--stream', action='store_true', help='Send the whole file as one NDJSON stream')
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--id-field', help='Field copied as-is from each input record to the output')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    input_format = _file_format(args.input, args.input_format)
+    output_format = _file_format(args.output, args.output_format) if args.output != '-' else (args.output_format or 'jsonl')
+    items = read_records(args.input, input_format, id_field=args.id_field)
+    if args.stream:
+        results = score_file_stream(args.url, items, InvalidLine, args.timeout, args.chunk_size)
+    else:
+        client = BatchClient(args.url, args.format, args.timeout, max_rows=args.chunk_size)
+        results = score_file_batches(client, chunked(items, args.chunk_size), InvalidLine)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    writer = PredictionWriter(output, output_format, args.id_field)
+    start = time.perf_counter()
+    total = failed = 0
+    try:
+        for rows in results:
+            writer.write(rows)
+            total += len(rows)
+            failed += sum(1 for row in rows if row['error'] is not None)
+            elapsed = time.perf_counter() - start
+            logger.info(f"Scored {total} records ({failed} invalid) in {elapsed:.1f}s, {total / elapsed:.0f} records/s")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if total and failed == total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
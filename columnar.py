@@ -0,0 +1,410 @@
+"""
+Format request biner kolumnar untuk bulk scoring /predict/batch
+Decode JSON per record lebih mahal daripada model-nya sendiri; di sini satu
+request berisi satu array per fitur:
+
+- application/x-npz: file .npz (np.savez), satu entry per fitur. Fitur
+  kategorikal dikirim dictionary-encoded: `<fitur>` berisi kode int dan
+  `<fitur>__vocab` berisi string untuk setiap kode.
+- application/x-npy: satu structured array .npy (field = fitur)
+- application/vnd.apache.arrow.stream / .file: Arrow IPC, jika pyarrow terpasang
+  (kolom kategorikal sebaiknya bertipe dictionary)
+
+Entry .npz yang tidak dikompresi (np.savez) dan kolom Arrow dibaca langsung
+dari buffer body request tanpa copy; kolom numerik float32 dipakai apa adanya.
+
+Contoh:
+    python client.py http://localhost:8080/predict/batch records.csv --output predictions.csv
+"""
+import io
+import zlib
+import struct
+import zipfile
+import tokenize
+
+import numpy as np
+
+NPZ_CONTENT_TYPE = 'application/x-npz'
+NPY_CONTENT_TYPE = 'application/x-npy'
+ARROW_STREAM_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_FILE_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+CONTENT_TYPES = (NPZ_CONTENT_TYPE, NPY_CONTENT_TYPE, ARROW_STREAM_CONTENT_TYPE, ARROW_FILE_CONTENT_TYPE)
+
+# Suffix entry vocabulary untuk kolom kategorikal dictionary-encoded
+VOCAB_SUFFIX = '__vocab'
+
+_NPY_MAGIC = b'\x93NUMPY'
+_ZIP_MAGIC = b'PK\x03\x04'
+_ARROW_FILE_MAGIC = b'ARROW1'
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+# Error dari parser .npy / zip / Arrow untuk payload rusak: kesalahan client (400)
+DECODE_ERRORS = (
+    ValueError, TypeError, SyntaxError, KeyError, IndexError, EOFError, NotImplementedError,
+    tokenize.TokenError, struct.error, zlib.error, zipfile.BadZipFile, zipfile.LargeZipFile,
+)
+
+
+class ColumnarError(ValueError):
+    """Payload kolumnar tidak valid (dikembalikan sebagai HTTP 400)"""
+
+
+class DictionaryColumn:
+    """
+    Kolom kategorikal dictionary-encoded: kode int (n,) dan vocabulary string
+
+    Preprocessing cukup memetakan vocabulary (beberapa nilai) sekali lalu
+    indexing dengan kode; astype/__array__ menghasilkan kolom string (n, 1)
+    untuk jalur yang butuh string (transform graph, signature serving_raw).
+    """
+
+    def __init__(self, codes, vocabulary):
+        self.codes = codes
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __array__(self, dtype=None):
+        values = np.asarray(self.vocabulary, dtype=object)[self.codes].reshape(-1, 1)
+        return values if dtype is None else values.astype(dtype)
+
+    def astype(self, dtype):
+        return self.__array__(dtype)
+
+    def map(self, mapping, default):
+        """Indeks model per baris: mapping {token: indeks} diterapkan ke vocabulary saja"""
+        lookup = np.array([mapping.get(str(token), default) for token in self.vocabulary], dtype=np.int64)
+        return lookup[self.codes].reshape(-1, 1)
+
+
+def sniff_content_type(body):
+    """Tebak format dari magic bytes (untuk application/octet-stream)"""
+    head = bytes(body[:8])
+    if head.startswith(_ZIP_MAGIC):
+        return NPZ_CONTENT_TYPE
+    if head.startswith(_NPY_MAGIC):
+        return NPY_CONTENT_TYPE
+    if head.startswith(_ARROW_FILE_MAGIC):
+        return ARROW_FILE_CONTENT_TYPE
+    if head.startswith(b'\xff\xff\xff\xff'):
+        return ARROW_STREAM_CONTENT_TYPE
+    return None
+
+
+def load_npy(buffer, offset=0):
+    """
+    Array .npy yang dimulai di `offset` dalam buffer, tanpa copy data
+    Return None jika header tidak bisa dibaca langsung (pakai np.load)
+    """
+    view = memoryview(buffer)
+    if bytes(view[offset:offset + 6]) != _NPY_MAGIC:
+        raise ColumnarError('Invalid .npy data')
+    major = view[offset + 6]
+    if major == 1:
+        (header_length,) = struct.unpack_from('<H', view, offset + 8)
+        data_offset = offset + 10 + header_length
+        read_header = np.lib.format.read_array_header_1_0
+    elif major == 2:
+        (header_length,) = struct.unpack_from('<I', view, offset + 8)
+        data_offset = offset + 12 + header_length
+        read_header = np.lib.format.read_array_header_2_0
+    else:
+        return None
+
+    header = io.BytesIO(bytes(view[offset + 8:data_offset]))
+    shape, fortran_order, dtype = read_header(header)
+    if dtype.hasobject:
+        raise ColumnarError('Object arrays are not accepted')
+    if fortran_order and len(shape) > 1:
+        return None
+    count = int(np.prod(shape, dtype=np.int64))
+    if data_offset + count * dtype.itemsize > len(view):
+        raise ColumnarError('Truncated .npy data')
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=data_offset).reshape(shape)
+
+
+def load_npz(body):
+    """Semua entry .npz; entry tanpa kompresi berupa view ke body"""
+    arrays = {}
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(body))
+    except zipfile.BadZipFile as e:
+        raise ColumnarError(f'Invalid .npz payload: {e}')
+    with archive:
+        for info in archive.infolist():
+            if info.flag_bits & 0x1:
+                raise ColumnarError(f'Invalid .npz payload: entry {info.filename} is encrypted')
+            # np.savez / np.savez_compressed hanya menulis stored atau deflate
+            if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                raise ColumnarError(f'Invalid .npz payload: unsupported compression for {info.filename}')
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            array = None
+            if info.compress_type == zipfile.ZIP_STORED:
+                fields = _ZIP_LOCAL_HEADER.unpack_from(body, info.header_offset)
+                if fields[0] != _ZIP_MAGIC:
+                    raise ColumnarError('Invalid .npz payload: bad local file header')
+                name_length, extra_length = fields[-2:]
+                array = load_npy(body, info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length)
+            if array is None:
+                # Entry terkompresi (np.savez_compressed): decompress + copy
+                with archive.open(info) as f:
+                    array = np.lib.format.read_array(f, allow_pickle=False)
+            arrays[name] = array
+    return arrays
+
+
+def load_structured_npy(body):
+    """Structured array .npy: satu view per field, field string jadi kolom kategorikal"""
+    array = load_npy(body)
+    if array is None:
+        array = np.lib.format.read_array(io.BytesIO(body), allow_pickle=False)
+    if array.dtype.names is None:
+        raise ColumnarError('.npy payload must be a structured array with one field per feature')
+    return {name: array[name] for name in array.dtype.names}
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ColumnarError('Arrow payloads require pyarrow, which is not installed on this server')
+    return pa
+
+
+def load_arrow(body, file_format=False):
+    """Kolom tabel Arrow IPC; kolom dictionary menjadi pasangan kode + vocabulary"""
+    pa = import_pyarrow()
+    buffer = pa.py_buffer(body)
+    try:
+        reader = pa.ipc.open_file(buffer) if file_format else pa.ipc.open_stream(buffer)
+        table = reader.read_all()
+        # Reader IPC tidak memvalidasi offset/buffer; data rusak bisa crash di native code
+        table.validate(full=True)
+        table = table.unify_dictionaries()
+    except (pa.ArrowException, OSError) as e:
+        raise ColumnarError(f'Invalid Arrow payload: {e}')
+
+    arrays = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if column.null_count:
+            raise ColumnarError(f'Column {name} contains nulls')
+        array = column.combine_chunks()
+        if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+            array = array.dictionary_encode()
+        if pa.types.is_dictionary(array.type):
+            arrays[name] = array.indices.to_numpy(zero_copy_only=False)
+            arrays[name + VOCAB_SUFFIX] = array.dictionary.to_numpy(zero_copy_only=False)
+        else:
+            arrays[name] = array.to_numpy(zero_copy_only=False)
+    return arrays
+
+
+def load_arrays(body, content_type):
+    """
+    Decode body menjadi {nama entry: array} sesuai content type
+    Semua error parsing dari payload rusak dilaporkan sebagai ColumnarError
+    """
+    try:
+        return _load_arrays(body, content_type)
+    except ColumnarError:
+        raise
+    except DECODE_ERRORS as e:
+        raise ColumnarError(f'Malformed columnar payload: {type(e).__name__}: {e}') from e
+
+
+def _load_arrays(body, content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type not in CONTENT_TYPES:
+        content_type = sniff_content_type(body)
+    if content_type == NPZ_CONTENT_TYPE:
+        return load_npz(body)
+    if content_type == NPY_CONTENT_TYPE:
+        return load_structured_npy(body)
+    if content_type in (ARROW_STREAM_CONTENT_TYPE, ARROW_FILE_CONTENT_TYPE):
+        return load_arrow(body, file_format=content_type == ARROW_FILE_CONTENT_TYPE)
+    raise ColumnarError(f'Unsupported columnar content type, expected one of: {", ".join(CONTENT_TYPES)}')
+
+
+def columns_from_arrays(arrays, numerical_features, categorical_features):
+    """
+    Validasi array hasil decode dan ubah menjadi kolom untuk preprocess_columns
+    Numerik: float32 (n, 1), view jika sudah float32. Kategorikal: DictionaryColumn.
+    """
+    missing = [
+        feature for feature in list(numerical_features) + list(categorical_features)
+        if feature not in arrays
+    ]
+    if missing:
+        raise ColumnarError(f'Missing required columns: {", ".join(missing)}')
+
+    columns = {}
+    for feature in numerical_features:
+        values = arrays[feature]
+        if values.ndim > 2 or (values.ndim == 2 and values.shape[1] != 1):
+            raise ColumnarError(f'Column {feature} must be 1-D, got shape {values.shape}')
+        if values.dtype.kind not in 'biuf':
+            raise ColumnarError(f'Column {feature} must be numeric, got {values.dtype}')
+        column = values.astype(np.float32, copy=False).reshape(-1, 1)
+        # Aturan sama dengan input JSON (validate_records): NaN/inf ditolak, termasuk float64 di luar range float32
+        non_finite = np.flatnonzero(~np.isfinite(column))
+        if non_finite.size:
+            raise ColumnarError(
+                f'Column {feature} must contain finite numbers, got {column[non_finite[0], 0]} at row {non_finite[0]}'
+            )
+        columns[feature] = column
+
+    for feature in categorical_features:
+        values = arrays[feature].reshape(-1)
+        vocabulary = arrays.get(feature + VOCAB_SUFFIX)
+        if vocabulary is None:
+            if values.dtype.kind not in 'USO':
+                raise ColumnarError(f'Column {feature} needs string values or codes plus {feature}{VOCAB_SUFFIX}')
+            vocabulary, values = np.unique(values.astype(str), return_inverse=True)
+        elif values.dtype.kind not in 'iu':
+            raise ColumnarError(f'Column {feature} codes must be integers, got {values.dtype}')
+        elif len(values) and (values.min() < 0 or values.max() >= len(vocabulary)):
+            raise ColumnarError(f'Column {feature} has codes outside {feature}{VOCAB_SUFFIX}')
+        if vocabulary.dtype.kind == 'S':
+            vocabulary = np.char.decode(vocabulary, 'utf-8')
+        columns[feature] = DictionaryColumn(values, vocabulary)
+
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ColumnarError(f'Columns have different lengths: {sorted(lengths)}')
+    return columns
+
+
+def decode_columns(body, content_type, numerical_features, categorical_features):
+    arrays = load_arrays(body, content_type)
+    try:
+        return columns_from_arrays(arrays, numerical_features, categorical_features)
+    except ColumnarError:
+        raise
+    except (ValueError, TypeError, IndexError) as e:
+        raise ColumnarError(f'Invalid columnar payload: {type(e).__name__}: {e}') from e
+
+
+def num_rows(columns):
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def encode_arrays(columns, numerical_features, categorical_features):
+    """
+    Kolom mentah (list / array per fitur) -> array untuk dikirim
+    Numerik float32, kategorikal kode int32 + vocabulary string
+    """
+    arrays = {}
+    for feature in numerical_features:
+        arrays[feature] = np.ascontiguousarray(np.asarray(columns[feature], dtype=np.float32).reshape(-1))
+    for feature in categorical_features:
+        column = columns[feature]
+        if isinstance(column, DictionaryColumn):
+            vocabulary, codes = np.asarray(column.vocabulary).astype(str), column.codes
+        else:
+            vocabulary, codes = np.unique(np.asarray(column).reshape(-1).astype(str), return_inverse=True)
+        arrays[feature] = codes.astype(np.int32)
+        arrays[feature + VOCAB_SUFFIX] = vocabulary
+    return arrays
+
+
+def encode_npz(columns, numerical_features, categorical_features):
+    """Payload application/x-npz (tanpa kompresi, sehingga server bisa baca tanpa copy)"""
+    buffer = io.BytesIO()
+    np.savez(buffer, **encode_arrays(columns, numerical_features, categorical_features))
+    return buffer.getvalue()
+
+
+def encode_arrow(columns, numerical_features, categorical_features):
+    """Payload Arrow IPC stream dengan kolom kategorikal bertipe dictionary"""
+    pa = import_pyarrow()
+    arrays = encode_arrays(columns, numerical_features, categorical_features)
+    fields = {feature: pa.array(arrays[feature]) for feature in numerical_features}
+    for feature in categorical_features:
+        fields[feature] = pa.DictionaryArray.from_arrays(
+            pa.array(arrays[feature]), pa.array(arrays[feature + VOCAB_SUFFIX].tolist(), type=pa.string())
+        )
+    table = pa.table(fields)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_probabilities(probabilities):
+    """Response application/x-npz: array `probability` float32"""
+    buffer = io.BytesIO()
+    np.savez(buffer, probability=np.asarray(probabilities, dtype=np.float32).reshape(-1))
+    return buffer.getvalue()
+
+
+def decode_probabilities(body):
+    return load_npz(body)['probability']
+
+
+def malformed_payloads(numerical_features, categorical_features, num_rows=32, seed=0):
+    """Payload rusak yang harus ditolak dengan ColumnarError: {nama kasus: (body, content type)}"""
+    rng = np.random.default_rng(seed)
+    columns = {feature: rng.random(num_rows, dtype=np.float32) * 100 for feature in numerical_features}
+    columns.update({feature: rng.choice(['a', 'b', 'c'], num_rows) for feature in categorical_features})
+    npz = encode_npz(columns, numerical_features, categorical_features)
+
+    dtype = [(feature, '<f4') for feature in numerical_features] + [(feature, 'U4') for feature in categorical_features]
+    buffer = io.BytesIO()
+    np.save(buffer, np.zeros(num_rows, dtype=dtype))
+    npy = buffer.getvalue()
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.array(['a', 1], dtype=object), allow_pickle=True)
+    object_npy = buffer.getvalue()
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **dict(
+        encode_arrays(columns, numerical_features, categorical_features),
+        **{numerical_features[0]: np.array([1.0, 'a'], dtype=object)}
+    ))
+    object_npz_compressed = buffer.getvalue()
+
+    header_end = npy.index(b'\n') + 1
+    cases = {
+        'empty': (b'', NPZ_CONTENT_TYPE),
+        'garbage': (bytes(rng.integers(0, 256, 512, dtype=np.uint8)), NPZ_CONTENT_TYPE),
+        'garbage_octet_stream': (bytes(rng.integers(0, 256, 512, dtype=np.uint8)), 'application/octet-stream'),
+        'npz_truncated': (npz[:len(npz) // 2], NPZ_CONTENT_TYPE),
+        'npz_truncated_end': (npz[:-10], NPZ_CONTENT_TYPE),
+        'npy_truncated_data': (npy[:header_end + 10], NPY_CONTENT_TYPE),
+        'npy_truncated_header': (npy[:20], NPY_CONTENT_TYPE),
+        'npy_bad_header': (npy[:10] + b'{"descr": <f4, ' + npy[25:], NPY_CONTENT_TYPE),
+        'npy_not_structured': (object_npy[:8] + npy[8:10] + b'x' * 10, NPY_CONTENT_TYPE),
+        'npy_object_dtype': (object_npy, NPY_CONTENT_TYPE),
+        'npz_object_dtype_compressed': (object_npz_compressed, NPZ_CONTENT_TYPE),
+    }
+    try:
+        arrow = encode_arrow(columns, numerical_features, categorical_features)
+    except ColumnarError:
+        return cases
+    corrupted = bytearray(arrow)
+    corrupted[len(arrow) // 2:len(arrow) // 2 + 64] = b'\xff' * 64
+    cases.update({
+        'arrow_truncated': (arrow[:len(arrow) // 2], ARROW_STREAM_CONTENT_TYPE),
+        'arrow_corrupted': (bytes(corrupted), ARROW_STREAM_CONTENT_TYPE),
+        'arrow_garbage': (b'\xff\xff\xff\xff' + bytes(rng.integers(0, 256, 512, dtype=np.uint8)), ARROW_STREAM_CONTENT_TYPE),
+    })
+    return cases
+
+
+def check_malformed(numerical_features, categorical_features):
+    """Return {nama kasus: hasil}; hasil 'ColumnarError' berarti payload ditolak dengan benar"""
+    results = {}
+    for name, (body, content_type) in malformed_payloads(numerical_features, categorical_features).items():
+        try:
+            decode_columns(body, content_type, numerical_features, categorical_features)
+            results[name] = 'accepted'
+        except ColumnarError:
+            results[name] = 'ColumnarError'
+        except Exception as e:
+            results[name] = f'{type(e).__name__}: {e}'
+    return results
+
@@ -0,0 +1,217 @@
+"""
+Backend inference dengan tabel kontribusi kategorikal yang dihitung saat load
+7 fitur kategorikal hanya punya 2*2*2*3*3*2*2 = 288 kombinasi, sehingga
+kontribusi semua embedding ke Dense pertama (plus bias) bisa dihitung sekali
+untuk setiap kombinasi. Per request tinggal lookup satu baris tabel, ditambah
+matmul 5 fitur numerik, lalu sisa layer Dense.
+
+Bobot dibaca dari file .npz yang sama dengan numpy_backend.py. Baris dengan
+indeks di luar tabel dihitung dengan jalur NumPy biasa (hasil tetap sama).
+Untuk model 'fused', baris OOV tiap fitur ikut masuk tabel sebagai indeks terakhir.
+
+Contoh:
+    INFERENCE_BACKEND=contribution gunicorn app:app
+    python contribution_table.py check output/serving_model/1762435641 --spec output/preprocessing_spec.json
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+
+import numpy as np
+
+from numpy_backend import NumpyInferenceEngine, NUMPY_WEIGHTS_FILENAME, OOV_INDEX
+from transform_spec import load_spec
+
+logger = logging.getLogger(__name__)
+
+# Batas jumlah kombinasi (baris tabel); 16384 x 128 unit float32 = 8 MB
+MAX_COMBINATIONS = 16384
+
+
+def vocab_sizes_from_spec(spec, transformed_name):
+    """Jumlah indeks yang dihasilkan preprocessing spec per input *_xf"""
+    return {
+        transformed_name(feature): max(info['vocabulary'].values()) + 1
+        for feature, info in spec['categorical'].items()
+        if info['vocabulary']
+    }
+
+
+class ContributionTableEngine:
+    """
+    Forward pass MLP placement dengan kontribusi kategorikal dari tabel
+
+    vocab_sizes: {nama input *_xf: jumlah indeks yang dipakai}; default jumlah
+    baris tabel embedding (cocok untuk model arsitektur 'fused'). Baris OOV
+    (input OOV_INDEX) tidak dihitung di vocab_sizes dan selalu ditambahkan.
+    """
+
+    name = 'contribution'
+
+    def __init__(self, weights_path, vocab_sizes=None, max_combinations=MAX_COMBINATIONS):
+        self.base = NumpyInferenceEngine(weights_path)
+        self.weights_path = weights_path
+        vocab_sizes = vocab_sizes or {}
+
+        kernel, bias, self.first_activation = self.base.layers[0]
+        self.first_kernel, self.first_bias = kernel, bias
+        self.layers = self.base.layers[1:]
+
+        # Pecah baris kernel Dense pertama per segmen input (urutan concatenate)
+        self.numeric_inputs, numeric_rows = [], []
+        self.categorical_inputs, contributions, oov_rows = [], [], []
+        row = 0
+        for name, kind in zip(self.base.input_order, self.base.input_kinds):
+            if kind == 'numeric':
+                self.numeric_inputs.append(name)
+                numeric_rows.append(row)
+                row += 1
+                continue
+            table = self.base.embeddings[name]
+            has_oov_row = name in self.base.oov_inputs
+            vocab_rows = len(table) - 1 if has_oov_row else len(table)
+            size = min(vocab_rows, int(vocab_sizes.get(name, vocab_rows)))
+            rows = np.concatenate([table[:size], table[-1:]]) if has_oov_row else table[:size]
+            self.categorical_inputs.append(name)
+            # Posisi baris OOV di tabel kontribusi, -1 jika fitur tidak punya baris OOV
+            oov_rows.append(size if has_oov_row else -1)
+            contributions.append(rows @ kernel[row:row + table.shape[1]])
+            row += table.shape[1]
+        self.numeric_kernel = kernel[numeric_rows]
+        self.oov_rows = np.array(oov_rows, dtype=np.int64)
+
+        self.sizes = np.array([len(c) for c in contributions], dtype=np.int64)
+        self.vocab_rows = self.sizes - (self.oov_rows >= 0)
+        num_combinations = int(np.prod(self.sizes))
+        if num_combinations > max_combinations:
+            raise ValueError(
+                f"{num_combinations} categorical combinations exceed max_combinations={max_combinations}; "
+                f"pass vocab_sizes for the indices preprocessing actually produces"
+            )
+
+        # Indeks kombinasi row-major: sum(indeks_fitur * stride_fitur)
+        self.strides = np.ones(len(self.sizes), dtype=np.int64)
+        for i in range(len(self.sizes) - 2, -1, -1):
+            self.strides[i] = self.strides[i + 1] * self.sizes[i + 1]
+
+        table = bias.astype(np.float32)
+        for contribution in contributions:
+            table = table[..., np.newaxis, :] + contribution
+        self.table = np.ascontiguousarray(table.reshape(num_combinations, -1), dtype=np.float32)
+        logger.info(f"Contribution table: {num_combinations} combinations x {self.table.shape[1]} units")
+
+    @property
+    def oov_index(self):
+        return self.base.oov_index
+
+    def first_layer(self, inputs):
+        """Pre-activation Dense pertama: tabel kontribusi + matmul numerik"""
+        numerics = np.concatenate(
+            [np.asarray(inputs[name], dtype=np.float32).reshape(-1, 1) for name in self.numeric_inputs], axis=1
+        )
+        indices = np.concatenate(
+            [np.asarray(inputs[name], dtype=np.int64).reshape(-1, 1) for name in self.categorical_inputs], axis=1
+        )
+        is_oov = (indices == OOV_INDEX) & (self.oov_rows >= 0)
+        in_table = np.all(((indices >= 0) & (indices < self.vocab_rows)) | is_oov, axis=1)
+        indices = np.where(is_oov, self.oov_rows, indices)
+
+        x = numerics @ self.numeric_kernel
+        if in_table.all():
+            x += self.table[indices @ self.strides]
+            return x
+
+        # Baris di luar tabel: hitung penuh dari embedding (error jika di luar vocabulary)
+        x[in_table] += self.table[indices[in_table] @ self.strides]
+        outside = {name: np.asarray(value)[~in_table] for name, value in inputs.items()}
+        x[~in_table] = self.base.features(outside) @ self.first_kernel + self.first_bias
+        return x
+
+    def predict(self, inputs):
+        x = self.first_activation(self.first_layer(inputs))
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+
+def random_inputs(engine, num_rows, seed=0):
+    """Input acak: sebagian besar di dalam tabel, sebagian di luar (jalur fallback)"""
+    rng = np.random.default_rng(seed)
+    inputs = {name: rng.random((num_rows, 1), dtype=np.float32) for name in engine.numeric_inputs}
+    for name, size in zip(engine.categorical_inputs, engine.sizes):
+        # Input OOV berupa OOV_INDEX, bukan posisi baris OOV di tabel
+        vocab_rows = len(engine.base.embeddings[name])
+        low = OOV_INDEX if name in engine.base.oov_inputs else 0
+        values = rng.integers(low, size + low, size=num_rows)
+        outside = rng.random(num_rows) < 0.05
+        values[outside] = rng.integers(low, vocab_rows + low, size=int(outside.sum()))
+        inputs[name] = values.reshape(-1, 1).astype(np.int64)
+    return inputs
+
+
+def check_parity(model_dir, weights_path=None, vocab_sizes=None, num_rows=1024, tolerance=1e-5, seed=0):
+    """Bandingkan ContributionTableEngine dengan model TensorFlow penuh"""
+    import tensorflow as tf
+
+    weights_path = weights_path or os.path.join(model_dir, NUMPY_WEIGHTS_FILENAME)
+    engine = ContributionTableEngine(weights_path, vocab_sizes)
+    model = tf.keras.models.load_model(model_dir)
+
+    inputs = random_inputs(engine, num_rows, seed)
+    expected = model({name: tf.constant(value) for name, value in inputs.items()}, training=False).numpy()
+    actual = engine.predict(inputs)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    return max_diff <= tolerance, max_diff, engine
+
+
+def time_predict(engine, inputs, iterations=200):
+    engine.predict(inputs)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        engine.predict(inputs)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Verify the categorical contribution table engine")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help='Check parity with the TensorFlow model and time it')
+    check_parser.add_argument('model_dir')
+    check_parser.add_argument('--weights', default=None)
+    check_parser.add_argument('--spec', default=None, help='Preprocessing spec JSON (vocabulary sizes)')
+    check_parser.add_argument('--rows', type=int, default=1024)
+    check_parser.add_argument('--tolerance', type=float, default=1e-5)
+    args = parser.parse_args()
+
+    vocab_sizes = None
+    if args.spec:
+        vocab_sizes = vocab_sizes_from_spec(load_spec(args.spec), lambda key: key + '_xf')
+
+    ok, max_diff, engine = check_parity(args.model_dir, args.weights, vocab_sizes, args.rows, args.tolerance)
+    print(f"table: {engine.table.shape[0]} combinations x {engine.table.shape[1]} units "
+          f"({engine.table.nbytes / 1024:.0f} KB)")
+    print(f"max abs diff vs TensorFlow: {max_diff:.3e} (tolerance {args.tolerance:.1e}) -> {'OK' if ok else 'FAILED'}")
+
+    print(f"{'batch':>6} {'numpy ms':>10} {'table ms':>10} {'speedup':>8}")
+    for batch_size in (1, 64, 1024):
+        inputs = random_inputs(engine, batch_size, seed=1)
+        # Hanya baris di dalam tabel untuk timing
+        inputs = {
+            name: np.minimum(value, engine.sizes[engine.categorical_inputs.index(name)] - 1 + (
+                OOV_INDEX if name in engine.base.oov_inputs else 0
+            ))
+            if name in engine.categorical_inputs else value
+            for name, value in inputs.items()
+        }
+        numpy_ms = time_predict(engine.base, inputs)
+        table_ms = time_predict(engine, inputs)
+        print(f"{batch_size:>6} {numpy_ms:>10.4f} {table_ms:>10.4f} {numpy_ms / table_ms:>7.2f}x")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Konfigurasi gunicorn (dibaca otomatis dari working directory)
+
+GUNICORN_PRELOAD=1 mengaktifkan mode preload: app.py di-import sekali di master,
+model (backend numpy) di-load sebelum fork, lalu semua worker berbagi halaman
+memori bobot secara copy-on-write. Lihat worker_memory_bytes{kind="pss"} di /metrics.
+
+Preload butuh preprocessing tanpa TensorFlow: output/preprocessing_spec.json
+(PREPROCESSING_SPEC_PATH, dibuat dengan transform_spec.py) atau tidak ada transform
+graph sama sekali (mapping sederhana). Jika transform graph ada tapi spec tidak,
+preload dilewati dan tiap worker me-load model sendiri setelah fork.
+
+Contoh:
+    GUNICORN_PRELOAD=1 WEB_CONCURRENCY=4 INFERENCE_BACKEND=numpy gunicorn app:app
+"""
+import os
+import gc
+import tempfile
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0').lower() in ('1', 'true', 'yes')
+
+if preload_app:
+    os.environ.setdefault('MODEL_LOAD_MODE', 'preload')
+
+# Metrik Prometheus lintas worker: tanpa ini /metrics hanya berisi worker yang kebetulan di-scrape
+# (harus di-set sebelum app.py meng-import prometheus_client)
+if workers > 1:
+    os.environ.setdefault(
+        'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'placement_metrics')
+    )
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+# Bagi core ke worker supaya thread pool TensorFlow tidak saling berebut CPU
+if workers > 1:
+    cpu_per_worker = str(max(1, (os.cpu_count() or 1) // workers))
+    os.environ.setdefault('TF_INTRA_OP_THREADS', cpu_per_worker)
+    os.environ.setdefault('TF_INTER_OP_THREADS', '1')
+
+
+def on_starting(server):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Sisa run sebelumnya; file master sendiri (mode preload) dipertahankan
+        from multiprocess_metrics import clear_directory
+        clear_directory(os.environ['PROMETHEUS_MULTIPROC_DIR'], keep_pid=os.getpid())
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from multiprocess_metrics import mark_process_dead
+        # Worker yang exit sudah dikeluarkan dari server.WORKERS; master ikut menulis metrik (preload)
+        mark_process_dead(worker.pid, live_pids=set(server.WORKERS) | {os.getpid()})
+
+
+def when_ready(server):
+    if preload_app:
+        # Pindahkan objek yang sudah ada ke generasi permanen agar GC di worker
+        # tidak menulis ke header objek (yang akan memicu copy halaman)
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Thread di master tidak ikut ter-fork: jalankan ulang di worker
+        import app
+        app.start_background_tasks()
@@ -0,0 +1,183 @@
+"""
+Cache lokal (content-addressed) untuk file model dari Google Cloud Storage
+File disimpan sekali di objects/<md5>, lalu di-hardlink ke folder model.
+Cocok diletakkan di Railway volume agar restart tidak download ulang.
+Download yang terputus dilanjutkan dari objects/<md5>.part (range request);
+file yang tidak ada lagi di listing GCS dihapus dari folder model.
+"""
+import os
+import time
+import fcntl
+import base64
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# File .part untuk object yang tidak ada di listing dan lebih tua dari ini dihapus
+STALE_PART_SECONDS = 3600
+
+
+def blob_cache_key(blob):
+    """Key isi file: MD5 jika ada, selain itu generation + nama blob"""
+    if blob.md5_hash:
+        return base64.b64decode(blob.md5_hash).hex()
+    name = blob.name.replace('/', '_')
+    return f"gen-{blob.generation}-{name}"
+
+
+def _file_md5(path, chunk_bytes=1024 * 1024):
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cleanup_stale_parts(objects_dir, keep_keys):
+    """Hapus .part lama milik object yang tidak sedang di-sync (.part lain tetap untuk resume)"""
+    now = time.time()
+    for filename in os.listdir(objects_dir):
+        if not filename.endswith('.part') or filename[:-len('.part')] in keep_keys:
+            continue
+        path = os.path.join(objects_dir, filename)
+        try:
+            if now - os.path.getmtime(path) > STALE_PART_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _link_into_tree(object_path, target_path):
+    """Hardlink object ke folder model (copy jika beda filesystem)"""
+    if os.path.exists(target_path) and os.path.samefile(object_path, target_path):
+        return
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    tmp_path = f"{target_path}.{os.getpid()}.{threading.get_ident()}.link"
+    try:
+        os.link(object_path, tmp_path)
+    except OSError:
+        shutil.copy2(object_path, tmp_path)
+    os.replace(tmp_path, target_path)
+
+
+def _prune_tree(target_dir, keep_paths):
+    """Hapus file di folder model yang tidak ada di listing (sisa versi lama), return jumlahnya"""
+    removed = 0
+    for root, dirs, files in os.walk(target_dir, topdown=False):
+        for filename in files:
+            path = os.path.join(root, filename)
+            # *.link: hardlink sementara milik sync lain yang sedang berjalan
+            if filename.endswith('.link') or os.path.relpath(path, target_dir) in keep_paths:
+                continue
+            os.remove(path)
+            removed += 1
+        if root != target_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+class GCSModelCache:
+    """
+    Download prefix GCS secara paralel ke cache lokal yang persisten.
+    File yang MD5/generation-nya sudah ada di cache tidak di-download ulang,
+    download yang terputus dilanjutkan dari byte terakhir di file .part.
+    """
+
+    def __init__(self, cache_dir, max_workers=8, bytes_metric=None,
+                 files_metric=None, duration_metric=None, throughput_metric=None):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.max_workers = max(1, int(max_workers))
+        self.bytes_metric = bytes_metric
+        self.files_metric = files_metric
+        self.duration_metric = duration_metric
+        self.throughput_metric = throughput_metric
+
+    def model_dir(self, bucket_name, blob_prefix):
+        """Folder model yang sudah dimaterialisasi untuk bucket/prefix"""
+        return os.path.join(self.cache_dir, 'models', bucket_name, blob_prefix.strip('/'))
+
+    def _download(self, blob, object_path):
+        """
+        Download blob ke object_path lewat object_path.part, return jumlah byte yang di-download
+        Lock pada file .part membuat thread/proses lain yang butuh object sama menunggu,
+        lalu memakai hasilnya; isi .part yang sudah ada dilanjutkan dengan range request.
+        """
+        part_path = f"{object_path}.part"
+        with open(part_path, 'ab') as part:
+            fcntl.flock(part, fcntl.LOCK_EX)
+            if os.path.exists(object_path) and os.path.getsize(object_path) == blob.size:
+                # Sudah diselesaikan pemegang lock sebelumnya; .part kosong yang baru dibuat dibuang
+                if os.path.exists(part_path) and os.path.getsize(part_path) == 0:
+                    os.remove(part_path)
+                return 0
+
+            # Posisi dari open() bisa basi: pemegang lock sebelumnya mungkin sudah menambah isi .part
+            part.seek(0, os.SEEK_END)
+            offset = part.tell()
+            if offset > blob.size:
+                part.truncate(0)
+                offset = 0
+            if offset < blob.size:
+                logger.info(f"Downloading {blob.name}" + (f" (resuming at {offset} bytes)" if offset else ""))
+                blob.download_to_file(part, start=offset or None)
+                part.flush()
+
+            # Download penuh sudah dicek MD5 oleh library, hasil sambungan dicek di sini
+            if os.path.getsize(part_path) != blob.size or (
+                offset and blob.md5_hash and _file_md5(part_path) != base64.b64decode(blob.md5_hash).hex()
+            ):
+                part.truncate(0)
+                raise IOError(f"Downloaded content of {blob.name} does not match its size/MD5, retry the sync")
+            os.replace(part_path, object_path)
+        return blob.size - offset
+
+    def _fetch(self, blob, blob_prefix, target_dir):
+        object_path = os.path.join(self.objects_dir, blob_cache_key(blob))
+        downloaded = 0
+        if not (os.path.exists(object_path) and os.path.getsize(object_path) == blob.size):
+            downloaded = self._download(blob, object_path)
+        if self.files_metric is not None:
+            self.files_metric.labels(result='downloaded' if downloaded else 'cached').inc()
+        if self.bytes_metric is not None and downloaded:
+            self.bytes_metric.inc(downloaded)
+
+        relative_path = os.path.relpath(blob.name, blob_prefix)
+        _link_into_tree(object_path, os.path.join(target_dir, relative_path))
+        return downloaded
+
+    def sync(self, bucket, blob_prefix, target_dir=None):
+        """
+        Sinkronkan semua blob di bawah prefix ke target_dir
+        File di target_dir yang tidak ada di listing dihapus, sehingga versi baru
+        tidak ikut memuat file sisa versi lama.
+        Return (jumlah file, jumlah byte yang benar-benar di-download)
+        """
+        target_dir = target_dir or self.model_dir(bucket.name, blob_prefix)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(target_dir, exist_ok=True)
+
+        # Skip jika ini adalah direktori kosong
+        blobs = [blob for blob in bucket.list_blobs(prefix=blob_prefix) if not blob.name.endswith('/')]
+        _cleanup_stale_parts(self.objects_dir, {blob_cache_key(blob) for blob in blobs})
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='gcs-download') as pool:
+            downloaded_bytes = sum(pool.map(lambda blob: self._fetch(blob, blob_prefix, target_dir), blobs))
+        duration = time.perf_counter() - start
+        removed = _prune_tree(target_dir, {os.path.relpath(blob.name, blob_prefix) for blob in blobs})
+        if removed:
+            logger.info(f"Removed {removed} local files no longer under gs://{bucket.name}/{blob_prefix}")
+
+        if self.duration_metric is not None:
+            self.duration_metric.set(duration)
+        if self.throughput_metric is not None and downloaded_bytes:
+            self.throughput_metric.set(downloaded_bytes / max(duration, 1e-9))
+        logger.info(
+            f"Synced {len(blobs)} files from GCS ({downloaded_bytes / 1e6:.1f} MB downloaded) in {duration:.2f}s"
+        )
+        return len(blobs), downloaded_bytes
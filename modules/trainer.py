@@ -1,9 +1,13 @@
 
 # Import library
+import os
+import json
+import logging
+import numpy as np
 import tensorflow as tf
 import tensorflow_transform as tft
 from tfx.components.trainer.fn_args_utils import FnArgs
-from typing import Text, Dict, List, Any
+from typing import Text, Dict, List, Any, Optional
 
 # Impor semua fungsi dan variabel dari transform.py
 from transform import (
@@ -12,14 +16,19 @@ from transform import (
     LABEL_KEY,
     transformed_name,
     input_fn,
+    input_options_from,
     VOCAB_SIZE,
+    FusedEmbedding,
+    model_options_from,
+    embedding_vocab_sizes,
     FEATURES_TO_DROP
 )
 
 # ----------------------------------------------------------------
 # 1. FUNGSI MODEL_BUILDER 
 # ----------------------------------------------------------------
-def model_builder(hyperparameters: Dict[Text, Any]) -> tf.keras.Model: 
+def model_builder(hyperparameters: Dict[Text, Any],
+                  vocab_sizes: Optional[Dict[Text, int]] = None) -> tf.keras.Model: 
     
     input_features = []
     numeric_inputs = []
@@ -43,19 +52,27 @@ def model_builder(hyperparameters: Dict[Text, Any]) -> tf.keras.Model:
         input_features.append(input_layer)
         categorical_inputs.append(input_layer)
 
-    embedded_features = []
     embedding_dim = hyperparameters.get('embedding_dim', 8) 
 
-    for input_layer in categorical_inputs:
-        embedding = tf.keras.layers.Embedding(
-            input_dim=VOCAB_SIZE, 
-            output_dim=embedding_dim
-        )(input_layer)
-        flattened_embedding = tf.keras.layers.Flatten()(embedding)
-        embedded_features.append(flattened_embedding)
+    if vocab_sizes:
+        # Arsitektur 'fused': satu tabel seukuran vocabulary asli, satu lookup
+        concatenated_categoricals = FusedEmbedding(
+            [vocab_sizes[key] for key in CATEGORICAL_FEATURES],
+            embedding_dim,
+            name='fused_embedding'
+        )(tf.keras.layers.concatenate(categorical_inputs))
+    else:
+        embedded_features = []
+        for input_layer in categorical_inputs:
+            embedding = tf.keras.layers.Embedding(
+                input_dim=VOCAB_SIZE, 
+                output_dim=embedding_dim
+            )(input_layer)
+            flattened_embedding = tf.keras.layers.Flatten()(embedding)
+            embedded_features.append(flattened_embedding)
+        concatenated_categoricals = tf.keras.layers.concatenate(embedded_features)
     
     concatenated_numerics = tf.keras.layers.concatenate(numeric_inputs)
-    concatenated_categoricals = tf.keras.layers.concatenate(embedded_features)
     concatenate_all = tf.keras.layers.concatenate(
         [concatenated_numerics, concatenated_categoricals]
     )
@@ -83,14 +100,167 @@ def model_builder(hyperparameters: Dict[Text, Any]) -> tf.keras.Model:
 
 
 # ----------------------------------------------------------------
-# 2. FUNGSI RUN_FN (Saving Model Dasar - Syntax Fix)
+# 2. SERVING SIGNATURES
+# ----------------------------------------------------------------
+# Nama signature yang menerima fitur mentah (dipakai app.py jika ada)
+RAW_SERVING_SIGNATURE = 'serving_raw'
+
+def get_serve_transformed_fn(model):
+    """
+    serving_default: input *_xf dan output dengan key nama layer output,
+    kontrak sama seperti signature default Keras (signatures=None)
+    """
+    output_name = model.output_names[0]
+    input_signature = {}
+    for key in NUMERICAL_FEATURES:
+        input_signature[transformed_name(key)] = tf.TensorSpec(
+            shape=(None, 1), dtype=tf.float32, name=transformed_name(key)
+        )
+    for key in CATEGORICAL_FEATURES:
+        input_signature[transformed_name(key)] = tf.TensorSpec(
+            shape=(None, 1), dtype=tf.int64, name=transformed_name(key)
+        )
+
+    @tf.function(input_signature=[input_signature])
+    def serve_transformed_fn(transformed_features):
+        return {output_name: model(transformed_features, training=False)}
+
+    return serve_transformed_fn
+
+def get_serve_raw_fn(model, tf_transform_output):
+    """
+    serving_raw: input fitur mentah (shape (None, 1)), transform TFT dan model
+    dijalankan dalam satu graph sehingga serving cukup satu panggilan
+    """
+    # Key output sama dengan serving_default
+    output_name = model.output_names[0]
+
+    # Layer di-attach ke model agar aset vocabulary ikut tersimpan
+    model.tft_layer = tf_transform_output.transform_features_layer()
+
+    input_signature = {}
+    for key in NUMERICAL_FEATURES:
+        input_signature[key] = tf.TensorSpec(shape=(None, 1), dtype=tf.float32, name=key)
+    for key in CATEGORICAL_FEATURES:
+        input_signature[key] = tf.TensorSpec(shape=(None, 1), dtype=tf.string, name=key)
+
+    @tf.function(input_signature=[input_signature])
+    def serve_raw_fn(raw_features):
+        transformed = model.tft_layer(raw_features)
+        transformed_features = {
+            transformed_name(key): transformed[transformed_name(key)]
+            for key in NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+        }
+        return {output_name: model(transformed_features, training=False)}
+
+    return serve_raw_fn
+
+# ----------------------------------------------------------------
+# 3. EXPORT TFLITE (opsional)
+# ----------------------------------------------------------------
+# Nama file di dalam folder versi model (dibaca tflite_backend.py di serving)
+TFLITE_MODEL_FILENAME = 'model.tflite'
+TFLITE_REPORT_FILENAME = 'tflite_report.json'
+
+# Override lewat custom_config={'tflite_options': {...}}
+TFLITE_OPTIONS = {
+    'quantization': None,      # None: tidak export; 'none' (float32), 'dynamic' atau 'int8'
+    'calibration_steps': 100,  # batch eval split untuk kalibrasi int8
+    'report_steps': 50,        # batch eval split untuk laporan akurasi vs model float
+}
+
+def tflite_options_from(custom_config: Dict[Text, Any]) -> Dict[Text, Any]:
+    """Gabungkan TFLITE_OPTIONS dengan custom_config['tflite_options'] (jika ada)"""
+    options = dict(TFLITE_OPTIONS)
+    options.update((custom_config or {}).get('tflite_options') or {})
+    return options
+
+def _model_inputs(model, features):
+    """Ambil input model (urutan model.inputs) dari batch fitur *_xf"""
+    return {tensor.name: features[tensor.name] for tensor in model.inputs}
+
+def convert_to_tflite(model, quantization, representative_dataset=None) -> bytes:
+    """
+    Konversi model Keras ke flatbuffer TFLite
+    'dynamic': bobot int8, aktivasi float; 'int8': bobot dan aktivasi int8
+    (dikalibrasi dengan representative_dataset), input/output tetap float/int64
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization in ('dynamic', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'int8':
+        if representative_dataset is None:
+            raise ValueError("int8 quantization requires a representative dataset")
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization not in ('none', 'dynamic'):
+        raise ValueError(f"Unknown TFLite quantization: {quantization}")
+    return converter.convert()
+
+def tflite_accuracy_report(model, tflite_model: bytes, dataset, steps: int) -> Dict[Text, Any]:
+    """Bandingkan prediksi TFLite dengan model float pada `steps` batch eval"""
+    runner = tf.lite.Interpreter(model_content=tflite_model).get_signature_runner()
+    labels, float_probs, tflite_probs = [], [], []
+    for features, label in dataset.take(steps):
+        inputs = _model_inputs(model, features)
+        float_probs.append(model(inputs, training=False).numpy().reshape(-1))
+        outputs = runner(**{name: value.numpy() for name, value in inputs.items()})
+        tflite_probs.append(next(iter(outputs.values())).reshape(-1))
+        labels.append(label.numpy().reshape(-1))
+
+    labels = np.concatenate(labels) > 0.5
+    float_probs = np.concatenate(float_probs)
+    tflite_probs = np.concatenate(tflite_probs)
+    float_accuracy = float(np.mean((float_probs > 0.5) == labels))
+    tflite_accuracy = float(np.mean((tflite_probs > 0.5) == labels))
+    return {
+        'examples': int(labels.size),
+        'float_accuracy': float_accuracy,
+        'tflite_accuracy': tflite_accuracy,
+        'accuracy_delta': tflite_accuracy - float_accuracy,
+        'prediction_agreement': float(np.mean((float_probs > 0.5) == (tflite_probs > 0.5))),
+        'max_abs_probability_diff': float(np.max(np.abs(float_probs - tflite_probs))),
+        'mean_abs_probability_diff': float(np.mean(np.abs(float_probs - tflite_probs))),
+    }
+
+def export_tflite(model, eval_dataset, serving_model_dir: Text, options: Dict[Text, Any]):
+    """Tulis model.tflite dan tflite_report.json di folder versi model"""
+    quantization = options['quantization']
+
+    def representative_dataset():
+        # Satu baris per sampel agar sesuai input shape (1, 1) hasil konversi
+        for features, _ in eval_dataset.take(options['calibration_steps']):
+            inputs = _model_inputs(model, features)
+            num_rows = int(next(iter(inputs.values())).shape[0])
+            for row in range(num_rows):
+                yield {name: value[row:row + 1] for name, value in inputs.items()}
+
+    tflite_model = convert_to_tflite(model, quantization, representative_dataset)
+    tflite_path = os.path.join(serving_model_dir, TFLITE_MODEL_FILENAME)
+    with tf.io.gfile.GFile(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+
+    report = tflite_accuracy_report(model, tflite_model, eval_dataset, options['report_steps'])
+    report.update({'quantization': quantization, 'tflite_bytes': len(tflite_model)})
+    with tf.io.gfile.GFile(os.path.join(serving_model_dir, TFLITE_REPORT_FILENAME), 'w') as f:
+        f.write(json.dumps(report, indent=2, sort_keys=True))
+    logging.info(
+        f"TFLite model ({quantization}, {len(tflite_model)} bytes) written to {tflite_path}; "
+        f"accuracy {report['float_accuracy']:.4f} -> {report['tflite_accuracy']:.4f} "
+        f"(delta {report['accuracy_delta']:+.4f})"
+    )
+    return report
+
+# ----------------------------------------------------------------
+# 4. FUNGSI RUN_FN (Saving Model Dasar - Syntax Fix)
 # ----------------------------------------------------------------
 def run_fn(fn_args: FnArgs):
     
     tf_transform_output = tft.TFTransformOutput(fn_args.transform_output)
     
-    train_dataset = input_fn(fn_args.train_files, tf_transform_output)
-    eval_dataset = input_fn(fn_args.eval_files, tf_transform_output)
+    input_options = input_options_from(fn_args.custom_config)
+    train_dataset = input_fn(fn_args.train_files, tf_transform_output, options=input_options)
+    eval_dataset = input_fn(fn_args.eval_files, tf_transform_output, options=input_options)
     
     # Definisikan default hyperparameters
     hyperparameters = {
@@ -104,7 +274,8 @@ def run_fn(fn_args: FnArgs):
         hyperparameters = fn_args.hyperparameters['values']
         
     # Bangun Model dan Latih Model
-    model = model_builder(hyperparameters) 
+    vocab_sizes = embedding_vocab_sizes(model_options_from(fn_args.custom_config), tf_transform_output)
+    model = model_builder(hyperparameters, vocab_sizes) 
     stop_early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=5)
     
     model.fit(
@@ -117,15 +288,23 @@ def run_fn(fn_args: FnArgs):
     )
     
     # SIMPAN MODEL
-    # Model disimpan dengan default signature yang menerima transformed features
-    # Untuk serving dengan raw inputs, transform graph perlu digunakan terlebih dahulu
+    # serving_default tetap menerima transformed features (*_xf);
+    # serving_raw menerima fitur mentah dan menjalankan transform graph di dalamnya
+    signatures = {
+        'serving_default': get_serve_transformed_fn(model).get_concrete_function(),
+        RAW_SERVING_SIGNATURE: get_serve_raw_fn(model, tf_transform_output).get_concrete_function(),
+    }
     tf.keras.models.save_model(
         model,
         fn_args.serving_model_dir,
         overwrite=True,
         include_optimizer=False,
-        signatures=None,  # Gunakan default signature (transformed features)
+        signatures=signatures,
         options=tf.saved_model.SaveOptions(
             experimental_custom_gradients=False
         )
     )
+
+    tflite_options = tflite_options_from(fn_args.custom_config)
+    if tflite_options['quantization']:
+        export_tflite(model, eval_dataset, fn_args.serving_model_dir, tflite_options)
@@ -1,7 +1,9 @@
 
+import os
+import hashlib
 import tensorflow as tf
 import tensorflow_transform as tft
-from typing import Text
+from typing import Any, Dict, List, Optional, Text
 
 # Fitur yang tidak berguna atau membocorkan jawaban
 FEATURES_TO_DROP = ["sl_no", "salary"]
@@ -30,6 +32,25 @@ CATEGORICAL_FEATURES = [
 LABEL_KEY = "status"
 VOCAB_SIZE = 101 
 
+# Opsi performa tf.data untuk input_fn
+# Bisa di-override lewat custom_config={'input_options': {...}} di Trainer/Tuner
+INPUT_OPTIONS = {
+    'reader_num_threads': tf.data.AUTOTUNE,    # baca beberapa file TFRecord paralel
+    'parser_num_threads': tf.data.AUTOTUNE,    # parse tf.Example paralel
+    'sloppy_ordering': False,                  # True: urutan non-deterministik, throughput lebih tinggi
+    'cache': False,                            # True: cache di memori, string: folder cache di disk
+    'shuffle': True,
+    'shuffle_buffer_size': 10000,
+    'prefetch_buffer_size': tf.data.AUTOTUNE,
+}
+
+# Arsitektur model_builder di Trainer/Tuner, override lewat custom_config={'model_options': {...}}
+MODEL_OPTIONS = {
+    # 'separate': satu Embedding(VOCAB_SIZE) per fitur kategorikal (perilaku lama)
+    # 'fused': satu tabel FusedEmbedding berukuran vocabulary asli dari transform output
+    'architecture': 'separate',
+}
+
 def transformed_name(key):
     """Memberi nama '_xf' pada fitur yang sudah ditransformasi"""
     return key + "_xf"
@@ -44,8 +65,9 @@ def preprocessing_fn(inputs):
         )
 
     for feature in CATEGORICAL_FEATURES:
+        # Nama vocabulary tetap (nama fitur) supaya bisa dibaca dengan vocabulary_by_name
         outputs[transformed_name(feature)] = tft.compute_and_apply_vocabulary(
-            inputs[feature]
+            inputs[feature], vocab_filename=feature
         )
         
     # Transformasi Label: 'Placed' -> 1.0, selainnya -> 0.0
@@ -60,11 +82,43 @@ def _gzip_reader_fn(filenames):
     """Membaca file TFRecord terkompresi."""
     return tf.data.TFRecordDataset(filenames, compression_type='GZIP')
 
+def input_options_from(custom_config: Optional[Dict[Text, Any]]) -> Dict[Text, Any]:
+    """Gabungkan INPUT_OPTIONS dengan custom_config['input_options'] (jika ada)"""
+    options = dict(INPUT_OPTIONS)
+    options.update((custom_config or {}).get('input_options') or {})
+    return options
+
+def model_options_from(custom_config: Optional[Dict[Text, Any]]) -> Dict[Text, Any]:
+    """Gabungkan MODEL_OPTIONS dengan custom_config['model_options'] (jika ada)"""
+    options = dict(MODEL_OPTIONS)
+    options.update((custom_config or {}).get('model_options') or {})
+    return options
+
+def vocabulary_sizes(tf_transform_output: tft.TFTransformOutput) -> Dict[Text, int]:
+    """Ukuran vocabulary asli tiap fitur kategorikal (dari schema transform output)"""
+    return {
+        key: int(tf_transform_output.num_buckets_for_transformed_feature(transformed_name(key)))
+        for key in CATEGORICAL_FEATURES
+    }
+
+def embedding_vocab_sizes(options: Dict[Text, Any],
+                          tf_transform_output: tft.TFTransformOutput) -> Optional[Dict[Text, int]]:
+    """vocab_sizes untuk model_builder: dict jika arsitektur 'fused', None jika 'separate'"""
+    if options['architecture'] == 'fused':
+        return vocabulary_sizes(tf_transform_output)
+    if options['architecture'] == 'separate':
+        return None
+    raise ValueError(f"Unknown model architecture: {options['architecture']}")
+
 def input_fn(file_pattern: Text,
              tf_transform_output: tft.TFTransformOutput,
-             batch_size: int = 32) -> tf.data.Dataset:
+             batch_size: int = 32,
+             options: Optional[Dict[Text, Any]] = None) -> tf.data.Dataset:
     """Membuat tf.data.Dataset untuk training atau evaluasi."""
     
+    options = {**INPUT_OPTIONS, **(options or {})}
+    cache = options['cache']
+    
     transform_feature_spec = (
         tf_transform_output.transformed_feature_spec().copy()
     )
@@ -76,8 +130,79 @@ def input_fn(file_pattern: Text,
         batch_size=batch_size,
         features=transform_feature_spec, # <-- INI MENGEMBALIKAN KEYS *_xf
         reader=_gzip_reader_fn,
-        label_key=transformed_name(LABEL_KEY)
+        label_key=transformed_name(LABEL_KEY),
+        # Dengan cache, baca satu epoch saja lalu ulangi dari cache
+        num_epochs=1 if cache else None,
+        shuffle=options['shuffle'],
+        shuffle_buffer_size=options['shuffle_buffer_size'],
+        reader_num_threads=options['reader_num_threads'],
+        parser_num_threads=options['parser_num_threads'],
+        sloppy_ordering=options['sloppy_ordering'],
+        prefetch_buffer_size=0 if cache else options['prefetch_buffer_size']
     )
     
+    if cache:
+        # Folder cache di disk: satu file per file_pattern (train dan eval terpisah)
+        filename = ''
+        if isinstance(cache, str):
+            tf.io.gfile.makedirs(cache)
+            key = hashlib.md5(str(file_pattern).encode('utf-8')).hexdigest()
+            filename = os.path.join(cache, f'input_{key}')
+        dataset = dataset.cache(filename)
+        if options['shuffle']:
+            # Isi batch tetap setelah epoch pertama, urutan batch tetap diacak
+            dataset = dataset.shuffle(max(1, options['shuffle_buffer_size'] // batch_size))
+        dataset = dataset.repeat().prefetch(options['prefetch_buffer_size'])
+    
     # HAPUS SEMUA KODE map_fn yang bermasalah.
     return dataset
+
+
+@tf.keras.utils.register_keras_serializable(package='placement')
+class FusedEmbedding(tf.keras.layers.Layer):
+    """
+    Satu tabel embedding untuk semua fitur kategorikal
+    Indeks tiap fitur digeser dengan offset kumulatif vocabulary sebelumnya,
+    lalu semua fitur di-lookup dengan satu gather. Input (batch, n_fitur) int64,
+    output (batch, n_fitur * output_dim), urutan sama dengan Embedding terpisah.
+    Setiap fitur punya satu baris OOV tepat sebelum vocabulary-nya, sehingga
+    indeks -1 (default_value compute_and_apply_vocabulary) jatuh ke baris OOV
+    fitur itu sendiri. Indeks lain di luar vocabulary juga dipetakan ke baris OOV.
+    """
+
+    def __init__(self, vocab_sizes: List[int], output_dim: int, **kwargs):
+        super().__init__(**kwargs)
+        self.vocab_sizes = [int(size) for size in vocab_sizes]
+        self.output_dim = int(output_dim)
+
+    def build(self, input_shape):
+        self.embeddings = self.add_weight(
+            name='embeddings',
+            shape=(sum(self.vocab_sizes) + len(self.vocab_sizes), self.output_dim),
+            initializer='uniform',  # sama dengan default tf.keras.layers.Embedding
+            trainable=True
+        )
+        super().build(input_shape)
+
+    def offsets(self):
+        """Baris indeks 0 tiap fitur di tabel gabungan (setelah baris OOV fitur tsb)"""
+        offsets, total = [], 0
+        for size in self.vocab_sizes:
+            offsets.append(total + 1)
+            total += size + 1
+        return offsets
+
+    def call(self, inputs):
+        indices = tf.cast(inputs, tf.int64)
+        # Indeks di luar [-1, vocab_size) dipetakan ke baris OOV fitur itu sendiri,
+        # bukan (setelah offset) ke baris milik fitur tetangga
+        in_range = (indices >= -1) & (indices < tf.constant(self.vocab_sizes, dtype=tf.int64))
+        indices = tf.where(in_range, indices, tf.constant(-1, dtype=tf.int64))
+        indices = indices + tf.constant(self.offsets(), dtype=tf.int64)
+        embedded = tf.gather(self.embeddings, indices)
+        return tf.reshape(embedded, [-1, len(self.vocab_sizes) * self.output_dim])
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({'vocab_sizes': self.vocab_sizes, 'output_dim': self.output_dim})
+        return config
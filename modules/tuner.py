@@ -1,5 +1,18 @@
 
 # Import library
+import os
+import sys
+import json
+import time
+import atexit
+import socket
+import logging
+import _thread
+import threading
+import functools
+import subprocess
+from typing import Any, Dict, List, Optional, Text
+
 import tensorflow as tf
 import tensorflow_transform as tft
 import keras_tuner as kt
@@ -12,10 +25,34 @@ from transform import (
     CATEGORICAL_FEATURES,
     transformed_name,
     input_fn, # <-- input_fn diimpor dari transform
-    VOCAB_SIZE
+    input_options_from,
+    VOCAB_SIZE,
+    FusedEmbedding,
+    model_options_from,
+    embedding_vocab_sizes
 )
 
-def model_builder(hyperparameters):
+# Konfigurasi search, bisa di-override lewat custom_config={'tuner_options': {...}}
+TUNER_OPTIONS = {
+    'algorithm': 'random',         # 'random' (10 trial penuh) atau 'hyperband' (trial lemah dihentikan lebih awal)
+    'max_trials': 10,              # random search
+    'max_epochs': 20,              # epoch maksimum per trial
+    'factor': 3,                   # hyperband: hanya 1/factor trial terbaik lanjut ke bracket berikutnya
+    'hyperband_iterations': 1,
+    'early_stopping_patience': 5,
+    # >1: trial dijalankan paralel oleh N proses worker lokal; proses TFX menjadi chief
+    # (oracle) yang tidak menjalankan trial sendiri, jadi N worker = N trial bersamaan
+    'parallel_workers': 1,
+}
+
+# Proses worker lokal milik chief (lihat start_local_workers)
+LOCAL_WORKERS: List[subprocess.Popen] = []
+_stopping_workers = threading.Event()
+# Env KERASTUNER_* proses ini sebelum start_local_workers, dipulihkan oleh stop_local_workers
+_CHIEF_ENV_KEYS = ('KERASTUNER_TUNER_ID', 'KERASTUNER_ORACLE_IP', 'KERASTUNER_ORACLE_PORT')
+_saved_chief_env: Dict[Text, Optional[Text]] = {}
+
+def model_builder(hyperparameters, vocab_sizes=None):
 
     input_features = []
     numeric_inputs = []
@@ -42,19 +79,27 @@ def model_builder(hyperparameters):
         categorical_inputs.append(input_layer)
 
     # Embedding Layer
-    embedded_features = []
     embedding_dim = hyperparameters.Choice('embedding_dim', [4, 8, 16])
 
-    for input_layer in categorical_inputs:
-        embedding = tf.keras.layers.Embedding(
-            input_dim=VOCAB_SIZE, 
-            output_dim=embedding_dim
-        )(input_layer)
-        flattened_embedding = tf.keras.layers.Flatten()(embedding)
-        embedded_features.append(flattened_embedding)
+    if vocab_sizes:
+        # Arsitektur 'fused': satu tabel seukuran vocabulary asli, satu lookup
+        concatenated_categoricals = FusedEmbedding(
+            [vocab_sizes[key] for key in CATEGORICAL_FEATURES],
+            embedding_dim,
+            name='fused_embedding'
+        )(tf.keras.layers.concatenate(categorical_inputs))
+    else:
+        embedded_features = []
+        for input_layer in categorical_inputs:
+            embedding = tf.keras.layers.Embedding(
+                input_dim=VOCAB_SIZE, 
+                output_dim=embedding_dim
+            )(input_layer)
+            flattened_embedding = tf.keras.layers.Flatten()(embedding)
+            embedded_features.append(flattened_embedding)
+        concatenated_categoricals = tf.keras.layers.concatenate(embedded_features)
         
     concatenated_numerics = tf.keras.layers.concatenate(numeric_inputs)
-    concatenated_categoricals = tf.keras.layers.concatenate(embedded_features)
 
     # Gabungkan semua fitur
     concatenate_all = tf.keras.layers.concatenate(
@@ -96,42 +141,198 @@ def model_builder(hyperparameters):
     return model
 
 # --- Fungsi Tuner ---
-def tuner_fn(fn_args: FnArgs):
-    """Fungsi utama untuk TFX Tuner."""
+def tuner_options_from(custom_config: Optional[Dict[Text, Any]]) -> Dict[Text, Any]:
+    """Gabungkan TUNER_OPTIONS dengan custom_config['tuner_options'] (jika ada)"""
+    options = dict(TUNER_OPTIONS)
+    options.update((custom_config or {}).get('tuner_options') or {})
+    return options
+
+def build_tuner(options: Dict[Text, Any], working_dir: Text,
+                vocab_sizes: Optional[Dict[Text, int]] = None) -> kt.Tuner:
+    """Membuat Keras Tuner sesuai options['algorithm']"""
+    hypermodel = functools.partial(model_builder, vocab_sizes=vocab_sizes)
+    common = dict(
+        objective='val_binary_accuracy',
+        directory=working_dir,
+        project_name='placement_tuning'
+    )
+    if options['algorithm'] == 'random':
+        return kt.RandomSearch(hypermodel, max_trials=options['max_trials'], **common)
+    if options['algorithm'] == 'hyperband':
+        # Successive halving: banyak trial dilatih beberapa epoch saja,
+        # hanya yang terbaik dilanjutkan sampai max_epochs
+        return kt.Hyperband(
+            hypermodel,
+            max_epochs=options['max_epochs'],
+            factor=options['factor'],
+            hyperband_iterations=options['hyperband_iterations'],
+            **common
+        )
+    raise ValueError(f"Unknown tuner algorithm: {options['algorithm']}")
 
-    tf_transform_output = tft.TFTransformOutput(fn_args.transform_graph_path)
+def build_fit_kwargs(train_files, eval_files, transform_graph_path: Text,
+                     train_steps: int, eval_steps: int,
+                     options: Dict[Text, Any], input_options: Dict[Text, Any]) -> Dict[Text, Any]:
+    tf_transform_output = tft.TFTransformOutput(transform_graph_path)
 
     # Menggunakan input_fn dari transform
     train_dataset = input_fn(
-        fn_args.train_files, 
+        train_files, 
         tf_transform_output, 
-        batch_size=32
+        batch_size=32,
+        options=input_options
     )
     eval_dataset = input_fn(
-        fn_args.eval_files, 
+        eval_files, 
         tf_transform_output, 
-        batch_size=32
+        batch_size=32,
+        options=input_options
     )
-    
-    # Setup Keras Tuner
-    tuner = kt.RandomSearch(
-        model_builder,
-        objective='val_binary_accuracy',
-        max_trials=10, 
-        directory=fn_args.working_dir,
-        project_name='placement_tuning'
+
+    stop_early = tf.keras.callbacks.EarlyStopping(
+        monitor='val_loss', patience=options['early_stopping_patience']
+    )
+    return {
+        "x": train_dataset,
+        'validation_data': eval_dataset,
+        'steps_per_epoch': train_steps,
+        'validation_steps': eval_steps,
+        "epochs": options['max_epochs'],  # hyperband mengatur epoch per trial sendiri
+        "callbacks": [stop_early]
+    }
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _watch_local_workers(workers: List[subprocess.Popen]):
+    """Hentikan search chief jika semua worker gagal (chief menunggu tanpa batas)"""
+    exit_codes = [worker.wait() for worker in workers]
+    if not _stopping_workers.is_set() and all(code != 0 for code in exit_codes):
+        logging.error(f"All tuner workers failed (exit codes {exit_codes}), stopping the search")
+        _thread.interrupt_main()
+
+def start_local_workers(worker_config: Dict[Text, Any], num_workers: int):
+    """
+    Distributed tuning Keras Tuner di satu mesin: proses ini menjadi chief
+    (oracle gRPC, tuner.search() hanya membagikan trial) dan num_workers
+    proses lokal menjalankan trial secara paralel
+    """
+    _stopping_workers.clear()
+    port = str(_free_port())
+    if not _saved_chief_env:
+        _saved_chief_env.update({key: os.environ.get(key) for key in _CHIEF_ENV_KEYS})
+    os.environ['KERASTUNER_TUNER_ID'] = 'chief'
+    os.environ['KERASTUNER_ORACLE_IP'] = '127.0.0.1'
+    os.environ['KERASTUNER_ORACLE_PORT'] = port
+
+    # Bagi core ke worker supaya thread pool TensorFlow tidak saling berebut CPU
+    worker_config = dict(worker_config, intra_op_threads=max(1, (os.cpu_count() or 1) // num_workers))
+    for index in range(num_workers):
+        env = dict(os.environ, KERASTUNER_TUNER_ID=f'tuner{index}')
+        LOCAL_WORKERS.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(worker_config)], env=env
+        ))
+    logging.info(f"Started {num_workers} local tuner workers (oracle on port {port})")
+    threading.Thread(
+        target=_watch_local_workers, args=(list(LOCAL_WORKERS),), name='tuner-workers', daemon=True
+    ).start()
+
+def stop_local_workers(timeout: float = 60):
+    """
+    Tunggu worker selesai (setelah search chief return), terminate jika masih jalan,
+    lalu pulihkan env KERASTUNER_* supaya tuner_fn berikutnya tidak menjadi chief
+    """
+    _stopping_workers.set()
+    while LOCAL_WORKERS:
+        worker = LOCAL_WORKERS.pop()
+        try:
+            worker.wait(timeout)
+        except subprocess.TimeoutExpired:
+            worker.terminate()
+            worker.wait()
+    for key, value in _saved_chief_env.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    _saved_chief_env.clear()
+
+atexit.register(stop_local_workers, 0)
+
+def stop_workers_after_search(tuner: kt.Tuner) -> kt.Tuner:
+    """
+    Bungkus tuner.search chief: begitu search selesai (atau gagal), worker lokal
+    dihentikan dan env KERASTUNER_* dipulihkan, tidak menunggu hook atexit
+    """
+    search = tuner.search
+
+    @functools.wraps(search)
+    def search_then_stop(*args, **kwargs):
+        try:
+            return search(*args, **kwargs)
+        finally:
+            stop_local_workers()
+
+    tuner.search = search_then_stop
+    return tuner
+
+def tuner_fn(fn_args: FnArgs):
+    """Fungsi utama untuk TFX Tuner."""
+
+    options = tuner_options_from(fn_args.custom_config)
+    input_options = input_options_from(fn_args.custom_config)
+    vocab_sizes = embedding_vocab_sizes(
+        model_options_from(fn_args.custom_config),
+        tft.TFTransformOutput(fn_args.transform_graph_path)
     )
 
-    stop_early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=5)
+    if options['parallel_workers'] > 1:
+        # Harus sebelum tuner dibuat: Keras Tuner membaca env KERASTUNER_* di constructor
+        start_local_workers({
+            'train_files': list(fn_args.train_files),
+            'eval_files': list(fn_args.eval_files),
+            'transform_graph_path': fn_args.transform_graph_path,
+            'train_steps': fn_args.train_steps,
+            'eval_steps': fn_args.eval_steps,
+            'working_dir': fn_args.working_dir,
+            'tuner_options': options,
+            'input_options': input_options,
+            'vocab_sizes': vocab_sizes,
+        }, options['parallel_workers'])
+        # Chief tidak melatih model, dataset tetap dibuat untuk fit_kwargs TFX
+
+    # Setup Keras Tuner
+    tuner = build_tuner(options, fn_args.working_dir, vocab_sizes)
+    if options['parallel_workers'] > 1:
+        tuner = stop_workers_after_search(tuner)
 
     return TunerFnResult(
         tuner=tuner,
-        fit_kwargs={
-            "x": train_dataset,
-            'validation_data': eval_dataset,
-            'steps_per_epoch': fn_args.train_steps,
-            'validation_steps': fn_args.eval_steps,
-            "epochs": 20, 
-            "callbacks": [stop_early]
-        }
+        fit_kwargs=build_fit_kwargs(
+            fn_args.train_files, fn_args.eval_files, fn_args.transform_graph_path,
+            fn_args.train_steps, fn_args.eval_steps, options, input_options
+        )
     )
+
+def run_worker(config: Dict[Text, Any]):
+    """Entry point proses worker lokal (dijalankan oleh start_local_workers)"""
+    tf.config.threading.set_intra_op_parallelism_threads(config['intra_op_threads'])
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    tuner = build_tuner(config['tuner_options'], config['working_dir'], config['vocab_sizes'])
+    start = time.perf_counter()
+    tuner.search(**build_fit_kwargs(
+        config['train_files'], config['eval_files'], config['transform_graph_path'],
+        config['train_steps'], config['eval_steps'],
+        config['tuner_options'], config['input_options']
+    ))
+    logging.info(
+        f"Tuner worker {os.environ.get('KERASTUNER_TUNER_ID')} finished "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    run_worker(json.loads(sys.argv[1]))
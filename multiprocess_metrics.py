@@ -0,0 +1,198 @@
+"""
+Agregasi metrik Prometheus lintas worker gunicorn (PROMETHEUS_MULTIPROC_DIR)
+Setiap worker menulis nilai metriknya ke file mmap; /metrics di worker mana pun
+membaca semua file sehingga hasilnya total dari seluruh worker.
+
+File counter/histogram milik worker yang sudah mati digabung ke satu file
+archive per tipe (hook child_exit di master), sehingga jumlah file (dan biaya
+scrape) hanya bergantung pada jumlah worker yang hidup, bukan jumlah restart.
+Penggabungan memegang flock eksklusif pada LOCK_FILENAME dan setiap scrape
+memegang flock shared, jadi scrape selalu melihat keadaan sebelum atau sesudah
+penggabungan (tidak pernah nilai archive baru plus file sumber yang belum dihapus).
+"""
+import os
+import glob
+import time
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+logger = logging.getLogger(__name__)
+
+# Percobaan ulang scrape jika file gauge worker yang exit terhapus saat dibaca
+SCRAPE_ATTEMPTS = 3
+
+# Tipe metrik yang nilainya dijumlahkan antar proses (file <tipe>_<pid>.db)
+ACCUMULATED_TYPES = ('counter', 'histogram')
+
+# Lock file bersama scrape dan compaction (bukan *.db, jadi tidak dibaca collector)
+LOCK_FILENAME = '.compaction.lock'
+
+# Batas tunggu lock eksklusif; jika habis, compaction dicoba lagi di child_exit berikutnya
+COMPACTION_LOCK_TIMEOUT = 2.0
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir')
+
+
+def clear_directory(path, keep_pid=None):
+    """Hapus file metrik lama (dipanggil sekali saat master gunicorn start)"""
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, '*.db')):
+        if keep_pid is not None and filename.endswith(f'_{keep_pid}.db'):
+            continue
+        os.remove(filename)
+
+
+@contextmanager
+def directory_lock(path, exclusive=False, timeout=None):
+    """
+    flock pada LOCK_FILENAME di folder metrik
+    Dengan timeout, yield False (tanpa lock) jika lock tidak didapat dalam timeout detik
+    """
+    with open(os.path.join(path, LOCK_FILENAME), 'a') as f:
+        mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if timeout is None:
+            fcntl.flock(f, mode)
+        else:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(f, mode | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(0.01)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_value(mmaped_dict, key, value):
+    try:
+        mmaped_dict.write_value(key, value, 0.0)
+    except TypeError:
+        # prometheus_client < 0.17: tanpa timestamp
+        mmaped_dict.write_value(key, value)
+
+
+def _dead_process_files(path, typ, live_pids):
+    files = []
+    for filename in glob.glob(os.path.join(path, f'{typ}_*.db')):
+        pid = os.path.basename(filename)[len(typ) + 1:-len('.db')]
+        if pid.isdigit() and int(pid) not in live_pids:
+            files.append(filename)
+    return files
+
+
+def compact_dead_processes(path, live_pids, timeout=COMPACTION_LOCK_TIMEOUT):
+    """
+    Gabungkan file counter/histogram semua pid yang tidak ada di live_pids ke <tipe>_archive.db
+    Archive baru ditulis ke file sementara lalu os.replace, dan file sumber dihapus,
+    semuanya di bawah lock eksklusif. Return jumlah file yang digabung.
+    """
+    live_pids = {int(pid) for pid in live_pids}
+    with directory_lock(path, exclusive=True, timeout=timeout) as locked:
+        if not locked:
+            logger.warning("Metrics compaction skipped: directory lock is busy")
+            return 0
+        compacted = 0
+        for typ in ACCUMULATED_TYPES:
+            sources = _dead_process_files(path, typ, live_pids)
+            if not sources:
+                continue
+            archive_path = os.path.join(path, f'{typ}_archive.db')
+            totals = {}
+            for filename in ([archive_path] if os.path.exists(archive_path) else []) + sources:
+                values = MmapedDict(filename, read_mode=True)
+                try:
+                    for key, value, *_ in values.read_all_values():
+                        totals[key] = totals.get(key, 0.0) + value
+                finally:
+                    values.close()
+            temporary_path = archive_path + '.tmp'
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            archive = MmapedDict(temporary_path)
+            try:
+                for key, value in totals.items():
+                    _write_value(archive, key, value)
+            finally:
+                archive.close()
+            os.replace(temporary_path, archive_path)
+            for filename in sources:
+                os.remove(filename)
+            compacted += len(sources)
+        return compacted
+
+
+def mark_process_dead(pid, path=None, live_pids=None):
+    """
+    Bersihkan file metrik worker yang sudah exit (hook child_exit gunicorn)
+    live_pids: pid yang masih menulis metrik (worker hidup + master); jika diberikan,
+    file counter/histogram pid lain digabung ke archive
+    """
+    path = path or multiprocess_dir()
+    if not path:
+        return
+    # File gauge mode live* milik pid ini dihapus oleh prometheus_client
+    multiprocess.mark_process_dead(pid, path)
+    if live_pids is None:
+        return
+    try:
+        compact_dead_processes(path, set(live_pids) - {pid})
+    except Exception as e:
+        logger.warning(f"Failed to compact metrics of dead workers: {str(e)}")
+
+
+class MetricsExporter:
+    """
+    Output /metrics dengan cache singkat (ttl detik)
+    Dalam mode multiprocess, semua file worker dibaca lewat MultiProcessCollector
+    """
+
+    def __init__(self, ttl=1.0):
+        self.ttl = max(0.0, float(ttl))
+        self._lock = threading.Lock()
+        self._cached_at = 0.0
+        self._cached = None
+        if multiprocess_dir():
+            self.registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(self.registry)
+        else:
+            self.registry = REGISTRY
+
+    @property
+    def multiprocess(self):
+        return self.registry is not REGISTRY
+
+    def generate(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached_at >= self.ttl:
+                self._cached = self._generate()
+                self._cached_at = now
+            return self._cached
+
+    def _generate(self):
+        for attempt in range(SCRAPE_ATTEMPTS):
+            try:
+                if not self.multiprocess:
+                    return generate_latest(self.registry)
+                # Compaction tidak boleh berjalan di tengah pembacaan file
+                with directory_lock(multiprocess_dir()):
+                    return generate_latest(self.registry)
+            except FileNotFoundError as e:
+                # File terdaftar saat listing lalu dihapus mark_process_dead
+                if attempt == SCRAPE_ATTEMPTS - 1:
+                    raise
+                logger.debug(f"Metrics file removed during scrape, retrying: {str(e)}")
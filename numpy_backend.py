@@ -0,0 +1,235 @@
+"""
+Backend inference pure-NumPy untuk placement MLP
+Bobot embedding dan dense diekspor sekali dari SavedModel ke file .npz,
+sehingga serving tidak perlu memuat TensorFlow.
+
+Contoh:
+    python numpy_backend.py export output/serving_model/1762435641
+    python numpy_backend.py check output/serving_model/1762435641
+"""
+import os
+import sys
+import argparse
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nama file default di dalam folder versi model
+NUMPY_WEIGHTS_FILENAME = 'numpy_weights.npz'
+
+# Indeks token di luar vocabulary (default_value compute_and_apply_vocabulary)
+OOV_INDEX = -1
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+
+def _source_layer(tensor):
+    """Layer Keras yang menghasilkan KerasTensor"""
+    return tensor._keras_history.layer
+
+
+def _expand_segments(tensor):
+    """
+    Urai input Dense pertama menjadi segmen (kind, nama input, tabel embedding, ada baris OOV)
+    sesuai urutan concatenate di model_builder
+    """
+    layer = _source_layer(tensor)
+    # Layer custom yang di-load tanpa class aslinya bernama '<package>><class>'
+    kind = type(layer).__name__.split('>')[-1]
+    if kind == 'FusedEmbedding':
+        # Tabel gabungan [OOV, vocabulary...] per fitur diekspor sebagai [vocabulary..., OOV],
+        # sehingga baris OOV ada di indeks vocab_size
+        table = layer.get_weights()[0].astype(np.float32)
+        vocab_sizes = layer.get_config()['vocab_sizes']
+        inputs = _source_layer(layer.input).input
+        segments, offset = [], 0
+        for inbound, size in zip(inputs, vocab_sizes):
+            feature_table = np.concatenate([table[offset + 1:offset + 1 + size], table[offset:offset + 1]])
+            segments.append(('embedding', _source_layer(inbound).name, feature_table, True))
+            offset += size + 1
+        return segments
+    if kind == 'Concatenate':
+        segments = []
+        for inbound in layer.input:
+            segments.extend(_expand_segments(inbound))
+        return segments
+    if kind == 'Flatten':
+        return _expand_segments(layer.input)
+    if kind == 'Embedding':
+        return [('embedding', _source_layer(layer.input).name, layer.get_weights()[0], False)]
+    if kind == 'InputLayer':
+        return [('numeric', layer.name, None, False)]
+    raise ValueError(f"Unsupported layer in feature block: {layer.name} ({kind})")
+
+
+def weights_from_model(model):
+    """Ambil bobot embedding dan dense dari model Keras sebagai dict array"""
+    dense_layers = [layer for layer in model.layers if type(layer).__name__ == 'Dense']
+    if not dense_layers:
+        raise ValueError("Model has no Dense layers")
+
+    arrays = {}
+    input_order = []
+    input_kinds = []
+    oov_inputs = []
+    for kind, name, table, has_oov_row in _expand_segments(dense_layers[0].input):
+        input_order.append(name)
+        input_kinds.append(kind)
+        if kind == 'embedding':
+            arrays[f'emb/{name}'] = table.astype(np.float32)
+        if has_oov_row:
+            oov_inputs.append(name)
+
+    activations = []
+    for index, layer in enumerate(dense_layers):
+        kernel, bias = layer.get_weights()
+        arrays[f'dense_{index}/kernel'] = kernel.astype(np.float32)
+        arrays[f'dense_{index}/bias'] = bias.astype(np.float32)
+        activations.append(layer.activation.__name__)
+
+    arrays['input_order'] = np.array(input_order)
+    arrays['input_kinds'] = np.array(input_kinds)
+    arrays['oov_inputs'] = np.array(oov_inputs, dtype=str)
+    arrays['activations'] = np.array(activations)
+    return arrays
+
+
+def export_weights(model_dir, output_path=None):
+    """Ekspor bobot SavedModel di model_dir ke file .npz"""
+    import tensorflow as tf
+
+    output_path = output_path or os.path.join(model_dir, NUMPY_WEIGHTS_FILENAME)
+    model = tf.keras.models.load_model(model_dir)
+    arrays = weights_from_model(model)
+    np.savez(output_path, **arrays)
+    logger.info(f"Exported {len(arrays)} arrays to {output_path}")
+    return output_path
+
+
+def saved_model_has_oov_rows(model_dir):
+    """True jika SavedModel Keras di model_dir memakai FusedEmbedding (baris OOV per fitur), tanpa load TF"""
+    metadata_path = os.path.join(model_dir, 'keras_metadata.pb')
+    if not os.path.exists(metadata_path):
+        return False
+    with open(metadata_path, 'rb') as f:
+        return b'FusedEmbedding' in f.read()
+
+
+class NumpyInferenceEngine:
+    """
+    Forward pass MLP placement dengan NumPy (tanpa TensorFlow)
+    Untuk input dengan baris OOV (model 'fused'), indeks OOV_INDEX dipetakan ke
+    baris terakhir tabel, sama seperti lookup di FusedEmbedding.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, weights_path):
+        if not os.path.exists(weights_path):
+            raise FileNotFoundError(f"NumPy weights not found: {weights_path}")
+
+        with np.load(weights_path, allow_pickle=False) as data:
+            self.input_order = [str(name) for name in data['input_order']]
+            self.input_kinds = [str(kind) for kind in data['input_kinds']]
+            self.embeddings = {
+                name: data[f'emb/{name}']
+                for name, kind in zip(self.input_order, self.input_kinds)
+                if kind == 'embedding'
+            }
+            # File lama (sebelum baris OOV diekspor) tidak punya oov_inputs
+            self.oov_inputs = {str(name) for name in data['oov_inputs']} if 'oov_inputs' in data else set()
+            activations = [str(name) for name in data['activations']]
+            self.layers = [
+                (data[f'dense_{i}/kernel'], data[f'dense_{i}/bias'], ACTIVATIONS[activation])
+                for i, activation in enumerate(activations)
+            ]
+        self.weights_path = weights_path
+
+    @property
+    def oov_index(self):
+        """Indeks yang dipakai preprocessing untuk token di luar vocabulary"""
+        return OOV_INDEX if self.oov_inputs else 0
+
+    def features(self, inputs):
+        """Bangun input Dense pertama (numerik + embedding) dari dict *_xf"""
+        parts = []
+        for name, kind in zip(self.input_order, self.input_kinds):
+            if kind == 'numeric':
+                parts.append(np.asarray(inputs[name], dtype=np.float32).reshape(-1, 1))
+            else:
+                table = self.embeddings[name]
+                indices = np.asarray(inputs[name], dtype=np.int64).reshape(-1)
+                if name in self.oov_inputs:
+                    indices = np.where(indices == OOV_INDEX, len(table) - 1, indices)
+                if indices.size and (indices.min() < 0 or indices.max() >= len(table)):
+                    raise ValueError(f"Index out of range for {name}: expected [0, {len(table)})")
+                parts.append(table[indices])
+        return np.concatenate(parts, axis=1)
+
+    def predict(self, inputs):
+        x = self.features(inputs)
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+
+def check_parity(model_dir, weights_path=None, num_rows=1024, tolerance=1e-5, seed=0):
+    """Bandingkan output NumPy backend dengan model TensorFlow"""
+    import tensorflow as tf
+
+    weights_path = weights_path or os.path.join(model_dir, NUMPY_WEIGHTS_FILENAME)
+    numpy_engine = NumpyInferenceEngine(weights_path)
+    model = tf.keras.models.load_model(model_dir)
+
+    rng = np.random.default_rng(seed)
+    inputs = {}
+    for name, kind in zip(numpy_engine.input_order, numpy_engine.input_kinds):
+        if kind == 'numeric':
+            inputs[name] = rng.random((num_rows, 1), dtype=np.float32)
+        else:
+            # Model dengan baris OOV menerima OOV_INDEX, bukan indeks baris OOV di tabel NumPy
+            vocab_rows = len(numpy_engine.embeddings[name])
+            low = OOV_INDEX if name in numpy_engine.oov_inputs else 0
+            inputs[name] = rng.integers(low, vocab_rows + low, size=(num_rows, 1), dtype=np.int64)
+
+    expected = model(
+        {name: tf.constant(value) for name, value in inputs.items()}, training=False
+    ).numpy()
+    actual = numpy_engine.predict(inputs)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    return max_diff <= tolerance, max_diff
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export / verify NumPy weights for the placement model")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Export SavedModel weights to .npz')
+    export_parser.add_argument('model_dir')
+    export_parser.add_argument('--output', default=None)
+
+    check_parser = subparsers.add_parser('check', help='Check NumPy backend parity with TensorFlow')
+    check_parser.add_argument('model_dir')
+    check_parser.add_argument('--weights', default=None)
+    check_parser.add_argument('--rows', type=int, default=1024)
+    check_parser.add_argument('--tolerance', type=float, default=1e-5)
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_weights(args.model_dir, args.output)
+        return 0
+
+    ok, max_diff = check_parity(args.model_dir, args.weights, args.rows, args.tolerance)
+    print(f"max abs diff: {max_diff:.3e} (tolerance {args.tolerance:.1e}) -> {'OK' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+LRU cache untuk hasil prediksi
+Key berupa nilai fitur persis seperti yang dilihat preprocessing, sehingga
+record dengan key yang sama selalu menghasilkan skor yang sama.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Cache LRU in-process dengan ukuran terbatas.
+
+    Key tidak dinormalisasi (tanpa pembulatan / strip): numerik dikonversi ke
+    float32 seperti records_to_columns, kategorikal apa adanya sebagai string.
+    Versi model aktif dipasang dengan set_version (isi cache dibuang); get/put dari
+    request yang masih memakai versi lain (selesai setelah hot swap) diabaikan.
+    """
+
+    def __init__(self, max_size, numerical_features, categorical_features,
+                 hits_metric=None, misses_metric=None, evictions_metric=None):
+        self.max_size = max(0, int(max_size))
+        self.numerical_features = list(numerical_features)
+        self.categorical_features = list(categorical_features)
+        self.hits_metric = hits_metric
+        self.misses_metric = misses_metric
+        self.evictions_metric = evictions_metric
+
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def make_key(self, record):
+        """Key dari 12 fitur input, konversi sama dengan input model"""
+        numeric = tuple(
+            np.array([record[f] for f in self.numerical_features], dtype=np.float32).tolist()
+        )
+        categorical = tuple(str(record[f]) for f in self.categorical_features)
+        return numeric + categorical
+
+    def set_version(self, version):
+        """Pasang versi model aktif; entry versi sebelumnya dibuang"""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+    def get(self, key, version):
+        """Ambil hasil dari cache, None jika tidak ada atau version bukan versi aktif"""
+        with self._lock:
+            value = None
+            if version == self._version:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+        if value is None:
+            if self.misses_metric is not None:
+                self.misses_metric.inc()
+        elif self.hits_metric is not None:
+            self.hits_metric.inc()
+        return value
+
+    def put(self, key, version, value):
+        evicted = 0
+        with self._lock:
+            if version != self._version:
+                # Hasil dari model lain (mis. model lama yang selesai setelah swap) tidak disimpan
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted and self.evictions_metric is not None:
+            self.evictions_metric.inc(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
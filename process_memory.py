@@ -0,0 +1,49 @@
+"""
+Pemakaian memori proses (worker) dari /proc
+PSS membagi halaman shared (copy-on-write dari master gunicorn) secara rata
+antar proses, sehingga jumlah PSS semua worker = memori fisik sebenarnya.
+"""
+import os
+
+# Field smaps_rollup (kB) -> label metrik
+SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared_clean',
+    'Shared_Dirty': 'shared_dirty',
+    'Private_Clean': 'private_clean',
+    'Private_Dirty': 'private_dirty',
+}
+
+
+def read_memory_usage(pid='self'):
+    """
+    Return dict {kind: bytes}. smaps_rollup (Linux 4.14+) memberi RSS, PSS
+    dan pembagian shared/private; jika tidak ada, hanya RSS dari statm.
+    """
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                kind = SMAPS_FIELDS.get(parts[0].rstrip(':'))
+                if kind is not None:
+                    usage[kind] = int(parts[1]) * 1024
+        if usage:
+            return usage
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        usage['rss'] = resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    return usage
+
+
+def update_memory_metric(gauge):
+    """Set Gauge berlabel 'kind' dengan pemakaian memori proses saat ini"""
+    for kind, value in read_memory_usage().items():
+        gauge.labels(kind=kind).set(value)
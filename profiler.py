@@ -0,0 +1,94 @@
+"""
+Sampling profiler ringan untuk worker yang sedang melayani traffic
+Stack semua thread diambil lewat sys._current_frames() dengan interval tetap,
+lalu digabung ke format collapsed stack (Brendan Gregg) untuk flamegraph.pl,
+speedscope atau inferno.
+"""
+import io
+import os
+import sys
+import time
+import shutil
+import zipfile
+import tempfile
+import threading
+from collections import Counter
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Kumpulkan stack semua thread (kecuali thread sampler sendiri)"""
+
+    def __init__(self, interval=0.01):
+        self.interval = max(0.001, float(interval))
+        self.stacks = Counter()
+        self.samples = 0
+
+    def sample(self):
+        own_ident = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f'thread-{ident}'))
+            self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds):
+        """Sampling selama `seconds` detik di thread pemanggil"""
+        deadline = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+        while next_sample < deadline:
+            self.sample()
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Tertinggal (GIL sibuk): lewati sampel yang terlewat
+                next_sample = time.perf_counter()
+        return self
+
+    def collapsed(self):
+        """Satu baris per stack: 'root;...;leaf count'"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile(seconds, interval=0.01, tf_trace=False):
+    """
+    Jalankan sampler selama `seconds` detik
+    Return (collapsed_text, zip_bytes); zip hanya dibuat jika tf_trace=True dan
+    berisi stacks.collapsed plus trace TF profiler (buka di TensorBoard)
+    """
+    sampler = StackSampler(interval)
+    if not tf_trace:
+        return sampler.run(seconds).collapsed(), None
+
+    import tensorflow as tf
+    logdir = tempfile.mkdtemp(prefix='tf_profile_')
+    try:
+        tf.profiler.experimental.start(logdir)
+        try:
+            sampler.run(seconds)
+        finally:
+            tf.profiler.experimental.stop()
+
+        collapsed = sampler.collapsed()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('stacks.collapsed', collapsed)
+            for directory, _, filenames in os.walk(logdir):
+                for filename in filenames:
+                    path = os.path.join(directory, filename)
+                    archive.write(path, os.path.join('tf_trace', os.path.relpath(path, logdir)))
+        return collapsed, buffer.getvalue()
+    finally:
+        shutil.rmtree(logdir, ignore_errors=True)
@@ -0,0 +1,84 @@
+"""
+Fixture bersama untuk test serving
+Test dijalankan dari root repo: python -m pytest -q
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Model yang di-commit (bobot NumPy + SavedModel)
+MODEL_DIR = os.path.join(ROOT, 'output', 'serving_model', '1762435641')
+WEIGHTS_PATH = os.path.join(MODEL_DIR, 'numpy_weights.npz')
+
+# app.py membaca konfigurasi saat di-import: backend NumPy (tanpa TensorFlow),
+# model di-load saat request pertama, tanpa thread background
+os.environ.setdefault('INFERENCE_BACKEND', 'numpy')
+os.environ.setdefault('MODEL_LOAD_MODE', 'lazy')
+os.environ.setdefault('MODEL_POLL_INTERVAL', '0')
+os.environ.setdefault('MEMORY_REPORT_INTERVAL', '0')
+
+VALID_RECORD = {
+    'gender': 'M',
+    'ssc_p': 67.0,
+    'ssc_b': 'Others',
+    'hsc_p': 91.0,
+    'hsc_b': 'Others',
+    'hsc_s': 'Commerce',
+    'degree_p': 58.0,
+    'degree_t': 'Sci&Tech',
+    'workex': 'No',
+    'etest_p': 55.0,
+    'specialisation': 'Mkt&HR',
+    'mba_p': 58.8,
+}
+
+# Integer JSON yang tidak muat di float: float() melempar OverflowError
+OVERFLOW_NUMBER = '1' + '0' * 400
+
+
+@pytest.fixture
+def valid_record():
+    return dict(VALID_RECORD)
+
+
+@pytest.fixture(scope='session')
+def serving():
+    """Modul app.py, di-import dengan cwd di root repo (path model relatif ke output/)"""
+    previous = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+        app.ensure_model_loaded()
+        yield app
+    finally:
+        os.chdir(previous)
+
+
+@pytest.fixture
+def client(serving):
+    serving.app.config['TESTING'] = True
+    return serving.app.test_client()
+
+
+@pytest.fixture
+def fused_weights_path(tmp_path):
+    """Bobot model yang di-commit dengan baris OOV acak di akhir setiap tabel embedding (seperti 'fused')"""
+    rng = np.random.default_rng(1)
+    with np.load(WEIGHTS_PATH) as data:
+        arrays = dict(data)
+    oov_inputs = []
+    for name, kind in zip(arrays['input_order'], arrays['input_kinds']):
+        if kind == 'embedding':
+            table = arrays[f'emb/{name}']
+            oov_row = rng.normal(size=(1, table.shape[1])).astype(np.float32)
+            arrays[f'emb/{name}'] = np.concatenate([table, oov_row])
+            oov_inputs.append(str(name))
+    arrays['oov_inputs'] = np.array(oov_inputs)
+    path = tmp_path / 'numpy_weights.npz'
+    np.savez(path, **arrays)
+    return str(path)
@@ -0,0 +1,57 @@
+import os
+import json
+
+import pytest
+
+from columnar import NPZ_CONTENT_TYPE, decode_columns, encode_npz
+from conftest import OVERFLOW_NUMBER
+from numpy_backend import OOV_INDEX
+
+
+def post_records(client, records_json):
+    return client.post('/predict/batch', data=records_json, content_type='application/json')
+
+
+def test_batch_scores_valid_records(client, valid_record):
+    response = post_records(client, json.dumps([valid_record, valid_record]))
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body['count'] == 2
+    assert body['predictions'][0] == body['predictions'][1]
+
+
+@pytest.mark.parametrize('value', ['"nan"', '"inf"', '1e400', 'true', OVERFLOW_NUMBER])
+def test_batch_rejects_non_finite_numbers(client, valid_record, value):
+    bad = json.dumps(valid_record).replace('"ssc_p": 67.0', f'"ssc_p": {value}')
+    response = post_records(client, f'[{json.dumps(valid_record)}, {bad}]')
+    assert response.status_code == 400
+    body = json.loads(response.data)
+    assert [error['index'] for error in body['errors']] == [1]
+    assert 'ssc_p' in body['errors'][0]['message']
+
+
+def test_stream_reports_bad_line_and_keeps_scoring(client, valid_record):
+    bad = json.dumps(valid_record).replace('"ssc_p": 67.0', f'"ssc_p": {OVERFLOW_NUMBER}')
+    body = '\n'.join([json.dumps(valid_record), bad, json.dumps(valid_record)]) + '\n'
+    response = client.post('/predict/stream', data=body, content_type='application/x-ndjson')
+    lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+    assert [line.get('line') for line in lines[:-1]] == [1, 2, 3]
+    assert lines[0]['prediction'] == lines[2]['prediction']
+    assert 'ssc_p' in lines[1]['error']
+    assert lines[-1] == {'done': True, 'count': 3, 'errors': 1}
+
+
+def test_simple_preprocessing_maps_unknown_category_to_oov_row(serving, valid_record, fused_weights_path):
+    state = serving.load_state(os.path.dirname(fused_weights_path))
+    try:
+        assert state.oov_index == OOV_INDEX
+        records = [valid_record, dict(valid_record, hsc_s='Vocational')]
+        inputs = serving.preprocess_columns_simple(serving.records_to_columns(records), state)
+        assert inputs['hsc_s_xf'].reshape(-1).tolist() == [0, OOV_INDEX]
+
+        body = encode_npz(serving.records_to_columns(records), serving.NUMERICAL_FEATURES, serving.CATEGORICAL_FEATURES)
+        columns = decode_columns(body, NPZ_CONTENT_TYPE, serving.NUMERICAL_FEATURES, serving.CATEGORICAL_FEATURES)
+        assert serving.preprocess_columns_simple(columns, state)['hsc_s_xf'].reshape(-1).tolist() == [0, OOV_INDEX]
+    finally:
+        state.batcher.close()
@@ -0,0 +1,22 @@
+import json
+
+import batch_score
+from conftest import OVERFLOW_NUMBER
+
+
+def test_bad_record_mid_file_gets_error_row(serving, valid_record, tmp_path, monkeypatch):
+    bad = json.dumps(dict(valid_record, request_id='b')).replace('"ssc_p": 67.0', f'"ssc_p": {OVERFLOW_NUMBER}')
+    lines = [json.dumps(dict(valid_record, request_id=request_id)) for request_id in ('a', 'c', 'd')]
+    lines.insert(1, bad)
+    input_path, output_path = tmp_path / 'records.jsonl', tmp_path / 'predictions.jsonl'
+    input_path.write_text('\n'.join(lines) + '\n')
+
+    monkeypatch.setattr('sys.argv', [
+        'batch_score.py', str(input_path), '--output', str(output_path), '--id-field', 'request_id', '--chunk-size', '3'
+    ])
+    assert batch_score.main() == 0
+
+    rows = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [row['request_id'] for row in rows] == ['a', 'b', 'c', 'd']
+    assert 'ssc_p' in rows[1]['error'] and rows[1]['prediction'] is None
+    assert all(row['error'] is None and row['prediction'] for row in rows[:1] + rows[2:])
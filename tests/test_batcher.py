@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+
+from batcher import MicroBatcher, _PendingRequest
+
+
+def test_item_that_does_not_fit_starts_the_next_batch():
+    calls = []
+
+    def predict(inputs):
+        calls.append(inputs['x'].reshape(-1).tolist())
+        return inputs['x']
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=0)
+    # Antrian diisi sebelum worker jalan: A(3) B(2) C(1) D(1), lalu sinyal close
+    batcher._pid = os.getpid()
+    requests = []
+    for name, rows in (('a', 3), ('b', 2), ('c', 1), ('d', 1)):
+        request = _PendingRequest({'x': np.array([[f'{name}{i}'] for i in range(rows)])}, rows)
+        requests.append(request)
+        batcher._queue.put(request)
+    batcher._queue.put(None)
+    batcher._run()
+
+    # B tidak muat setelah A, tapi tetap dilayani sebelum C dan D
+    assert calls == [['a0', 'a1', 'a2'], ['b0', 'b1', 'c0', 'd0']]
+    assert [request.result.reshape(-1).tolist()[0] for request in requests] == ['a0', 'b0', 'c0', 'd0']
+
+
+def test_submit_returns_its_own_rows():
+    batcher = MicroBatcher(lambda inputs: inputs['x'] * 2, max_batch_size=8, max_wait_ms=5)
+    try:
+        results = [batcher.submit({'x': np.array([[i]])}) for i in range(3)]
+    finally:
+        batcher.close()
+    assert [int(result[0, 0]) for result in results] == [0, 2, 4]
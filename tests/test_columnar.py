@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+from client import NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+from columnar import (
+    NPZ_CONTENT_TYPE, ColumnarError, check_malformed, decode_columns, decode_probabilities, encode_npz
+)
+
+
+def make_columns(num_rows=8, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {feature: rng.random(num_rows, dtype=np.float32) * 100 for feature in NUMERICAL_FEATURES}
+    columns.update({
+        'gender': rng.choice(['M', 'F'], num_rows),
+        'ssc_b': rng.choice(['Central', 'Others'], num_rows),
+        'hsc_b': rng.choice(['Central', 'Others'], num_rows),
+        'hsc_s': rng.choice(['Commerce', 'Science', 'Arts'], num_rows),
+        'degree_t': rng.choice(['Comm&Mgmt', 'Sci&Tech', 'Others'], num_rows),
+        'workex': rng.choice(['No', 'Yes'], num_rows),
+        'specialisation': rng.choice(['Mkt&Fin', 'Mkt&HR'], num_rows),
+    })
+    return columns
+
+
+def test_malformed_payloads_are_client_errors():
+    results = check_malformed(NUMERICAL_FEATURES, CATEGORICAL_FEATURES)
+    assert {name: result for name, result in results.items() if result != 'ColumnarError'} == {}
+
+
+@pytest.mark.parametrize('value', [np.nan, np.inf, -np.inf])
+def test_non_finite_numeric_column_is_rejected(value):
+    columns = make_columns()
+    columns['mba_p'][3] = value
+    body = encode_npz(columns, NUMERICAL_FEATURES, CATEGORICAL_FEATURES)
+    with pytest.raises(ColumnarError, match='mba_p.*row 3'):
+        decode_columns(body, NPZ_CONTENT_TYPE, NUMERICAL_FEATURES, CATEGORICAL_FEATURES)
+
+
+def test_batch_rejects_non_finite_npz(client):
+    columns = make_columns()
+    columns['ssc_p'][5] = np.nan
+    body = encode_npz(columns, NUMERICAL_FEATURES, CATEGORICAL_FEATURES)
+    response = client.post('/predict/batch', data=body, content_type=NPZ_CONTENT_TYPE)
+    assert response.status_code == 400
+    assert 'ssc_p' in json.loads(response.data)['message']
+
+
+def test_batch_scores_npz(client):
+    body = encode_npz(make_columns(), NUMERICAL_FEATURES, CATEGORICAL_FEATURES)
+    response = client.post(
+        '/predict/batch', data=body, content_type=NPZ_CONTENT_TYPE, headers={'Accept': NPZ_CONTENT_TYPE}
+    )
+    assert response.status_code == 200
+    probabilities = decode_probabilities(response.data)
+    assert probabilities.shape == (8,) and np.isfinite(probabilities).all()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from conftest import WEIGHTS_PATH
+from contribution_table import ContributionTableEngine, random_inputs
+from numpy_backend import NumpyInferenceEngine
+
+
+def assert_matches_numpy(weights_path, vocab_sizes):
+    engine = ContributionTableEngine(weights_path, vocab_sizes)
+    reference = NumpyInferenceEngine(weights_path)
+    inputs = random_inputs(engine, 4096, seed=0)
+    indices = np.concatenate([inputs[name] for name in engine.categorical_inputs], axis=1)
+    # Input acak harus mencakup jalur fallback (di luar tabel) dan baris OOV jika ada
+    assert (indices >= engine.vocab_rows).any()
+    if engine.base.oov_inputs:
+        assert (indices == engine.oov_index).any()
+    np.testing.assert_allclose(engine.predict(inputs), reference.predict(inputs), rtol=0, atol=1e-5)
+
+
+def test_matches_numpy_engine():
+    # Tabel hanya berisi indeks dari mapping sederhana, sisa vocabulary lewat fallback
+    assert_matches_numpy(WEIGHTS_PATH, {name: 2 for name in NumpyInferenceEngine(WEIGHTS_PATH).embeddings})
+
+
+def test_matches_numpy_engine_with_oov_rows(fused_weights_path):
+    assert_matches_numpy(fused_weights_path, {name: 2 for name in NumpyInferenceEngine(fused_weights_path).embeddings})
+
+
+def test_too_many_combinations_is_rejected():
+    with pytest.raises(ValueError, match='max_combinations'):
+        ContributionTableEngine(WEIGHTS_PATH, max_combinations=1)
@@ -0,0 +1,68 @@
+import os
+import sys
+import glob
+import subprocess
+
+from conftest import ROOT
+from multiprocess_metrics import compact_dead_processes, directory_lock
+
+# Setiap "worker" adalah proses terpisah dengan PROMETHEUS_MULTIPROC_DIR yang sama
+WORKER_SCRIPT = """
+import sys
+from prometheus_client import Counter, Histogram
+requests = Counter('requests', 'Requests', ['endpoint'])
+latency = Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+for _ in range(int(sys.argv[1])):
+    requests.labels(endpoint='/predict').inc()
+    latency.observe(0.5)
+print(__import__('os').getpid())
+"""
+
+
+def run_worker(path, count):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(path))
+    output = subprocess.check_output([sys.executable, '-c', WORKER_SCRIPT, str(count)], env=env, cwd=ROOT)
+    return int(output)
+
+
+def scrape(path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(path))
+    script = (
+        "from multiprocess_metrics import MetricsExporter; "
+        "print(MetricsExporter(ttl=0).generate().decode())"
+    )
+    output = subprocess.check_output([sys.executable, '-c', script], env=env, cwd=ROOT).decode()
+    samples = {}
+    for line in output.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_compaction_keeps_totals_and_bounds_file_count(tmp_path):
+    live = run_worker(tmp_path, 1)
+    for count in (2, 3, 4):
+        run_worker(tmp_path, count)
+    before = scrape(tmp_path)
+    assert before['requests_total{endpoint="/predict"}'] == 10
+
+    assert compact_dead_processes(str(tmp_path), {live}) == 6
+    assert scrape(tmp_path) == before
+    assert {os.path.basename(f) for f in glob.glob(str(tmp_path / '*.db'))} == {
+        'counter_archive.db', f'counter_{live}.db', 'histogram_archive.db', f'histogram_{live}.db'
+    }
+
+    # Archive yang sudah ada ikut dijumlahkan pada compaction berikutnya
+    run_worker(tmp_path, 5)
+    assert compact_dead_processes(str(tmp_path), {live}) == 2
+    after = scrape(tmp_path)
+    assert after['requests_total{endpoint="/predict"}'] == 15
+    assert after['latency_seconds_count'] == 15
+
+
+def test_compaction_waits_for_scrapes(tmp_path):
+    run_worker(tmp_path, 1)
+    with directory_lock(str(tmp_path)):
+        assert compact_dead_processes(str(tmp_path), set(), timeout=0.05) == 0
+    assert compact_dead_processes(str(tmp_path), set(), timeout=0.05) == 2
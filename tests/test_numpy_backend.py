@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from conftest import MODEL_DIR
+from numpy_backend import NUMPY_WEIGHTS_FILENAME, OOV_INDEX, NumpyInferenceEngine, check_parity
+
+
+@pytest.fixture
+def weights_path(tmp_path):
+    """MLP kecil: score_xf (numerik) + embedding 2 dimensi untuk color_xf (vocab 2 + baris OOV)"""
+    path = tmp_path / NUMPY_WEIGHTS_FILENAME
+    np.savez(
+        path,
+        input_order=np.array(['score_xf', 'color_xf']),
+        input_kinds=np.array(['numeric', 'embedding']),
+        oov_inputs=np.array(['color_xf']),
+        activations=np.array(['relu', 'linear']),
+        **{
+            # Baris terakhir adalah baris OOV (FusedEmbedding diekspor sebagai [vocabulary..., OOV])
+            'emb/color_xf': np.array([[1.0, 0.0], [0.0, 1.0], [-1.0, -1.0]], dtype=np.float32),
+            'dense_0/kernel': np.array([[1.0, -1.0], [2.0, 0.0], [0.0, 3.0]], dtype=np.float32),
+            'dense_0/bias': np.array([0.5, 0.0], dtype=np.float32),
+            'dense_1/kernel': np.array([[1.0], [2.0]], dtype=np.float32),
+            'dense_1/bias': np.array([-1.0], dtype=np.float32),
+        }
+    )
+    return str(path)
+
+
+def test_known_outputs_including_oov_row(weights_path):
+    engine = NumpyInferenceEngine(weights_path)
+    assert engine.oov_index == OOV_INDEX
+
+    inputs = {
+        'score_xf': np.array([[1.0], [2.0], [0.0]], dtype=np.float32),
+        'color_xf': np.array([[0], [1], [OOV_INDEX]], dtype=np.int64),
+    }
+    # Baris 1: [1, 1, 0] -> relu([3.5, -1]) = [3.5, 0] -> 3.5 - 1
+    # Baris 2: [2, 0, 1] -> relu([2.5, 1])  = [2.5, 1] -> 2.5 + 2 - 1
+    # Baris 3: [0, -1, -1] (OOV) -> relu([-1.5, -3]) = [0, 0] -> -1
+    np.testing.assert_allclose(engine.predict(inputs), [[2.5], [3.5], [-1.0]])
+
+
+def test_index_outside_vocabulary_is_rejected(weights_path):
+    engine = NumpyInferenceEngine(weights_path)
+    with pytest.raises(ValueError, match='color_xf'):
+        engine.predict({'score_xf': np.zeros((1, 1)), 'color_xf': np.array([[3]])})
+
+
+def test_parity_with_saved_model():
+    pytest.importorskip('tensorflow')
+    ok, max_diff = check_parity(MODEL_DIR)
+    assert ok, f'max abs diff {max_diff:.3e}'
@@ -0,0 +1,46 @@
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+def test_records_sharing_a_key_get_identical_scores(serving):
+    record = dict(
+        gender='F', ssc_p='72.5', ssc_b='Others', hsc_p='91', hsc_b='Others', hsc_s='Commerce',
+        degree_p='58', degree_t='Sci&Tech', workex='No', etest_p='55', specialisation='Mkt&HR', mba_p='58.8'
+    )
+    # Varian yang dulu berbagi key: spasi, pembulatan, format angka
+    variants = [
+        record,
+        dict(record, gender=' F'),
+        dict(record, gender='F '),
+        dict(record, ssc_p='72.504'),
+        dict(record, ssc_p='72.50'),
+        dict(record, ssc_p=72.5),
+        dict(record, ssc_p='72.5000001'),
+        dict(record, mba_p='58.80'),
+        dict(record, workex='no'),
+    ]
+    state = serving.serving_state
+    scores = {}
+    for variant in variants:
+        key = serving.prediction_cache.make_key(variant)
+        inputs = serving.preprocess_with_transform(variant, state)
+        scores.setdefault(key, set()).add(float(np.asarray(state.engine.predict(inputs)).reshape(-1)[0]))
+    assert {key: values for key, values in scores.items() if len(values) > 1} == {}
+    assert len(scores) < len(variants)
+
+
+def test_calls_from_old_version_do_not_touch_new_entries():
+    cache = PredictionCache(8, ['x'], ['c'])
+    cache.set_version('v1')
+    cache.put(('a',), 'v1', 0.1)
+    cache.set_version('v2')
+    assert cache.get(('a',), 'v2') is None
+
+    cache.put(('a',), 'v2', 0.2)
+    # Request yang masih berjalan di model v1 setelah swap
+    assert cache.get(('a',), 'v1') is None
+    cache.put(('b',), 'v1', 0.1)
+    assert cache.get(('a',), 'v2') == 0.2
+    assert cache.get(('b',), 'v2') is None
+    assert len(cache) == 1
@@ -0,0 +1,33 @@
+import os
+import json
+
+import pytest
+
+from conftest import MODEL_DIR
+from tflite_backend import TFLITE_MODEL_FILENAME, TFLITE_REPORT_FILENAME, check_parity, parity_ok
+
+
+@pytest.mark.parametrize('quantization, max_diff, agreement, expected', [
+    ('none', 1e-6, 1.0, True),
+    ('none', 1e-3, 1.0, False),
+    ('dynamic', 0.01, 0.995, True),
+    ('dynamic', 0.2, 0.995, False),
+    ('int8', 0.05, 0.9, False),
+])
+def test_parity_tolerance_per_quantization(quantization, max_diff, agreement, expected):
+    assert parity_ok(max_diff, agreement, quantization) is expected
+
+
+def test_explicit_tolerance_overrides_preset():
+    assert parity_ok(1e-3, 1.0, 'none', max_diff_tolerance=1e-2)
+    assert not parity_ok(0.01, 0.995, 'dynamic', min_agreement=0.999)
+
+
+def test_parity_with_saved_model():
+    pytest.importorskip('tensorflow')
+    if not os.path.exists(os.path.join(MODEL_DIR, TFLITE_MODEL_FILENAME)):
+        pytest.skip('model has no TFLite export')
+    with open(os.path.join(MODEL_DIR, TFLITE_REPORT_FILENAME)) as f:
+        quantization = json.load(f)['quantization']
+    max_diff, agreement = check_parity(MODEL_DIR)
+    assert parity_ok(max_diff, agreement, quantization), f'max abs diff {max_diff:.3e}, agreement {agreement:.4f}'
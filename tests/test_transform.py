@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+
+tf = pytest.importorskip('tensorflow')
+pytest.importorskip('tensorflow_transform')
+sys.path.insert(0, os.path.join(ROOT, 'modules'))
+
+from transform import FusedEmbedding  # noqa: E402
+
+
+def test_fused_embedding_maps_out_of_range_indices_to_oov_row():
+    layer = FusedEmbedding([2, 3], output_dim=1)
+    layer.build((None, 2))
+    # Baris tabel: [OOV a, a0, a1, OOV b, b0, b1, b2]
+    layer.embeddings.assign(np.arange(7, dtype=np.float32).reshape(-1, 1))
+
+    inputs = tf.constant([[0, 2], [-1, -1], [2, 3], [-5, 7]], dtype=tf.int64)
+    np.testing.assert_array_equal(layer(inputs).numpy(), [[1, 6], [0, 3], [0, 3], [0, 3]])
@@ -0,0 +1,29 @@
+import numpy as np
+
+from transform_spec import SPEC_VERSION, SpecPreprocessor, _decode_tokens
+
+
+def transformed_name(key):
+    return key + '_xf'
+
+
+def test_constant_feature_scales_to_half_like_scale_to_0_1():
+    spec = {
+        'version': SPEC_VERSION,
+        'numerical': {'ssc_p': {'min': 40.0, 'max': 90.0}, 'mba_p': {'min': 0.0, 'max': 0.0}},
+        'categorical': {'workex': {'vocabulary': {'No': 0, 'Yes': 1}}},
+    }
+    columns = {
+        'ssc_p': np.array([[40.0], [65.0], [90.0]], dtype=np.float32),
+        'mba_p': np.array([[10.0], [0.0], [-3.0]], dtype=np.float32),
+        'workex': np.array([['Yes'], ['No'], ['Maybe']], dtype=object),
+    }
+    inputs = SpecPreprocessor(spec, transformed_name, oov_index=-1).transform(columns)
+    np.testing.assert_allclose(inputs['ssc_p_xf'].reshape(-1), [0.0, 0.5, 1.0])
+    np.testing.assert_array_equal(inputs['mba_p_xf'].reshape(-1), [0.5, 0.5, 0.5])
+    assert inputs['workex_xf'].reshape(-1).tolist() == [1, 0, -1]
+
+
+def test_non_utf8_tokens_are_skipped_without_shifting_indices():
+    tokens = [b'Mkt&Fin', b'caf\xe9', 'Café'.encode('utf-8')]
+    assert _decode_tokens('specialisation', tokens) == [('Mkt&Fin', 0), ('Café', 2)]
@@ -0,0 +1,130 @@
+"""
+Backend inference TFLite untuk placement MLP
+Flatbuffer model.tflite ditulis oleh trainer.run_fn (custom_config tflite_options)
+dan dijalankan dengan interpreter TFLite: tflite_runtime jika terpasang (tanpa
+TensorFlow penuh), selain itu tf.lite.Interpreter.
+
+Contoh:
+    INFERENCE_BACKEND=tflite gunicorn app:app
+    python tflite_backend.py check output/serving_model/1762435641
+"""
+import os
+import sys
+import json
+import argparse
+import threading
+
+import numpy as np
+
+# Nama file default di dalam folder versi model (sama dengan modules/trainer.py)
+TFLITE_MODEL_FILENAME = 'model.tflite'
+TFLITE_REPORT_FILENAME = 'tflite_report.json'
+
+# Batas parity per mode quantization: (selisih probability maksimum, kesepakatan kelas minimum)
+PARITY_TOLERANCES = {
+    'none': (1e-5, 1.0),
+    'dynamic': (0.05, 0.99),
+    'int8': (0.1, 0.98),
+}
+
+
+def load_interpreter_class():
+    """Interpreter dari tflite_runtime, fallback ke tf.lite"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteInferenceEngine:
+    """
+    Forward pass lewat signature runner TFLite
+    Interpreter tidak thread-safe, sehingga setiap panggilan diserialkan dengan lock;
+    ukuran batch yang berubah memicu resize tensor input di dalam runner.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, model_path, num_threads=None):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TFLite model not found: {model_path}")
+
+        Interpreter = load_interpreter_class()
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads or None)
+        self.runner = self.interpreter.get_signature_runner()
+        self.input_details = self.runner.get_input_details()
+        self.model_path = model_path
+        self._lock = threading.Lock()
+
+    def predict(self, inputs):
+        arrays = {
+            name: np.asarray(inputs[name], dtype=detail['dtype']).reshape(-1, 1)
+            for name, detail in self.input_details.items()
+        }
+        with self._lock:
+            outputs = self.runner(**arrays)
+        return next(iter(outputs.values()))
+
+
+def check_parity(model_dir, model_path=None, num_rows=1024, seed=0):
+    """Bandingkan output TFLite dengan SavedModel float, return selisih maksimum"""
+    import tensorflow as tf
+
+    engine = TFLiteInferenceEngine(model_path or os.path.join(model_dir, TFLITE_MODEL_FILENAME))
+    model = tf.keras.models.load_model(model_dir)
+
+    rng = np.random.default_rng(seed)
+    inputs = {}
+    for name, detail in engine.input_details.items():
+        if np.issubdtype(detail['dtype'], np.integer):
+            # Indeks vocabulary 0/1 valid untuk semua fitur kategorikal
+            inputs[name] = rng.integers(0, 2, size=(num_rows, 1)).astype(detail['dtype'])
+        else:
+            inputs[name] = rng.random((num_rows, 1), dtype=np.float32)
+
+    expected = model({name: tf.constant(value) for name, value in inputs.items()}, training=False).numpy()
+    actual = engine.predict(inputs)
+    return float(np.max(np.abs(expected - actual))), float(np.mean((expected > 0.5) == (actual > 0.5)))
+
+
+def parity_ok(max_diff, agreement, quantization, max_diff_tolerance=None, min_agreement=None):
+    """True jika hasil check_parity masih dalam batas mode quantization (atau batas eksplisit)"""
+    default_diff, default_agreement = PARITY_TOLERANCES[quantization]
+    max_diff_tolerance = default_diff if max_diff_tolerance is None else max_diff_tolerance
+    min_agreement = default_agreement if min_agreement is None else min_agreement
+    return max_diff <= max_diff_tolerance and agreement >= min_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the TFLite model exported by trainer.run_fn")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help='Compare TFLite output with the float SavedModel')
+    check_parser.add_argument('model_dir')
+    check_parser.add_argument('--model', default=None, help='Path to the .tflite file')
+    check_parser.add_argument('--rows', type=int, default=1024)
+    check_parser.add_argument('--quantization', choices=sorted(PARITY_TOLERANCES),
+                              help='Tolerance preset (default: from tflite_report.json, else none)')
+    check_parser.add_argument('--max-diff', type=float, default=None, help='Override max abs probability diff')
+    check_parser.add_argument('--min-agreement', type=float, default=None, help='Override min class agreement')
+    args = parser.parse_args()
+
+    report = {}
+    report_path = os.path.join(args.model_dir, TFLITE_REPORT_FILENAME)
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            report = json.load(f)
+        print(f"training report: {json.dumps(report, sort_keys=True)}")
+    quantization = args.quantization or report.get('quantization') or 'none'
+
+    max_diff, agreement = check_parity(args.model_dir, args.model, args.rows)
+    ok = parity_ok(max_diff, agreement, quantization, args.max_diff, args.min_agreement)
+    print(f"max abs diff: {max_diff:.3e}  class agreement: {agreement:.4f} "
+          f"(quantization {quantization}) -> {'OK' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Preprocessing spec hasil kompilasi transform graph TFT
+Menyimpan statistik scale_to_0_1 (min/max) dan vocabulary
+compute_and_apply_vocabulary ke file JSON kecil, sehingga serving bisa
+melakukan preprocessing dengan NumPy tanpa import tensorflow_transform.
+
+Contoh:
+    python transform_spec.py output/bertrandcorneliussia-pipeline/Transform/transform_graph/6 \\
+        --output output/preprocessing_spec.json
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+
+import numpy as np
+
+from columnar import DictionaryColumn
+
+logger = logging.getLogger(__name__)
+
+SPEC_VERSION = 1
+
+
+def _decode_tokens(feature, tokens):
+    """
+    Token vocabulary (bytes) sebagai string, urutan (= indeks) dipertahankan
+    Token yang bukan UTF-8 tidak pernah cocok dengan input string, sehingga dilewati
+    (bukan diubah dan dipetakan ke indeks token lain)
+    """
+    decoded = []
+    for index, token in enumerate(tokens):
+        try:
+            decoded.append((token.decode('utf-8'), index))
+        except UnicodeDecodeError:
+            logger.warning(f"{feature}: skipping non-UTF-8 vocabulary token {token!r} (index {index})")
+    return decoded
+
+
+def build_spec(transform_graph_dir, numerical_features, categorical_features, transformed_name):
+    """
+    Bangun spec dengan mem-probe transform layer:
+    - numerik: output untuk x=0 dan x=100 memberi min dan range scale_to_0_1
+    - kategorikal: vocabulary tiap fitur dibaca dengan vocabulary_by_name(fitur)
+      (vocab_filename di preprocessing_fn), indeks = posisi token di vocabulary
+    """
+    import tensorflow as tf
+    import tensorflow_transform as tft
+
+    tf_transform_output = tft.TFTransformOutput(transform_graph_dir)
+    layer = tf_transform_output.transform_features_layer()
+
+    def run_layer(numeric_values, categorical_values):
+        raw_features = {}
+        for feature in numerical_features:
+            raw_features[feature] = tf.constant(numeric_values, dtype=tf.float32, shape=(len(numeric_values), 1))
+        for feature in categorical_features:
+            values = categorical_values.get(feature, [''] * len(numeric_values))
+            raw_features[feature] = tf.constant(values, dtype=tf.string, shape=(len(values), 1))
+        return {key: value.numpy().reshape(-1) for key, value in layer(raw_features).items()}
+
+    spec = {'version': SPEC_VERSION, 'numerical': {}, 'categorical': {}}
+
+    # Numerik: y = (x - min) / (max - min)
+    probe = run_layer([0.0, 100.0, 200.0], {})
+    for feature in numerical_features:
+        y0, y1, y2 = probe[transformed_name(feature)].astype(np.float64)
+        if y0 == y1 == y2 == 0.5:
+            # min == max saat analisis: scale_to_0_1 mengembalikan 0.5 (tengah range output)
+            spec['numerical'][feature] = {'min': 0.0, 'max': 0.0}
+            continue
+        step = (y1 - y0) / 100.0
+        if step == 0 or not np.isclose((y2 - y1) / 100.0, step, rtol=1e-4):
+            raise ValueError(f"{feature}: transform output is not a linear min/max scaling")
+        minimum = -y0 / step
+        spec['numerical'][feature] = {'min': float(minimum), 'max': float(minimum + 1.0 / step)}
+
+    # Kategorikal: vocabulary milik fitur itu sendiri (hasil dicek _verify_spec terhadap layer)
+    for feature in categorical_features:
+        try:
+            tokens = tf_transform_output.vocabulary_by_name(feature)
+        except ValueError as e:
+            raise ValueError(
+                f"{feature}: no vocabulary named '{feature}' in {transform_graph_dir}; re-run Transform "
+                f"with vocab_filename set in preprocessing_fn ({e})"
+            )
+        spec['categorical'][feature] = {'vocabulary': dict(_decode_tokens(feature, tokens))}
+
+    _verify_spec(spec, run_layer, numerical_features, categorical_features, transformed_name)
+    return spec
+
+
+def _verify_spec(spec, run_layer, numerical_features, categorical_features, transformed_name):
+    """Pastikan SpecPreprocessor memberi hasil yang sama dengan transform layer"""
+    rng = np.random.default_rng(0)
+    numeric_values = (rng.random(64) * 100).astype(np.float32).tolist()
+    categorical_values = {}
+    for feature in categorical_features:
+        vocabulary = list(spec['categorical'][feature]['vocabulary'])
+        categorical_values[feature] = [vocabulary[i % len(vocabulary)] for i in range(64)]
+    expected = run_layer(numeric_values, categorical_values)
+
+    columns = {feature: np.array(numeric_values, dtype=np.float32).reshape(-1, 1) for feature in numerical_features}
+    for feature in categorical_features:
+        columns[feature] = np.array(categorical_values[feature], dtype=object).reshape(-1, 1)
+    actual = SpecPreprocessor(spec, transformed_name).transform(columns)
+
+    for key, value in expected.items():
+        if key not in actual:
+            continue
+        if not np.allclose(actual[key].reshape(-1), value, atol=1e-6):
+            raise ValueError(f"Spec mismatch for {key}")
+
+
+def save_spec(spec, output_path):
+    with open(output_path, 'w') as f:
+        json.dump(spec, f, indent=2, sort_keys=True)
+
+
+def load_spec(spec_path):
+    with open(spec_path) as f:
+        spec = json.load(f)
+    if spec.get('version') != SPEC_VERSION:
+        raise ValueError(f"Unsupported preprocessing spec version: {spec.get('version')}")
+    return spec
+
+
+class SpecPreprocessor:
+    """
+    Preprocessing NumPy (vektor) dari preprocessing spec.
+    Token di luar vocabulary dipetakan ke `oov_index`: 0, atau -1 (default_value
+    transform graph) untuk model dengan baris OOV per fitur. Fitur numerik dengan
+    min == max menjadi 0.5, sama seperti scale_to_0_1.
+    """
+
+    def __init__(self, spec, transformed_name, oov_index=0):
+        self.transformed_name = transformed_name
+        self.oov_index = oov_index
+        self.numerical = {
+            feature: (np.float32(stats['min']), np.float32(stats['max']))
+            for feature, stats in spec['numerical'].items()
+        }
+        self.categorical = {
+            feature: info['vocabulary']
+            for feature, info in spec['categorical'].items()
+        }
+
+    @classmethod
+    def from_file(cls, spec_path, transformed_name, oov_index=0):
+        return cls(load_spec(spec_path), transformed_name, oov_index)
+
+    def transform(self, columns):
+        """Ubah kolom mentah (n, 1) menjadi input *_xf untuk model"""
+        inputs = {}
+        for feature, (minimum, maximum) in self.numerical.items():
+            values = np.asarray(columns[feature], dtype=np.float32)
+            if maximum > minimum:
+                inputs[self.transformed_name(feature)] = (values - minimum) / (maximum - minimum)
+            else:
+                inputs[self.transformed_name(feature)] = np.full_like(values, 0.5)
+
+        for feature, vocabulary in self.categorical.items():
+            column = columns[feature]
+            if isinstance(column, DictionaryColumn):
+                inputs[self.transformed_name(feature)] = column.map(vocabulary, self.oov_index)
+                continue
+            uniques, inverse = np.unique(np.asarray(column).astype(str), return_inverse=True)
+            lookup = np.array([vocabulary.get(value, self.oov_index) for value in uniques], dtype=np.int64)
+            inputs[self.transformed_name(feature)] = lookup[inverse].reshape(-1, 1)
+        return inputs
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Compile a TFT transform graph into a preprocessing spec")
+    parser.add_argument('transform_graph_dir')
+    parser.add_argument('--output', default=os.path.join('output', 'preprocessing_spec.json'))
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modules'))
+    from transform import NUMERICAL_FEATURES, CATEGORICAL_FEATURES, transformed_name
+
+    spec = build_spec(args.transform_graph_dir, NUMERICAL_FEATURES, CATEGORICAL_FEATURES, transformed_name)
+    save_spec(spec, args.output)
+    logger.info(f"Preprocessing spec written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())